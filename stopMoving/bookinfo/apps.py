@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookinfoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookinfo'
+
+    def ready(self):
+        # BookInfo 변경 -> 검색 색인 동기화
+        from . import signals  # noqa: F401
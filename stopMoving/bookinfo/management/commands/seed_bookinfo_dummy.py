@@ -1,4 +1,5 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from bookinfo.models import IngestRunBusy
 from bookinfo.service import aladin_ingest
 
 class Command(BaseCommand):
@@ -12,13 +13,45 @@ class Command(BaseCommand):
             action="store_true",
             help="Run without making changes to the database"
         )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Ignore the Aladin response cache and refetch everything"
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only look up ISBNs that are new or older than settings.ALADIN_INGEST_STALE_DAYS"
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Start a new run instead of resuming an interrupted one"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Concurrent Aladin lookups (default: settings.ALADIN_CONCURRENCY)"
+        )
 
     def handle(self, *args, **options):
         querytypes = options.get("querytypes")
         dry_run = options.get("dry_run", False)
-        result = aladin_ingest.run(querytypes=querytypes, dry_run=dry_run)
+        try:
+            result = aladin_ingest.run(querytypes=querytypes, dry_run=dry_run, concurrency=options.get("concurrency"),
+                                       refresh=options.get("refresh", False),
+                                       incremental=options.get("incremental", False),
+                                       resume=not options.get("restart", False))
+        except IngestRunBusy as e:
+            raise CommandError(f"다른 수집이 실행 중입니다: {e}")
         self.stdout.write(self.style.SUCCESS(
             "Done: "
                 f"querytypes={result['querytypes']}, "
                 f"isbn_collected={result['isbn_count']}, "
+                f"skipped={result['skipped_count']}, "
+                f"saved={result['saved_count']}, "
+                f"from_list={result['from_list']}, "
+                f"lookups={result['lookup_count']}, "
+                f"failed={result['list_failed'] + result['lookup_failed']}"
         ))
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookinfo', '0003_bookinfolibrary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookinfo',
+            name='vector_bin',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
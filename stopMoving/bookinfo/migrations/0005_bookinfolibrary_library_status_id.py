@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookinfo', '0004_bookinfo_vector_bin'),
+        ('library', '0005_backfill_libraryimage_library'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookinfolibrary',
+            index=models.Index(fields=['library_id', 'status', '-id'], name='bil_library_status_id'),
+        ),
+    ]
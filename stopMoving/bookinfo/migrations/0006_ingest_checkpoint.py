@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookinfo', '0005_bookinfolibrary_library_status_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookinfo',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='bookinfo',
+            name='fetched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('querytypes', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('RUNNING', '실행중'), ('DONE', '완료'), ('FAILED', '실패')], default='RUNNING', max_length=10)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('isbn_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('saved_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'IngestRun',
+                'indexes': [models.Index(fields=['status', 'started_at'], name='IngestRun_status_9cbea0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookinfo', '0006_ingest_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestrun',
+            name='cursor',
+            field=models.CharField(blank=True, default='', max_length=13),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='kind',
+            field=models.CharField(choices=[('ingest', '목록 수집'), ('cover', '표지 갱신')], default='ingest', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='params',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='ingestrun',
+            name='status',
+            field=models.CharField(choices=[('RUNNING', '실행중'), ('DONE', '완료'), ('FAILED', '실패'), ('PAUSED', '일시 중지')], default='RUNNING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookinfo', '0007_ingestrun_cover_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestrun',
+            name='failed_isbns',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
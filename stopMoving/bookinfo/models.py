@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models, transaction
 from library.models import Library
 from django.utils import timezone
@@ -23,7 +24,10 @@ class BookInfo(models.Model):
     sale_price = models.IntegerField("정가", null=True, blank=True)
 
     description = models.TextField("설명", blank=True)
-    vector = models.JSONField(null=True, blank=True)
+    vector = models.JSONField(null=True, blank=True) # (구) JSON 형식, 읽기 호환용
+    vector_bin = models.BinaryField(null=True, blank=True) # float32 data + int32 indices 패킹
+    fetched_at = models.DateTimeField(null=True, blank=True) # 알라딘에서 마지막으로 받은 시각 (증분 수집용)
+    content_hash = models.CharField(max_length=40, blank=True, default="") # 마지막으로 받은 메타의 해시 (바뀌었을 때만 다시 저장)
 
     class Meta:
         db_table = "BookInfo"
@@ -38,7 +42,10 @@ class BookInfo(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.isbn})"
-    
+
+# 벡터가 있는 행(바이너리 또는 예전 JSON)
+HAS_VECTOR = models.Q(vector_bin__isnull=False) | models.Q(vector__isnull=False)
+
 class BookInfoLibrary(models.Model):
     """
     테이블이 처음 생성될 때 median_date는 expired_date와 created_at의 중간일
@@ -73,6 +80,10 @@ class BookInfoLibrary(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['library_id', 'isbn'], name='uniq_library_isbn_bil')
         ]
+        indexes = [
+            # 도서관 보유 목록 keyset 페이지네이션 (library_id, status, -id)
+            models.Index(fields=['library_id', 'status', '-id'], name='bil_library_status_id'),
+        ]
 
     def _midpoint(self, a, b):
         """두 datetime의 중간값 반환 (tz 보존)"""
@@ -81,21 +92,25 @@ class BookInfoLibrary(models.Model):
         delta = b - a
         return a + (delta / 2)
 
+    def init_dates(self):
+        """최초 생성 시 median_date/expired_at 기본값 (save()를 거치지 않는 bulk_create 경로에서도 호출)"""
+        now = timezone.now()
+        # created_at은 auto_now_add지만 계산상 필요하므로 기준 시각을 now로 사용
+        base_created = self.created_at or now
+
+        # 최초 median_date 가이드:
+        # created_at ~ (created_at + 30일)의 중간 = created_at + 15일
+        if self.median_date is None:
+            self.median_date = base_created + timedelta(days=15)
+
+        # expired_at = median_date + 30일
+        if self.expired_at is None:
+           self.expired_at = (self.median_date or base_created) + timedelta(days=30)
+
     def save(self, *args, **kwargs):
         # 최초 생성 시에만 기본값 세팅
         if self.pk is None:
-            now = timezone.now()
-            # created_at은 auto_now_add지만 계산상 필요하므로 기준 시각을 now로 사용
-            base_created = self.created_at or now
-
-            # 최초 median_date 가이드:
-            # created_at ~ (created_at + 30일)의 중간 = created_at + 15일
-            if self.median_date is None:
-                self.median_date = base_created + timedelta(days=15)
-
-            # expired_at = median_date + 30일
-            if self.expired_at is None:
-               self.expired_at = (self.median_date or base_created) + timedelta(days=30)
+            self.init_dates()
 
         super().save(*args, **kwargs)
     
@@ -119,3 +134,71 @@ class BookInfoLibrary(models.Model):
 
         if save:
             self.save(update_fields=["median_date", "expired_at"])
+
+
+# 알라딘 수집 실행 기록 = 체크포인트
+# 끝나지 않은(RUNNING/FAILED/PAUSED) 실행이 있으면 다음 실행이 이어받음
+# - ingest: started_at 이후 저장된 책(fetched_at)은 다시 조회하지 않음
+# - cover: isbn 순서로 처리하므로 cursor(마지막으로 끝낸 isbn) 다음부터
+class IngestRun(models.Model):
+    STATUS = [
+        ("RUNNING", "실행중"),
+        ("DONE", "완료"),
+        ("FAILED", "실패"),
+        ("PAUSED", "일시 중지"), # --limit 등으로 일부만 처리하고 끝남
+    ]
+    KIND = [
+        ("ingest", "목록 수집"),
+        ("cover", "표지 갱신"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND, default="ingest")
+    querytypes = models.JSONField(default=list) # ingest: 알라딘 QueryType 목록
+    params = models.JSONField(default=dict, blank=True) # 실행 옵션 (ingest: incremental/refresh, cover: only_missing)
+    cursor = models.CharField(max_length=13, blank=True, default="") # cover: 마지막으로 끝낸 isbn
+    failed_isbns = models.JSONField(default=list, blank=True) # cover: 조회 실패한 isbn (이어받으면 먼저 다시 조회)
+    status = models.CharField(max_length=10, choices=STATUS, default="RUNNING")
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    isbn_count = models.IntegerField(default=0) # 목록에서 모은 isbn 수
+    skipped_count = models.IntegerField(default=0) # 이미 최신이라 조회하지 않은 수
+    saved_count = models.IntegerField(default=0) # 저장(또는 변경 없음 확인)한 수, 배치마다 갱신
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "IngestRun"
+        indexes = [models.Index(fields=["status", "started_at"])]
+
+    def __str__(self):
+        return f"IngestRun#{self.pk} {self.kind} [{self.status}]"
+
+    @classmethod
+    def begin(cls, kind: str, querytypes: list | None = None, params: dict | None = None, resume: bool = True):
+        """
+        (이번 실행 기록, 이어받았는지). 같은 kind/querytypes/params로 끝나지 않은 마지막 실행이 있으면 이어받음
+        다른 프로세스가 아직 돌고 있는(RUNNING이고 INGEST_RUN_STALE_SECONDS 안에 갱신된) 실행이 있으면 IngestRunBusy
+        후보 행은 잠가서 읽음 -> 동시에 시작한 두 실행이 같은 행을 이어받지 않음
+        """
+        stale = timezone.now() - timedelta(seconds=float(getattr(settings, "INGEST_RUN_STALE_SECONDS", 1800)))
+        with transaction.atomic():
+            open_runs = list(cls.objects.select_for_update().filter(kind=kind).exclude(status="DONE").order_by("-started_at"))
+            busy = next((r for r in open_runs if r.status == "RUNNING" and r.updated_at >= stale), None)
+            if busy is not None:
+                raise IngestRunBusy(busy)
+            last = open_runs[0] if open_runs else None
+            querytypes, params = list(querytypes or []), dict(params or {})
+            if resume and last is not None and (last.querytypes, last.params) == (querytypes, params):
+                last.status = "RUNNING"
+                last.save(update_fields=["status", "updated_at"])
+                return last, True
+            return cls.objects.create(kind=kind, querytypes=querytypes, params=params, started_at=timezone.now()), False
+
+    def heartbeat(self, **fields) -> None:
+        """진행 상황 갱신 (.update()는 auto_now를 건드리지 않으므로 updated_at도 직접)"""
+        type(self).objects.filter(pk=self.pk).update(updated_at=timezone.now(), **fields)
+
+
+class IngestRunBusy(Exception):
+    def __init__(self, run: IngestRun):
+        super().__init__(f"{run} is still running (updated {run.updated_at:%Y-%m-%d %H:%M:%S})")
+        self.run = run
@@ -1,8 +1,33 @@
-from datetime import date
-from typing import Iterable, Optional, Set, Dict, Any, Tuple
+# bookinfo/service/aladin_ingest.py
+# 알라딘 목록 -> 상세 조회 -> BookInfo upsert 파이프라인
+#   1) list:   목록 페이지들을 스레드 풀에서 동시에 호출, 새 isbn이 나오는 즉시 2)로 넘김
+#   2) lookup: ALADIN_CONCURRENCY개 스레드가 상세 조회 (요청 속도는 aladin_client의 토큰 버킷이 제한)
+#   3) upsert: 호출한 스레드 1개가 큐에서 받아 ALADIN_UPSERT_BATCH개씩 bulk upsert (DB 쓰기는 한 스레드에서만)
+# 단계 사이 큐는 크기 제한 -> DB 저장이 밀리면 조회도 멈춤
+# 목록 응답 항목에 저장할 필드가 다 있으면 상세 조회 없이 바로 3)으로, 빠진 필드가 있는 isbn만 상세 조회
+# 증분(incremental): 목록을 다 모은 뒤 DB와 한 번에 비교해 없거나 오래된(fetched_at) isbn만 조회,
+#   받은 메타가 content_hash와 같으면 fetched_at만 갱신
+# 체크포인트(IngestRun): 중단된 실행이 있으면 이어받아 그 실행 이후 저장된 책은 건너뜀
+import hashlib
+import json
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional, Set, Dict, Any, Tuple
 from core import aladin_client
-from bookinfo.models import BookInfo
-from django.db import transaction
+from bookinfo.models import BookInfo, IngestRun
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from bookinfo.services import _ensure_vectorizer_loaded, get_sale_price
+from bookinfo.signals import notify_books_upserted
+from preferences.services.embeddings import build_text_from_meta, pack_sparse_rows, transform_many
+
+logger = logging.getLogger(__name__)
 
 QUERYTYPES = ["ItemNewAll", "ItemNewSpecial", "ItemEditorChoice", "Bestseller", "BlogBest"]
 
@@ -18,60 +43,15 @@ def _normalize_items(data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
         items = [items]
     return items # 항상 list[dict] 형태로 반환
 
-# 주어진 쿼리 타입에 해당하는 ISBN 목록을 반환
-def _collect_isbns_for_querytype(
-    qt: str,
-    search_target: str = "Book",
-    category_id: Optional[int] = None,
-    max_results_per_page: int = 100,
-) -> Set[str]:
-    isbns: Set[str] = set()
-
-    # 1) 첫 호출에서 totalResults 파악
-    first = aladin_client.get_booklist(
-        qt,
-        search_target=search_target,
-        start=1,
-        max_results=max_results_per_page,
-        category_id=category_id,
-    )
-    total = int(first.get("totalResults", 0))  # 없으면 0으로 처리
-    items = list(_normalize_items(first))
-    for it in items:
-        isbn13 = (it.get("isbn13") or "").strip()
-        isbn10 = (it.get("isbn") or "").strip()
-        if len(isbn13) == 13:
-            isbns.add(isbn13)
-        elif len(isbn10) in (10,):
-            isbns.add(isbn10)
-
-    if total <= max_results_per_page:
-        return isbns
-
-    # 2) 나머지 페이지 순회 (알라딘 리스트 총합 1,000개 한도)
-    total = min(total, 1000)
-    start = 1 + max_results_per_page
-    while start <= total:
-        data = aladin_client.get_booklist(
-            qt,
-            search_target=search_target,
-            start=start,
-            max_results=max_results_per_page,
-            category_id=category_id,
-        )
-        items = list(_normalize_items(data))
-        if not items:
-            break
-        for it in items:
-            isbn13 = (it.get("isbn13") or "").strip()
-            isbn10 = (it.get("isbn") or "").strip()
-            if len(isbn13) == 13:
-                isbns.add(isbn13)
-            elif len(isbn10) in (10,):
-                isbns.add(isbn10)
-        start += max_results_per_page
-
-    return isbns
+# 목록 응답 항목 -> isbn (13자리 우선, 없으면 10자리)
+def _item_isbn(it: Dict[str, Any]) -> Optional[str]:
+    isbn13 = (it.get("isbn13") or "").strip()
+    isbn10 = (it.get("isbn") or "").strip()
+    if len(isbn13) == 13:
+        return isbn13
+    if len(isbn10) == 10:
+        return isbn10
+    return None
 
 def _last_n_months(n: int) -> list[Tuple[int, int]]:
     """
@@ -88,111 +68,337 @@ def _last_n_months(n: int) -> list[Tuple[int, int]]:
             y -= 1
     return out
 
-# Bestseller를 여러 달 × 1~5주로 훑어서 최대한 많이 수집
-# 같은 책이 여러 주에 걸쳐 중복될 수 있으므로 set으로 dedup
-def _collect_bestseller_multiweeks(
-    months_back: int = BESTSELLER_MONTHS_BACK,
-    search_target: str = "Book",
-) -> Set[str]:
-    isbn_set: Set[str] = set()
-    for (yy, mm) in _last_n_months(months_back):
-        for ww in BESTSELLER_WEEKS:
-            data = aladin_client.get_booklist(
-                "Bestseller",
-                search_target=search_target,
-                start=1,
-                max_results=BESTSELLER_MAX_PER_WEEK,
-                year=yy,
-                month=mm,
-                week=ww,
-            )
-            items = list(_normalize_items(data))
-            if not items:
-                continue  # 해당 달/주에 데이터 없으면 스킵
-            for item in items:
-                isbn13 = (item.get("isbn13") or "").strip()
-                isbn10 = (item.get("isbn") or "").strip()
-                if len(isbn13) == 13:
-                    isbn_set.add(isbn13)
-                elif len(isbn10) == 10:
-                    isbn_set.add(isbn10)
-    return isbn_set
+# 첫 페이지 목록 호출들: (get_booklist kwargs, 나머지 페이지도 볼지)
+# Bestseller는 여러 달 × 1~5주로 훑어서 최대한 많이 수집 (주차별 50개 1페이지)
+def _list_calls(querytypes: Iterable[str], search_targets: Iterable[str]) -> Iterator[Tuple[Dict[str, Any], bool]]:
+    for qt in querytypes:
+        for st in search_targets:
+            if qt == "Bestseller":
+                for (yy, mm) in _last_n_months(BESTSELLER_MONTHS_BACK):
+                    for ww in BESTSELLER_WEEKS:
+                        yield dict(query_type="Bestseller", search_target=st, start=1,
+                                   max_results=BESTSELLER_MAX_PER_WEEK, year=yy, month=mm, week=ww), False
+            else:
+                # 편집자 추천은 CategoryId 있어야 풍부함 — 필요시 대표 카테고리 루프 추가
+                yield dict(query_type=qt, search_target=st, start=1, max_results=100), True
+
+
+def _fetch_list(call: Dict[str, Any], paginate: bool, refresh: bool = False) -> Tuple[list, list]:
+    """목록 1페이지 -> ([(isbn, 항목)], 이어서 호출할 페이지 kwargs 목록)"""
+    data = aladin_client.get_booklist(**call, refresh=refresh)
+    entries = [(isbn, it) for isbn, it in ((_item_isbn(it), it) for it in _normalize_items(data)) if isbn]
+    more = []
+    if paginate and call["start"] == 1:
+        # 알라딘 리스트 총합 1,000개 한도
+        total = min(int(data.get("totalResults", 0) or 0), 1000)
+        step = call["max_results"]
+        more = [{**call, "start": start} for start in range(1 + step, total + 1, step)]
+    return entries, more
+
+
+# normalize_item이 쓰는 필드. 목록 항목에 전부 있으면 상세 조회 불필요
+_ITEM_FIELDS = ("title", "author", "publisher", "pubDate", "cover", "categoryName", "priceStandard", "description")
+
+
+def _merge_items(base: Optional[Dict[str, Any]], other: Dict[str, Any]) -> Dict[str, Any]:
+    """같은 책의 두 응답 항목 합치기: base 값 우선, 비어 있는 필드만 other로 채움"""
+    if base is None:
+        return dict(other)
+    merged = dict(base)
+    for k, v in other.items():
+        if merged.get(k) in (None, "") and v not in (None, ""):
+            merged[k] = v
+    return merged
+
+
+def _is_complete(item: Dict[str, Any]) -> bool:
+    # 설명/저자 등은 원래 빈 값일 수 있으므로 키만 확인, 제목/카테고리는 값까지 (벡터/분류에 필요)
+    return all(k in item for k in _ITEM_FIELDS) and bool(item.get("title")) and bool(item.get("categoryName"))
 
 def _safe_slice(s: str | None, limit: int) -> str:
     s = (s or "").strip()
     return s[:limit]
       
-# select -> update/insert 실행해야 하기 때문에 트랜잭션으로 실행
-@transaction.atomic
-def upsert_book_from_item(item: Dict[str, Any]) -> bool:
-    isbn = (item.get("isbn13") or item.get("isbn")).strip()
+_UPSERT_FIELDS = [
+    "title", "author", "publisher", "published_date", "cover_url",
+    "category", "regular_price", "sale_price", "description",
+]
+
+
+# 상세 조회 항목 -> BookInfo 필드 dict (컬럼 길이에 맞게 자름, 잘못된 값은 None). isbn이 없으면 None
+def normalize_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    isbn = (item.get("isbn13") or item.get("isbn") or "").strip()
     if not isbn or len(isbn) not in {10, 13}:
-        return False
-    
-    title = item.get("title", "").strip()
-    author = _safe_slice(item.get("author"), 255)
-    publisher = item.get("publisher", "").strip()
-    published_date = item.get("pubDate")
-    cover_url = item.get("cover", "").strip()
-    category = item.get("categoryName", "").strip()
-    regular_price = item.get("priceStandard")
-    description = item.get("description", "").strip()
-
-    BookInfo.objects.update_or_create(
-        isbn=isbn,
-        defaults={
-            "title": title,
-            "author": author,
-            "publisher": publisher,
-            "published_date": published_date,
-            "cover_url": cover_url,
-            "category": category,
-            "regular_price": regular_price,
-            "description": description,
-        }
-    )
-    return True
+        return None
+    try:
+        regular_price = int(item.get("priceStandard")) if item.get("priceStandard") is not None else None
+    except (TypeError, ValueError):
+        regular_price = None
+    try:
+        published_date = parse_date(item.get("pubDate") or "")
+    except ValueError:
+        published_date = None
+    return {
+        "isbn": isbn,
+        "title": _safe_slice(item.get("title"), 255),
+        "author": _safe_slice(item.get("author"), 255),
+        "publisher": _safe_slice(item.get("publisher"), 255),
+        "published_date": published_date,
+        "cover_url": _safe_slice(item.get("cover"), 500),
+        "category": _safe_slice(item.get("categoryName"), 50),
+        "regular_price": regular_price,
+        "description": (item.get("description") or "").strip(),
+    }
+
+
+def _vectors(metas: list) -> Optional[list]:
+    """메타 목록 -> vector_bin 목록 (TF-IDF 한 번에 변환). 벡터라이저를 못 쓰면 None"""
+    texts = [build_text_from_meta(m) for m in metas]
+    try:
+        _ensure_vectorizer_loaded(texts[0])
+        return pack_sparse_rows(transform_many(texts))
+    except Exception as e:
+        logger.warning("aladin ingest: vectorize failed, saving without vectors: %s", e)
+        return None
+
+
+def _content_hash(meta: Dict[str, Any]) -> str:
+    raw = json.dumps([meta[k] for k in sorted(meta)], ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def bulk_upsert_books(items: Iterable[Dict[str, Any]]) -> int:
+    """
+    상세 조회 항목들을 INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE 1번으로 저장 (트랜잭션 1개).
+    판매가와 TF-IDF 벡터도 같이 계산 -> 저장 즉시 추천 후보. 처리한 책 수 반환
+    저장된 content_hash와 같으면(메타 변경 없음) 다시 쓰지 않고 fetched_at만 갱신
+    bulk_create는 post_save를 보내지 않으므로 커밋 후 books_upserted 시그널로 캐시 동기화
+    """
+    metas = list({m["isbn"]: m for m in map(normalize_item, items) if m}.values())
+    if not metas:
+        return 0
+    now = timezone.now()
+    hashes = {m["isbn"]: _content_hash(m) for m in metas}
+    # 해시가 같아도 벡터가 없는 행(이전 저장 때 벡터화 실패)은 다시 저장해 벡터를 채움
+    stored = {
+        isbn: h if has_vector else None
+        for isbn, h, has_vector in BookInfo.objects
+        .filter(isbn__in=list(hashes))
+        .annotate(has_vector=ExpressionWrapper(Q(vector_bin__isnull=False), output_field=BooleanField()))
+        .values_list("isbn", "content_hash", "has_vector")
+    }
+    unchanged = [isbn for isbn, h in hashes.items() if stored.get(isbn) == h]
+    changed = [m for m in metas if stored.get(m["isbn"]) != hashes[m["isbn"]]]
+
+    objs = []
+    vectors = _vectors(changed) if changed else None
+    for i, meta in enumerate(changed):
+        # 벡터화에 실패하면 해시를 비워 둠 -> 다음 수집 때 변경된 것으로 보고 다시 저장
+        obj = BookInfo(**meta, fetched_at=now, content_hash=hashes[meta["isbn"]] if vectors is not None else "")
+        obj.sale_price = get_sale_price(obj)
+        if vectors is not None:
+            obj.vector_bin = vectors[i]
+        objs.append(obj)
 
-# 1) 각 쿼리타입으로 리스트 1회 호출 -> isbn 수집
-# 2) 수집된 isbn으로 상세 조회 -> upsert
-# run() 안에서: 타겟/카테고리 확장 루프 추가
-def run(querytypes: Optional[Iterable[str]] | None=None, dry_run: bool = False) -> dict:
-    qts = querytypes or QUERYTYPES
-    all_isbns: Set[str] = set()
+    fields = _UPSERT_FIELDS + ["fetched_at", "content_hash"] + (["vector_bin"] if vectors is not None else [])
+    # MySQL은 충돌 대상 컬럼을 지정하지 않음 (PK/unique 전체 기준)
+    unique = ["isbn"] if connection.features.supports_update_conflicts_with_target else None
+    with transaction.atomic():
+        if unchanged:
+            BookInfo.objects.filter(isbn__in=unchanged).update(fetched_at=now)
+        if objs:
+            BookInfo.objects.bulk_create(objs, update_conflicts=True, update_fields=fields, unique_fields=unique)
+            notify_books_upserted(objs)
+    return len(metas)
+
+
+def _fresh_isbns(isbns: list, since: datetime) -> Set[str]:
+    """isbns 중 since 이후에 받아 벡터까지 저장한 것 (isbn__in 청크 단위 조회)"""
+    fresh: Set[str] = set()
+    for i in range(0, len(isbns), 5000):
+        fresh.update(BookInfo.objects
+                     .filter(isbn__in=isbns[i:i + 5000], fetched_at__gte=since, vector_bin__isnull=False)
+                     .values_list("isbn", flat=True))
+    return fresh
+
+
+# 단건 저장 (bulk_upsert_books와 같은 경로)
+def upsert_book_from_item(item: Dict[str, Any]) -> bool:
+    return bulk_upsert_books([item]) == 1
+
+_DONE = object()
+
+
+def _produce(calls: list, list_pool: ThreadPoolExecutor, lookup_pool: ThreadPoolExecutor,
+             out: queue.Queue, stats: dict, cancel: threading.Event, refresh: bool = False,
+             fresh_since: Optional[datetime] = None) -> None:
+    """
+    1) list + 2) lookup 단계. 끝나면 out에 _DONE (cancel이 서면 남은 호출은 건너뜀)
+    목록 항목이 완전하면 바로 out으로, 아니면 다른 목록의 같은 책과 합쳐 보고 끝까지 모자라면 상세 조회
+    fresh_since가 있으면 목록을 다 모은 뒤 그 이후에 받은 isbn은 빼고 진행
+    """
+    seen: Set[str] = set()
+    sent: Set[str] = set()  # out으로 보낸(또는 조회 예약한) isbn
+    partial: Dict[str, Dict[str, Any]] = {}  # 아직 필드가 모자란 목록 항목 (isbn -> 합친 항목)
+    collected: Dict[str, Dict[str, Any]] = {}  # fresh_since 모드: 전부 모은 뒤 처리
+    lookups = []
+    lock = threading.Lock()
+
+    def emit(isbn: str, item: Dict[str, Any]) -> None:
+        sent.add(isbn)
+        stats["from_list"] += 1
+        out.put({**item, "isbn13": isbn})  # normalize_item이 고른 isbn을 쓰도록
+
+    def lookup(isbn: str, base: Optional[Dict[str, Any]]) -> None:
+        if cancel.is_set():
+            return
+        try:
+            items = list(_normalize_items(aladin_client.item_lookup(isbn, refresh=refresh)))
+        except Exception as e:
+            logger.warning("aladin ingest: lookup %s failed: %s", isbn, e)
+            with lock:
+                stats["lookup_failed"] += 1
+            return
+        if items:
+            out.put(_merge_items(items[0], base or {}))
+
+    def schedule_lookup(isbn: str, base: Optional[Dict[str, Any]]) -> None:
+        sent.add(isbn)
+        stats["lookups"] += 1
+        lookups.append(lookup_pool.submit(lookup, isbn, base))
+
+    try:
+        pending = [list_pool.submit(_fetch_list, call, paginate, refresh) for call, paginate in calls]
+        while pending and not cancel.is_set():
+            fut = pending.pop(0)
+            try:
+                entries, more = fut.result()
+            except Exception as e:
+                logger.warning("aladin ingest: list page failed: %s", e)
+                stats["list_failed"] += 1
+                continue
+            pending += [list_pool.submit(_fetch_list, call, False, refresh) for call in more]
+            for isbn, item in entries:
+                seen.add(isbn)
+                if fresh_since is not None:
+                    collected[isbn] = _merge_items(collected.get(isbn), item)
+                    continue
+                if isbn in sent:
+                    continue
+                merged = _merge_items(partial.pop(isbn, None), item)
+                if _is_complete(merged):
+                    emit(isbn, merged)
+                else:
+                    partial[isbn] = merged
+
+        if fresh_since is not None and not cancel.is_set():
+            fresh = _fresh_isbns(list(collected), fresh_since)
+            stats["skipped"] = len(fresh)
+            for isbn, item in collected.items():
+                if isbn in fresh:
+                    continue
+                if _is_complete(item):
+                    emit(isbn, item)
+                else:
+                    partial[isbn] = item
+        # 목록만으로 모자란 책만 상세 조회
+        for isbn, item in partial.items():
+            if not cancel.is_set():
+                schedule_lookup(isbn, item)
+        for fut in lookups:
+            fut.result()
+    finally:
+        stats["isbn_count"] = len(seen)
+        out.put(_DONE)
+        if fresh_since is not None:
+            connection.close()  # 이 스레드의 DB 연결
+
+
+# 1) 쿼리타입별 목록 호출 -> isbn 수집 (동시에)
+# 2) 목록 항목에 필드가 모자란 isbn만 상세 조회 (동시에, 속도 제한)
+# 3) 받은 순서대로 모아서 bulk upsert (이 스레드), 배치마다 체크포인트 갱신
+# 알라딘 응답은 디스크 캐시를 거침 (refresh=True면 캐시를 무시하고 새로 받아 덮어씀)
+# incremental=True면 ALADIN_INGEST_STALE_DAYS 안에 받은 책은 다시 조회하지 않음
+# resume=True(기본)면 중단된 실행을 이어받음 (그 실행 시작 이후 저장된 책은 건너뜀)
+def run(querytypes: Optional[Iterable[str]] | None=None, dry_run: bool = False,
+        concurrency: Optional[int] = None, refresh: bool = False,
+        incremental: bool = False, resume: bool = True) -> dict:
+    qts = list(querytypes or QUERYTYPES)
 
     # 국내도서만 검색(외국도서/ebook 등은 제외)
     search_targets = ["Book"]
 
-    # 편집자 추천은 카테고리 필수 → 대표 카테고리 몇 개 루프
-    editor_choice_categories = [1, 55889, 51311, 170]  # 예: 국내도서/외국도서/경제경영/IT모바일 등 (필요에 맞게 조정)
-
-    for qt in qts:
-        for st in search_targets:
-            if qt == "Bestseller":
-                # 과거 여러 주차까지 긁기
-                all_isbns |= _collect_bestseller_multiweeks(
-                    months_back=BESTSELLER_MONTHS_BACK,
-                    search_target=st,
-                )
-            elif qt == "ItemEditorChoice":
-                # 편집자 추천은 CategoryId 있어야 풍부함 — 필요시 대표 카테고리 루프 추가
-                all_isbns |= _collect_isbns_for_querytype(qt, search_target=st, category_id=None)
-            else:
-                all_isbns |= _collect_isbns_for_querytype(qt, search_target=st)
+    fresh_since = None
+    if incremental:
+        fresh_since = timezone.now() - timedelta(days=float(getattr(settings, "ALADIN_INGEST_STALE_DAYS", 30)))
+    # 조회할 isbn을 정하는 옵션도 같아야 이어받음 (증분 실행이 전체 실행을 이어받지 않게)
+    params = {"incremental": incremental, "refresh": refresh}
+    checkpoint, resumed = (None, False) if dry_run else IngestRun.begin(
+        "ingest", querytypes=qts, params=params, resume=resume,
+    )
+    if resumed:
+        fresh_since = min(fresh_since or checkpoint.started_at, checkpoint.started_at)
 
+    workers = max(int(concurrency or getattr(settings, "ALADIN_CONCURRENCY", 8)), 1)
+    out: queue.Queue = queue.Queue(maxsize=workers * 4)
+    stats = {"isbn_count": 0, "skipped": 0, "from_list": 0, "lookups": 0, "list_failed": 0, "lookup_failed": 0}
+    calls = list(_list_calls(qts, search_targets))
+    cancel = threading.Event()
 
+    batch_size = max(int(getattr(settings, "ALADIN_UPSERT_BATCH", 500)), 1)
+    buf: list = []
     saved_count = 0
-    for isbn in all_isbns:
-        detail = aladin_client.item_lookup(isbn)
-        items = list(_normalize_items(detail))
-        if not items:
-            continue
-        if not dry_run:
-            if upsert_book_from_item(items[0]):
-                saved_count += 1
+
+    def flush() -> int:
+        n = bulk_upsert_books(buf)
+        checkpoint.heartbeat(saved_count=F("saved_count") + n)
+        return n
+
+    with ThreadPoolExecutor(max(workers // 2, 1), thread_name_prefix="aladin-list") as list_pool, \
+            ThreadPoolExecutor(workers, thread_name_prefix="aladin-lookup") as lookup_pool:
+        producer = threading.Thread(
+            target=_produce, args=(calls, list_pool, lookup_pool, out, stats, cancel, refresh, fresh_since),
+            name="aladin-ingest", daemon=True,
+        )
+        producer.start()
+        try:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    break
+                if dry_run:
+                    continue
+                buf.append(item)
+                if len(buf) >= batch_size:
+                    saved_count += flush()
+                    buf = []
+            if buf:
+                saved_count += flush()
+        except BaseException:
+            # 저장 실패 -> 남은 조회 취소, 큐를 비워 조회 스레드가 막히지 않게 한 뒤 그대로 올림 (다음 실행이 이어받음)
+            cancel.set()
+            while out.get() is not _DONE:
+                pass
+            if checkpoint is not None:
+                IngestRun.objects.filter(pk=checkpoint.pk).update(status="FAILED")
+            raise
+        finally:
+            producer.join()
+
+    if checkpoint is not None:
+        IngestRun.objects.filter(pk=checkpoint.pk).update(
+            status="DONE", finished_at=timezone.now(),
+            isbn_count=stats["isbn_count"], skipped_count=stats["skipped"],
+        )
 
     return {
         "querytypes": qts,
-        "isbn_count": len(all_isbns),
-        "saved_count": saved_count
-    }
\ No newline at end of file
+        "isbn_count": stats["isbn_count"],
+        "skipped_count": stats["skipped"],
+        "saved_count": saved_count,
+        "from_list": stats["from_list"],
+        "lookup_count": stats["lookups"],
+        "list_failed": stats["list_failed"],
+        "lookup_failed": stats["lookup_failed"],
+        "resumed": resumed,
+    }
@@ -0,0 +1,127 @@
+# bookinfo/service/cover_refresh.py
+# BookInfo.cover_url을 알라딘 큰 표지(Cover=Big)로 일괄 갱신
+# - isbn 순서로 ALADIN_COVER_CHUNK개씩 읽어 청크마다 스레드 풀에서 동시에 상세 조회
+#   (속도 제한/429·5xx 백오프/재시도/응답 캐시는 aladin_client)
+# - 청크가 끝날 때마다 바뀐 것만 bulk_update + 체크포인트(IngestRun.cursor = 청크 마지막 isbn) -> 메모리 일정
+# - 중단된 실행이 있으면 지난번 조회 실패한 isbn(IngestRun.failed_isbns)을 먼저 다시 조회하고 cursor 다음 isbn부터 이어받음
+#   실패가 남은 실행은 DONE 대신 PAUSED -> 다음 실행에서 다시 조회
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import aladin_client
+from bookinfo.models import BookInfo, IngestRun
+from bookinfo.signals import notify_books_upserted
+
+logger = logging.getLogger(__name__)
+
+_URL_MAX = BookInfo._meta.get_field("cover_url").max_length
+# books_upserted 수신측(검색 색인, item_matrix)이 읽는 필드까지 같이 읽음
+_ROW_FIELDS = ("isbn", "cover_url", "title", "author", "category", "vector_bin", "vector")
+
+
+def fetch_cover_big(isbn: str, refresh: bool = False) -> Optional[str]:
+    """알라딘 API에서 cover=big URL 얻기"""
+    data = aladin_client.item_lookup(isbn, refresh=refresh, cover="Big")
+    items = data.get("item") or data.get("items") or []
+    if isinstance(items, dict):
+        items = [items]
+    if not items:
+        return None
+    return (items[0].get("cover") or "")[:_URL_MAX] or None
+
+
+def _lookup(isbn: str, refresh: bool) -> Tuple[str, Optional[str], Optional[Exception]]:
+    try:
+        return isbn, fetch_cover_big(isbn, refresh), None
+    except Exception as e:
+        return isbn, None, e
+
+
+def _save(changed: list, checkpoint: Optional[IngestRun], cursor: str, done: int, failed: list) -> None:
+    """
+    청크 결과 저장 + 체크포인트를 한 트랜잭션으로 (중간에 죽어도 cursor와 DB가 어긋나지 않음)
+    bulk_update는 post_save가 없으므로 bulk_upsert_books처럼 books_upserted로 캐시 동기화 (커밋 후)
+    """
+    with transaction.atomic():
+        if changed:
+            BookInfo.objects.bulk_update(changed, ["cover_url"], batch_size=500)
+            notify_books_upserted(changed)
+        if checkpoint is not None:
+            checkpoint.heartbeat(
+                cursor=cursor, failed_isbns=failed,
+                isbn_count=F("isbn_count") + done, saved_count=F("saved_count") + len(changed),
+            )
+
+
+# only_missing=True면 cover_url이 비어 있는 책만
+# limit: 이번 실행에서 처리할 최대 권수 (테스트용)
+# progress(result): 청크마다 누적 결과(dict)로 호출
+def run(only_missing: bool = False, limit: Optional[int] = None, dry_run: bool = False,
+        concurrency: Optional[int] = None, refresh: bool = False, resume: bool = True,
+        progress: Optional[Callable[[dict], None]] = None) -> dict:
+    qs = BookInfo.objects.all()
+    if only_missing:
+        qs = qs.filter(Q(cover_url__isnull=True) | Q(cover_url=""))
+
+    params = {"only_missing": only_missing}
+    checkpoint, resumed = (None, False) if dry_run else IngestRun.begin("cover", params=params, resume=resume)
+    cursor = checkpoint.cursor if resumed else ""
+    retry = sorted(checkpoint.failed_isbns) if resumed else []  # 지난 실행에서 실패한 isbn
+    failed: set = set()
+
+    workers = max(int(concurrency or getattr(settings, "ALADIN_CONCURRENCY", 8)), 1)
+    chunk = max(int(getattr(settings, "ALADIN_COVER_CHUNK", 500)), 1)
+    result = {"processed": 0, "changed": 0, "missing": 0, "failed": 0, "cursor": cursor, "resumed": resumed}
+
+    try:
+        with ThreadPoolExecutor(workers, thread_name_prefix="aladin-cover") as pool:
+            while limit is None or result["processed"] < limit:
+                n = chunk if limit is None else min(chunk, limit - result["processed"])
+                if retry:
+                    batch, retry = retry[:n], retry[n:]
+                    rows = list(qs.filter(isbn__in=batch).order_by("isbn").only(*_ROW_FIELDS))
+                    next_cursor = cursor
+                else:
+                    rows = list(qs.filter(isbn__gt=cursor).order_by("isbn").only(*_ROW_FIELDS)[:n])
+                    if not rows:
+                        break
+                    next_cursor = rows[-1].isbn
+                current = {b.isbn: b for b in rows}
+                changed = []
+                for isbn, cover, err in pool.map(lambda isbn: _lookup(isbn, refresh), current):
+                    if err is not None:
+                        logger.warning("cover refresh: %s failed: %s", isbn, err)
+                        failed.add(isbn)
+                        result["failed"] += 1
+                    elif not cover:
+                        result["missing"] += 1
+                    elif cover != current[isbn].cover_url:
+                        current[isbn].cover_url = cover
+                        changed.append(current[isbn])
+                cursor = next_cursor
+                if not dry_run:
+                    _save(changed, checkpoint, cursor, len(rows), sorted(failed.union(retry)))
+                result["processed"] += len(rows)
+                result["changed"] += len(changed)
+                result["cursor"] = cursor
+                if progress is not None:
+                    progress(dict(result))
+    except BaseException:
+        if checkpoint is not None:
+            IngestRun.objects.filter(pk=checkpoint.pk).update(status="FAILED")
+        raise
+
+    if checkpoint is not None:
+        # limit으로 끊겼거나 조회 실패가 남은 실행은 다음에 이어받도록 PAUSED
+        finished = (limit is None or result["processed"] < limit) and not failed and not retry
+        IngestRun.objects.filter(pk=checkpoint.pk).update(
+            status="DONE" if finished else "PAUSED", finished_at=timezone.now() if finished else None,
+            failed_isbns=sorted(failed.union(retry)),
+        )
+    return result
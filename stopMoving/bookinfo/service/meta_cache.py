@@ -0,0 +1,90 @@
+# bookinfo/service/meta_cache.py
+# BookInfo 메타(제목/저자/표지 등) read-through 캐시
+#   1) 요청 단위 identity map: 한 요청 안에서는 같은 책을 두 번 읽지 않음 (config.middleware.BookInfoIdentityMapMiddleware)
+#   2) Django cache (settings.CACHES, locmem/file): 요청 간 공유, BOOKINFO_CACHE_TTL초
+#   3) DB: 없는 것만 isbn__in 1번으로 조회 후 캐시에 채움
+# 저장/삭제 시그널(bookinfo/signals.py)에서 invalidate()
+# 벡터(vector, vector_bin)는 캐시하지 않음 -> 접근하면 Django가 그 행만 다시 읽음
+import contextvars
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..models import BookInfo
+
+META_FIELDS = (
+    "isbn", "title", "author", "publisher", "published_date", "cover_url",
+    "category", "regular_price", "sale_price", "description",
+)
+_KEY = "bookinfo:meta:v1:{}"
+
+_identity: contextvars.ContextVar = contextvars.ContextVar("bookinfo_identity_map", default=None)
+
+
+@contextmanager
+def identity_map():
+    """이 블록 안에서 읽은 BookInfo는 같은 인스턴스를 재사용 (요청 1개 = 블록 1개)"""
+    token = _identity.set({})
+    try:
+        yield
+    finally:
+        _identity.reset(token)
+
+
+def _cache():
+    return caches[getattr(settings, "BOOKINFO_CACHE_ALIAS", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "BOOKINFO_CACHE_TTL", 3600))
+
+
+def _from_row(row: tuple) -> BookInfo:
+    # DB에서 읽은 것과 같은 상태의 인스턴스 (벡터 필드는 deferred)
+    return BookInfo.from_db("default", list(META_FIELDS), list(row))
+
+
+def get_books(isbns: Iterable[str]) -> dict:
+    """isbn 목록 -> {isbn: BookInfo} (없는 isbn은 빠짐). identity map -> cache.get_many -> DB 순"""
+    wanted = list(dict.fromkeys(str(i) for i in isbns if i))
+    found: dict = {}
+    imap = _identity.get()
+    if imap is not None:
+        for isbn in wanted:
+            if isbn in imap:
+                found[isbn] = imap[isbn]
+
+    missing = [i for i in wanted if i not in found]
+    if missing:
+        cache = _cache()
+        hits = cache.get_many([_KEY.format(i) for i in missing])
+        for isbn in missing:
+            row = hits.get(_KEY.format(isbn))
+            if row is not None:
+                found[isbn] = _from_row(row)
+
+        missing = [i for i in missing if i not in found]
+        if missing:
+            rows = list(BookInfo.objects.filter(isbn__in=missing).values_list(*META_FIELDS))
+            cache.set_many({_KEY.format(r[0]): r for r in rows}, timeout=_ttl())
+            for r in rows:
+                found[r[0]] = _from_row(r)
+
+    if imap is not None:
+        imap.update(found)
+    return found
+
+
+def get_book(isbn: str) -> Optional[BookInfo]:
+    return get_books([isbn]).get(str(isbn))
+
+
+def invalidate(isbns: Iterable[str]) -> None:
+    keys = [str(i) for i in isbns]
+    _cache().delete_many([_KEY.format(i) for i in keys])
+    imap = _identity.get()
+    if imap is not None:
+        for isbn in keys:
+            imap.pop(isbn, None)
@@ -0,0 +1,171 @@
+# bookinfo/service/search_index.py
+# 책 검색용 인메모리 역색인 (프로세스 단위)
+# 제목(공백 제거)/저자/ISBN을 글자 1-gram + 2-gram으로 색인 -> 한글도 형태소 분석 없이 부분 일치 검색
+# 후보는 n-gram posting 교집합으로 좁히고, 실제 포함 여부를 한 번 더 확인해서 icontains와 같은 결과를 냄
+import base64
+import heapq
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from core.ttl_snapshot import TTLSnapshot
+
+logger = logging.getLogger(__name__)
+
+# 정렬 키: (tier, title, isbn) -> 작을수록 상위
+SortKey = Tuple[int, str, str]
+
+
+def _norm(text: str) -> str:
+    return (text or "").lower().replace(" ", "")
+
+
+def _index_grams(text: str) -> set:
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(word: str) -> set:
+    if len(word) < 2:
+        return {word}
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[SortKey]:
+    try:
+        tier, title, isbn = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (int(tier), str(title), str(isbn))
+    except Exception:
+        return None
+
+
+class BookSearchIndex:
+    """
+    - 최초 search()에서 BookInfo(isbn, title, author) 전체로 1회 빌드, BOOK_SEARCH_INDEX_TTL(초)마다 재빌드 (core.ttl_snapshot)
+    - BookInfo 저장/삭제 시 upsert()/remove()로 해당 책만 갱신
+    색인 = (docs: isbn -> (title, title_key, author_key), postings: gram -> {isbn}), 갱신은 lock 안에서 제자리 수정
+    """
+
+    def __init__(self):
+        self._cache: TTLSnapshot[tuple] = TTLSnapshot("BOOK_SEARCH_INDEX_TTL")
+
+    def _index(self, db_alias: str = "default") -> tuple:
+        return self._cache.get(lambda: self._build(db_alias))
+
+    def _build(self, db_alias: str):
+        from bookinfo.models import BookInfo
+
+        started = time.monotonic()
+        docs: dict = {}
+        postings: dict = defaultdict(set)
+        qs = BookInfo.objects.using(db_alias).values_list("isbn", "title", "author")
+        for isbn, title, author in qs.iterator(chunk_size=5000):
+            doc = (title or "", _norm(title), _norm(author))
+            docs[isbn] = doc
+            for g in self._doc_grams(isbn, doc):
+                postings[g].add(isbn)
+        logger.info("book_search_index: built %d docs in %.2fs", len(docs), time.monotonic() - started)
+        return docs, postings
+
+    @staticmethod
+    def _doc_grams(isbn: str, doc) -> set:
+        _, title_key, author_key = doc
+        return _index_grams(title_key) | _index_grams(author_key) | _index_grams(isbn.lower())
+
+    def _remove_locked(self, docs: dict, postings: dict, isbn: str) -> None:
+        old = docs.pop(isbn, None)
+        if old is None:
+            return
+        for g in self._doc_grams(isbn, old):
+            s = postings.get(g)
+            if s is not None:
+                s.discard(isbn)
+                if not s:
+                    del postings[g]
+
+    # 제목/저자 변경 반영 (빌드 전이면 무시)
+    def upsert(self, isbn: str, title: str, author: str) -> None:
+        if self._cache.peek() is None:
+            return
+        doc = (title or "", _norm(title), _norm(author))
+        with self._cache.lock:
+            docs, postings = self._cache.peek()
+            self._remove_locked(docs, postings, isbn)
+            docs[isbn] = doc
+            for g in self._doc_grams(isbn, doc):
+                postings[g].add(isbn)
+
+    def remove(self, isbn: str) -> None:
+        if self._cache.peek() is None:
+            return
+        with self._cache.lock:
+            docs, postings = self._cache.peek()
+            self._remove_locked(docs, postings, isbn)
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def _rank(self, doc, isbn: str, q_key: str, words: List[str]) -> SortKey:
+        title, title_key, _ = doc
+        if title_key == q_key:
+            tier = 0  # 제목 완전 일치
+        elif title_key.startswith(words[0]):
+            tier = 1  # 제목이 첫 단어로 시작
+        elif all(w in title_key for w in words):
+            tier = 2  # 모든 단어가 제목에 포함
+        else:
+            tier = 3  # 저자/ISBN 일치 포함
+        return (tier, title, isbn)
+
+    def search(self, q: str, limit: int, after: Optional[SortKey] = None,
+               offset: int = 0, db_alias: str = "default") -> Tuple[int, List[Tuple[SortKey, str]]]:
+        """
+        공백으로 나눈 모든 단어가 (제목 공백무시 | 저자 | ISBN) 중 하나에 포함된 책을 순위대로 반환.
+        after(이전 페이지 마지막 정렬 키)가 있으면 그 다음부터(keyset), 없으면 offset부터.
+        반환: (전체 일치 수, [(정렬 키, isbn), ...])
+        """
+        words = [w for w in (_norm(w) for w in q.split()) if w]
+        if not words:
+            return 0, []
+        q_key = "".join(words)
+        docs, postings = self._index(db_alias)
+
+        with self._cache.lock:
+            cand = None
+            for w in words:
+                for g in sorted(_query_grams(w), key=lambda g: len(postings.get(g, ()))):
+                    posting = postings.get(g)
+                    if not posting:
+                        return 0, []
+                    cand = set(posting) if cand is None else cand & posting
+                    if not cand:
+                        return 0, []
+
+            keys = []
+            for isbn in cand:
+                doc = docs.get(isbn)
+                if doc is None:
+                    continue
+                _, title_key, author_key = doc
+                haystacks = (title_key, author_key, isbn.lower())
+                if all(any(w in h for h in haystacks) for w in words):
+                    keys.append(self._rank(doc, isbn, q_key, words))
+
+        total = len(keys)
+        if after is not None:
+            keys = [k for k in keys if k > after]
+            offset = 0
+        # 전체 정렬 대신 필요한 만큼만 힙으로 선택
+        top = heapq.nsmallest(offset + limit, keys)[offset:]
+        return total, [(k, k[2]) for k in top]
+
+
+book_search_index = BookSearchIndex()
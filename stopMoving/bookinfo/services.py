@@ -4,8 +4,8 @@ from django.conf import settings
 from .models import BookInfo
 from .serializers import BookInfoUpsertSerializer
 from preferences.services.embeddings import (
-            load_vectorizer, ensure_vectorizer,
-            build_text_from_bookinfo, serialize_sparse,
+            load_vectorizer, ensure_vectorizer, transform_many,
+            build_text_from_bookinfo, pack_sparse,
             build_text_from_meta
         )
 from django.db import transaction
@@ -29,7 +29,7 @@ def ensure_bookinfo(isbn: str):
     # DB에 존재하면 return
     info = BookInfo.objects.filter(isbn=isbn).first()
     if info:
-        if not info.vector:
+        if not (info.vector_bin or info.vector):
             _attach_vector_if_missing(info)
         return info
 
@@ -73,46 +73,41 @@ def ensure_bookinfo(isbn: str):
         }
 
         # TF-IDF 벡터 계산
-        try:
-            vec = load_vectorizer()
-        except Exception:
-            # vectorizer.pkl이 없으면 최소 코퍼스로 1회 학습
-            corpus = [build_text_from_bookinfo(bi) for bi in BookInfo.objects.all()[:5000]]
-            if not corpus:
-                corpus = [build_text_from_meta(meta)]
-            vec = ensure_vectorizer(corpus)
-
         text = build_text_from_meta(meta)
-        vector_json = serialize_sparse(vec.transform([text]))
+        _ensure_vectorizer_loaded(text)
+        vector_bin = pack_sparse(transform_many([text]))
 
         with transaction.atomic():
             ser = BookInfoUpsertSerializer(data=meta)
             ser.is_valid(raise_exception=True)
             info = ser.save()
-            info.vector = vector_json
-            info.save(update_fields=["vector"])
+            info.vector_bin = vector_bin
+            info.save(update_fields=["vector_bin"])
             return info
     except Exception:
         return None
 
 
 
+# vectorizer.pkl이 없으면 최소 코퍼스로 1회 학습 (있으면 프로세스 캐시 사용)
+def _ensure_vectorizer_loaded(fallback_text: str) -> None:
+    try:
+        load_vectorizer()
+    except Exception:
+        corpus = [build_text_from_bookinfo(bi) for bi in BookInfo.objects.all()[:5000]]
+        if not corpus:
+            corpus = [fallback_text]
+        ensure_vectorizer(corpus)
+
 # bookinfo 조회했는데 vector 칸만 비어있을 때 사용
 def _attach_vector_if_missing(info: BookInfo) -> None:
-    if info.vector:
+    if info.vector_bin or info.vector:
         return
     try:
-        try:
-            vec = load_vectorizer()
-        except Exception:
-            corpus = [build_text_from_bookinfo(bi) for bi in BookInfo.objects.all()[:5000]]
-            if not corpus:
-                corpus = [build_text_from_bookinfo(info)]
-            vec = ensure_vectorizer(corpus)
-
         text = build_text_from_bookinfo(info)
-        info.vector = serialize_sparse(vec.transform[text])
-        info.save(update_fields=["vector"])
+        _ensure_vectorizer_loaded(text)
+        info.vector_bin = pack_sparse(transform_many([text]))
+        info.save(update_fields=["vector_bin"])
     except Exception:
         pass
       
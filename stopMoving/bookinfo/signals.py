@@ -0,0 +1,96 @@
+# bookinfo/signals.py
+# BookInfo 변경 -> 검색 색인(book_search_index), 메타 캐시(meta_cache)에 반영
+# BookInfoLibrary 재고 변경 -> stock_changed 시그널 (도서관별 추천 후보 등 캐시 동기화용)
+# BookInfo 대량 저장(bulk_create, post_save 없음) -> books_upserted 시그널
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import BookInfo, BookInfoLibrary
+from .service import meta_cache
+from .service.search_index import book_search_index
+
+# kwargs: library_id, isbn, quantity, status
+stock_changed = Signal()
+
+
+def notify_stock_changed(bil: BookInfoLibrary) -> None:
+    """
+    재고 행의 수량/상태가 바뀐 뒤 호출 (quantity를 F()로 update하는 경로는 post_save가 안 불리므로 직접 호출).
+    롤백된 변경이 캐시에 남지 않도록 커밋 후 전송.
+    """
+    library_id, isbn = bil.library_id_id, bil.isbn_id
+    quantity, status = bil.quantity, bil.status
+    transaction.on_commit(lambda: stock_changed.send(
+        sender=BookInfoLibrary, library_id=library_id, isbn=isbn, quantity=quantity, status=status,
+    ))
+
+# kwargs: books (저장된 BookInfo 인스턴스 목록)
+books_upserted = Signal()
+
+
+def notify_books_upserted(books) -> None:
+    """
+    bulk_create(update_conflicts=True) 등 post_save 없이 BookInfo를 저장한 뒤 호출.
+    메타 캐시는 지금 지우고, 나머지 캐시는 커밋 후 books_upserted로 반영
+    """
+    books = list(books)
+    meta_cache.invalidate([b.isbn for b in books])
+    transaction.on_commit(lambda: books_upserted.send(sender=BookInfo, books=books))
+
+_SEARCH_FIELDS = {"title", "author"}
+
+
+@receiver(post_save, sender=BookInfo)
+def sync_search_index_on_save(sender, instance, update_fields=None, **kwargs):
+    # 제목/저자와 무관한 저장(vector, cover_url 등)은 건너뜀
+    if update_fields is not None and not (_SEARCH_FIELDS & set(update_fields)):
+        return
+    isbn, title, author = instance.isbn, instance.title, instance.author
+    transaction.on_commit(lambda: book_search_index.upsert(isbn, title, author))
+
+
+@receiver(post_delete, sender=BookInfo)
+def sync_search_index_on_delete(sender, instance, **kwargs):
+    isbn = instance.isbn
+    transaction.on_commit(lambda: book_search_index.remove(isbn))
+
+
+_VECTOR_FIELDS = {"vector", "vector_bin"}
+
+
+# 메타 캐시: 지금 지우고(같은 요청/트랜잭션 안의 재조회용) 커밋 후 한 번 더 지움(그 사이 다른 요청이 옛 값을 채웠을 수 있음)
+@receiver(post_save, sender=BookInfo)
+def invalidate_meta_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= _VECTOR_FIELDS:
+        return
+    isbn = instance.isbn
+    meta_cache.invalidate([isbn])
+    transaction.on_commit(lambda: meta_cache.invalidate([isbn]))
+
+
+@receiver(post_delete, sender=BookInfo)
+def invalidate_meta_on_delete(sender, instance, **kwargs):
+    isbn = instance.isbn
+    meta_cache.invalidate([isbn])
+    transaction.on_commit(lambda: meta_cache.invalidate([isbn]))
+
+
+@receiver(books_upserted)
+def sync_caches_on_bulk_upsert(sender, books, **kwargs):
+    for b in books:
+        book_search_index.upsert(b.isbn, b.title, b.author)
+    meta_cache.invalidate([b.isbn for b in books])
+
+
+@receiver(post_save, sender=BookInfoLibrary)
+def notify_stock_on_save(sender, instance, **kwargs):
+    notify_stock_changed(instance)
+
+
+@receiver(post_delete, sender=BookInfoLibrary)
+def notify_stock_on_delete(sender, instance, **kwargs):
+    library_id, isbn = instance.library_id_id, instance.isbn_id
+    transaction.on_commit(lambda: stock_changed.send(
+        sender=BookInfoLibrary, library_id=library_id, isbn=isbn, quantity=0, status="DELETED",
+    ))
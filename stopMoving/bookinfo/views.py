@@ -11,6 +11,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, Func, F, Value,Window
 from users.models import UserInfo
 from .models import BookInfo
+from .service.meta_cache import get_book, get_books
+from .service.search_index import book_search_index, encode_cursor, decode_cursor
 import random
 from django.db.models.expressions import RawSQL
 from django.db.models.functions import RowNumber
@@ -40,8 +42,8 @@ class DonateBookLookUpAPIView(APIView):
         # if not re.fullmatch(r"\d{10}|\d{13}", isbn):
         #     return Response({"error": "ISBN 형식이 올바르지 않습니다(10 또는 13자리)."}, status=400)
 
-        # 1) DB 먼저
-        obj = BookInfo.objects.filter(isbn=isbn).first()
+        # 1) DB 먼저 (메타 캐시)
+        obj = get_book(isbn)
         if obj:
             #기증이지만 saleprice필요해서 픽업시리얼라이저
             data = PickupDisplaySerializer(obj).data
@@ -102,40 +104,29 @@ class BookSearchAPIView(APIView):
         openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description="검색어"),
         openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
         openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                          description="이전 응답의 next_cursor (있으면 page 무시)"),
     ])
     def get(self, request):
         q = request.GET.get('q', '').strip()
         if not q:
             return Response({"detail": "q는 필수입니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        
-        keywords = q.split()
-
-        # 공백 무시용 임시필드
-        base = BookInfo.objects.annotate(
-            title_no_space=Func(F('title'), Value(' '), Value(''), function='REPLACE')
+        # 페이지네이션 (cursor 우선, 없으면 page)
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', 20)), 1), 100)
+        cursor = request.GET.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        if cursor and after is None:
+            return Response({"detail": "cursor가 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 단어 모두 포함(AND) + 공백무시 매칭, 순위순 (인메모리 색인)
+        total, hits = book_search_index.search(
+            q, limit=page_size, after=after, offset=(page - 1) * page_size,
         )
-
-        # 단어 모두 포함(AND) + 공백무시 매칭
-        cond = Q()
-        for w in keywords:
-            nw = w.replace(' ', '')
-            cond &= (
-                Q(title__icontains=w) |
-                Q(author__icontains=w) |
-                Q(isbn__icontains=w) |
-                Q(title_no_space__icontains=nw)
-            )
-
-        qs = base.filter(cond).order_by('title')
-
-        # 페이지네이션
-        page = int(request.GET.get('page', 1))
-        page_size = int(request.GET.get('page_size', 20))
-        start, end = (page - 1) * page_size, page * page_size
         
         # 검색어에 맞는 책이 없을 경우
-        if len(qs) == 0:
+        if total == 0:
             search_q = request.GET.get('q', '')
             msg = f'"{search_q}" 은\n북작북작에 나눔되지 않았습니다.'
 
@@ -145,13 +136,15 @@ class BookSearchAPIView(APIView):
             rand_index = random.randint(0,4)
             recommend_isbn = isbn_list[rand_index]
 
-            obj = BookInfo.objects.get(isbn=recommend_isbn)
+            obj = get_book(recommend_isbn)
 
             data = BookSummarySerializer(obj).data
 
             return Response({"msg":msg, "data": data})
         
 
+        # 현재 페이지 책만 조회 (메타 캐시)
+        books = get_books([isbn for _, isbn in hits])
 
         # 프론트에 필요한 필드만 반환 (제목/저자/출판사/출간일/표지)
         results = [{
@@ -161,9 +154,10 @@ class BookSearchAPIView(APIView):
             "publisher": getattr(b, "publisher", None),
             "published_date": getattr(b, "published_date", None),
             "cover_url": getattr(b, "cover_url", None)
-        } for b in qs[start:end]]
+        } for b in (books.get(isbn) for _, isbn in hits) if b is not None]
 
-        return Response({"count": qs.count(), "results": results}, status=200)
+        next_cursor = encode_cursor(hits[-1][0]) if len(hits) == page_size else None
+        return Response({"count": total, "results": results, "next_cursor": next_cursor}, status=200)
         
 # 설문조사 시 책 목록 보여주기용
 class BookListView(APIView):
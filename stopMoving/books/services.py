@@ -3,18 +3,35 @@ from django.db.models import F
 from django.db import transaction
 from django.utils.text import Truncator
 from rest_framework.response import Response
-from preferences.services.embeddings import deserialize_sparse, l2_normalize
-from preferences.services.recommend import apply_boosts, cosine_scores, mmr_rerank
+from preferences.services.embeddings import (
+    book_vector, deserialize_sparse, l2_normalize, l2_normalize_rows, stack_vectors
+)
+from preferences.services.recommend import apply_boosts, boost_query, cosine_scores, mmr_rerank, mmr_rerank_batch
+from preferences.services.item_matrix import item_matrix
+from preferences.services.ann_index import ann_index
 from users.models import UserBook, UserInfo
 from bookinfo.models import BookInfo
+from bookinfo.service.meta_cache import get_books
 from notification.models import Notification
-from notification.service import push
+from notification.service import push_many
 from accounts.models import User
 from rest_framework import status
 import numpy as np
+from scipy import sparse
 
 CATEGORIES = ["소설/시/희곡", "만화", "어린이", "인문학", "에세이", "수험서/자격증", "경제경영", "과학"]
 
+# 추천 카드: RecommendView 응답에 그대로 쓰는 비정규화 payload (목록 저장할 때 같이 저장)
+def book_cards(isbns) -> list:
+    books = get_books(isbns)
+    return [{
+        "isbn": b.isbn,
+        "title": b.title,
+        "author": b.author,
+        "cover_url": b.cover_url,
+        "category": b.category,
+    } for b in (books.get(isbn) for isbn in isbns) if b is not None]
+
 def preference_books_combined(user, db_alias='default', k=5):
     try:
         ui = UserInfo.objects.using(db_alias).get(user=user)
@@ -35,21 +52,6 @@ def preference_books_combined(user, db_alias='default', k=5):
         .values_list("bookinfo_id", flat=True)
     )
 
-    # 후보군 로드
-    items = []
-    for bi in (BookInfo.objects.using(db_alias)
-               .exclude(isbn__in=exclude_isbns)
-               .exclude(vector__isnull=True).iterator()):
-        csr = deserialize_sparse(bi.vector)
-        if csr is None or getattr(csr, "nnz", 0) == 0:
-            continue
-        items.append((bi.isbn, csr))
-
-    # base scores
-    cleaned, M, base_scores = cosine_scores(user_vec, items)
-    if not cleaned:
-        return 
-    
     # 모드별 부스트용 벡터
     sv = deserialize_sparse(getattr(ui, "preference_vector_survey", None))
 
@@ -59,6 +61,16 @@ def preference_books_combined(user, db_alias='default', k=5):
     survey_w = float(getattr(settings, "RECOMMEND_SURVEY_BOOST", 0.25))
     recent_w = float(getattr(settings, "RECOMMEND_RECENT_BOOST", 0.30))
 
+    # 후보군: 프로세스 캐시된 전체 행렬 (본인 책은 점수 마스킹)
+    # 카탈로그가 크면 (유저 + 부스트) 벡터와 가까운 후보만 근사 검색으로 남긴 뒤 정확히 재채점
+    items = item_matrix.get(db_alias)
+    items = ann_index.candidates(items, boost_query(user_vec, sv, survey_w), extra=len(exclude_isbns))
+
+    # base scores
+    isbns, M, base_scores = cosine_scores(user_vec, items, exclude=exclude_isbns)
+    if not isbns:
+        return 
+
     boosted = apply_boosts(
         mode=mode,
         M=M,
@@ -76,14 +88,15 @@ def preference_books_combined(user, db_alias='default', k=5):
 
     if use_div:
         sel_idx = mmr_rerank(M, boosted, k=k, pool=pool, lam=lam)
-        ordered_isbns = [cleaned[i][0] for i in sel_idx]            # ← MMR 순서 보존
+        ordered_isbns = [isbns[i] for i in sel_idx]            # ← MMR 순서 보존
     else:
         idx = np.argsort(-boosted)[:5]
-        ordered_isbns = [cleaned[i][0] for i in idx]
+        ordered_isbns = [isbns[i] for i in idx if np.isfinite(boosted[i])]
         
     # userinfo의 preference_booklist에 isbn 리스트 저장
     ui.preference_book_combined = ordered_isbns
-    ui.save(update_fields=["preference_book_combined"])
+    ui.preference_cards_combined = book_cards(ordered_isbns)
+    ui.save(update_fields=["preference_book_combined", "preference_cards_combined"])
     return None
 
 def preference_books_activity(user, k=5, db_alias='default'):
@@ -108,19 +121,12 @@ def preference_books_activity(user, k=5, db_alias='default'):
         .values_list("bookinfo_id", flat=True)
     )
 
-    # 후보군 로드
-    items = []
-    for bi in (BookInfo.objects.using(db_alias)
-               .exclude(isbn__in=exclude_isbns)
-               .exclude(vector__isnull=True).iterator()):
-        csr = deserialize_sparse(bi.vector)
-        if csr is None or getattr(csr, "nnz", 0) == 0:
-            continue
-        items.append((bi.isbn, csr))
+    # 후보군: 프로세스 캐시된 전체 행렬 (본인 책은 점수 마스킹)
+    items = item_matrix.get(db_alias)
 
     # base scores
-    cleaned, M, base_scores = cosine_scores(user_vec, items)
-    if not cleaned:
+    isbns, M, base_scores = cosine_scores(user_vec, items, exclude=exclude_isbns)
+    if not isbns:
         return 
     
     # 모드별 부스트용 벡터
@@ -135,7 +141,7 @@ def preference_books_activity(user, k=5, db_alias='default'):
                     .select_related("bookinfo")[:n])
     vs = []
     for ub in recent_books:
-        bv = deserialize_sparse(getattr(ub.bookinfo, "vector", None))
+        bv = book_vector(ub.bookinfo)
         if bv is not None and getattr(bv, "nnz", 0) > 0:
             vs.append(bv)
     if vs:
@@ -164,26 +170,26 @@ def preference_books_activity(user, k=5, db_alias='default'):
     lam = float(getattr(settings, "RECOMMEND_MMR_LAMBDA", 0.3))
 
     wanted = len(CATEGORIES) * k
-    k_global = min(wanted * 2, len(cleaned)) # 여유 버퍼(2배 정도)로 MMR 선택
+    n_cand = int(np.isfinite(boosted).sum())
+    k_global = min(wanted * 2, n_cand) # 여유 버퍼(2배 정도)로 MMR 선택
 
     if use_div:
         sel_idx = mmr_rerank(M, boosted, k=k_global, pool=pool, lam=lam)
-        ordered_isbns = [cleaned[i][0] for i in sel_idx]            # ← MMR 순서 보존
+        ordered_isbns = [isbns[i] for i in sel_idx]            # ← MMR 순서 보존
     else:
         idx = np.argsort(-boosted)[:k_global]
-        ordered_isbns = [cleaned[i][0] for i in idx]
+        ordered_isbns = [isbns[i] for i in idx]
 
     # 이 형식으로 preference_book_activity에 저장
     target = {cat: [] for cat in CATEGORIES}
     used = set()
 
-    # 선별된 bookinfo에 대해 isbn, category 저장
-    all_isbns = [t[0] for t in cleaned]
-    isbn_to_cat = dict(BookInfo.objects.using(db_alias)
-                       .filter(isbn__in=all_isbns).values_list("isbn", "category"))
-    
+    # 카테고리는 캐시 행렬에 행 순서대로 같이 들어있음 (전체 isbn IN 조회 불필요)
+    row_of = items.row_of
+    categories = items.categories
+
     def topcat_of(isbn: str) -> str | None:
-        return first_category(isbn_to_cat.get(isbn))
+        return first_category(categories[row_of[isbn]])
     
     # 1차) MMR 순서에서 카테고리별 k개까지 채우기
     filled = 0
@@ -204,7 +210,9 @@ def preference_books_activity(user, k=5, db_alias='default'):
         if len(target[cat]) >= k:
             continue
         for i in order_full_idx:
-            isbn = cleaned[i][0]
+            if not np.isfinite(boosted[i]):
+                break  # 이후는 제외(마스킹)된 후보뿐
+            isbn = isbns[i]
             if isbn in used:
                 continue
             if topcat_of(isbn) == cat:
@@ -216,7 +224,9 @@ def preference_books_activity(user, k=5, db_alias='default'):
 
     # userinfo의 preference_booklist에 isbn 리스트 저장
     ui.preference_book_activity= target
-    ui.save(update_fields=["preference_book_activity"])
+    cards = {c["isbn"]: c for c in book_cards([isbn for cat_isbns in target.values() for isbn in cat_isbns])}
+    ui.preference_cards_activity = {cat: [cards[i] for i in cat_isbns if i in cards] for cat, cat_isbns in target.items()}
+    ui.save(update_fields=["preference_book_activity", "preference_cards_activity"])
     return None
     
 def first_category(long_cat: str | None, base: str = "국내도서"):
@@ -232,20 +242,25 @@ def first_category(long_cat: str | None, base: str = "국내도서"):
 def _load_book_vectors_for_isbns(isbns):
     items, title_of = [], {}
     for bi in (BookInfo.objects.filter(isbn__in=isbns)
-               .only("isbn", "title", "vector").iterator()):
-        csr = deserialize_sparse(getattr(bi, "vector", None))
+               .only("isbn", "title", "vector_bin", "vector").iterator()):
+        csr = book_vector(bi)
         if csr is None or getattr(csr, "nnz", 0) == 0:
             continue
         items.append((bi.isbn, csr))
         title_of[bi.isbn]  = bi.title
     return items, title_of
 
+# 《 》로 감싼 표시용 문자열 생성 (안 길게 30자 정도로 자름)
+def wrap_title(s: str) -> str:
+    inner = Truncator(s).chars(30)
+    return f"《{inner}》"  # 《 ... 》
+
 # donated_isbns에 대해 취향 매칭되는 유저에게 notification 생성
-# combined mode와 동일한 로직으로
-@transaction.atomic
+# combined mode와 동일한 로직을 전체 유저에 대해 행렬 연산으로 한 번에 처리
+# - 유저 벡터를 청크 단위로 쌓아 (유저 x 기증책) 점수를 sparse matmul 1회로 계산
+# - 소유 여부는 쿼리 1회, 알림은 bulk insert
 def preference_notification(donor_user, donated_isbns, k: int = 3, thresh: float = 0.15,
-                            use_mmr: bool=True):
-    mode = "combined"
+                            use_mmr: bool=True, chunk_size: int = 5000):
     if not donated_isbns:
         return None
     
@@ -254,88 +269,84 @@ def preference_notification(donor_user, donated_isbns, k: int = 3, thresh: float
     items, title_of = _load_book_vectors_for_isbns(isbns)
     if not items:
         return None
-    
-    # 여기에 알림 저장
-    notifications = []
 
-    # 기증자 제외한 유저들 가져옴(필요한 필드만)
-    user_qs = (UserInfo.objects.exclude(user_id=donor_user.id)
-               .only("user_id", "preference_vector", "preference_vector_survey")
-               .select_related("user").iterator())
-    
-    # 유저별로 처리
-    for ui in user_qs:
-        # 유저 벡터 가져옴
-        uvec = deserialize_sparse(ui.preference_vector)
-        if uvec is None or getattr(uvec, "nnz", 0) == 0:
-            continue
-        uvec = l2_normalize(uvec)
+    book_isbns = [isbn for isbn, _ in items]
+    col_of = {isbn: j for j, isbn in enumerate(book_isbns)}
+    M = sparse.vstack([v for _, v in items], format="csr")  # (B, D)
+    MT = M.T.tocsc()
+    sims = (M @ M.T).toarray()  # (B, B) 기증책 간 유사도 (MMR용, 1회)
+    dim = M.shape[1]
 
-        # 유저가 이미 기증/수령한 도서는 제외
-        owned = set(UserBook.objects.filter(user_id=ui.user_id, bookinfo_id__in=isbns)
-                    .values_list("bookinfo_id", flat=True))
-        cand_items = [(isbn, csr) for (isbn, csr) in items if isbn not in owned]
-        if not cand_items:
-            continue
+    # 부스트 가중치 변경 가능
+    survey_w = float(getattr(settings, "RECOMMEND_SURVEY_BOOST", 0.25))
+    pool = int(getattr(settings, "RECOMMEND_MMR_POOL", 50))
+    lam = float(getattr(settings, "RECOMMEND_MMR_LAMBDA", 0.3))
 
-        # 사용자 벡터 - 기증된 책 벡터 비교
-        cleaned, M, base_scores = cosine_scores(uvec, cand_items)
-        if M is None or M.shape[0] == 0:
-            continue
+    # 유저가 이미 기증/수령한 도서는 제외 (전체 유저 한 번에)
+    owned = (UserBook.objects.filter(bookinfo_id__in=book_isbns)
+             .exclude(user_id=donor_user.id)
+             .values_list("user_id", "bookinfo_id").distinct())
+    owned_by_user: dict[int, list[int]] = {}
+    for uid, isbn in owned:
+        owned_by_user.setdefault(uid, []).append(col_of[isbn])
+
+    # 기증자 제외한 유저들 벡터만 가져옴
+    user_qs = (UserInfo.objects.exclude(user_id=donor_user.id)
+               .exclude(preference_vector__isnull=True)
+               .values_list("user_id", "preference_vector", "preference_vector_survey")
+               .iterator(chunk_size=chunk_size))
 
-        # 모드별 부스트용 벡터
-        sv = deserialize_sparse(getattr(ui, "preference_vector_survey", None))
-
-        recent_vec = None
-
-        # 부스트 가중치 변경 가능
-        survey_w = float(getattr(settings, "RECOMMEND_SURVEY_BOOST", 0.25))
-        recent_w = float(getattr(settings, "RECOMMEND_RECENT_BOOST", 0.30))
-
-        boosted = apply_boosts(
-            mode=mode,
-            M=M,
-            base_scores=base_scores,
-            survey_vec=sv,
-            recent_vec=recent_vec,
-            survey_w=survey_w,
-            recent_w=recent_w,
-        )
-
-        # MMR 리랭킹 (선택된 "순서" 그대로 결과에 반영)
-        pool = int(getattr(settings, "RECOMMEND_MMR_POOL", 50))
-        lam = float(getattr(settings, "RECOMMEND_MMR_LAMBDA", 0.3))
-
-        if use_mmr:
-            try:
-                sel_idx = mmr_rerank(M, boosted, k=k, pool=pool, lam=lam)
-            except Exception:
-                sel_idx = list(np.argsort(-boosted)[:k])
-        else:
-            sel_idx = list(np.argsort(-boosted)[:k])
+    notifications = []
+    chunk = []
+    for row in user_qs:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            notifications += _notify_chunk(chunk, M, MT, sims, dim, book_isbns, owned_by_user,
+                                           title_of, k, thresh, use_mmr, pool, lam, survey_w)
+            chunk = []
+    if chunk:
+        notifications += _notify_chunk(chunk, M, MT, sims, dim, book_isbns, owned_by_user,
+                                       title_of, k, thresh, use_mmr, pool, lam, survey_w)
+
+    with transaction.atomic():
+        push_many(notifications)
+    return None
+
+# 유저 청크 하나에 대한 점수 계산 -> [(user_id, type, message), ...]
+def _notify_chunk(chunk, M, MT, sims, dim, book_isbns, owned_by_user,
+                  title_of, k, thresh, use_mmr, pool, lam, survey_w):
+    user_ids = [r[0] for r in chunk]
+    U = stack_vectors([r[1] for r in chunk], dim)  # (n, D)
+    has_vec = np.diff(U.indptr) > 0
+    U = l2_normalize_rows(U)
+
+    # 사용자 벡터 - 기증된 책 벡터 비교 (+ 설문 벡터 부스트)
+    scores = (U @ MT).toarray()  # (n, B)
+    SV = stack_vectors([r[2] for r in chunk], dim)
+    if SV.nnz:
+        scores += survey_w * (SV @ MT).toarray()
+
+    scores[~has_vec] = -np.inf
+    for r, uid in enumerate(user_ids):
+        cols = owned_by_user.get(uid)
+        if cols:
+            scores[r, cols] = -np.inf
+
+    # MMR 리랭킹 (전체 유저 동시에)
+    if use_mmr:
+        sel = mmr_rerank_batch(scores, sims, k=k, pool=pool, lam=lam)
+    else:
+        sel = np.argsort(-scores, axis=1)[:, :k]
 
+    out = []
+    for r in np.flatnonzero(has_vec):
         # 일정 점수 이상의 코사인 유사도 -> pick해서 알림 생성
-        picks = []
-        for i in sel_idx:
-            score = float(boosted[i])
-            if score >= thresh:
-                picks.append((cleaned[i][0], score))
+        picks = [(int(i), float(scores[r, i])) for i in sel[r]
+                 if i >= 0 and scores[r, i] >= thresh]
         if not picks:
             continue
-
         picks.sort(key=lambda x: x[1], reverse=True)
-        chosen_isbns = [isbn for isbn, _ in picks][:k]
-        chosen_titles = [title_of.get(z, "도서") for z in chosen_isbns]
-
-        # 《 》로 감싼 표시용 문자열 생성 (안 길게 30자 정도로 자름)
-        def wrap_title(s: str) -> str:
-            inner = Truncator(s).chars(30)
-            return f"《{inner}》"  # 《 ... 》
-
-        wrapped = [wrap_title(t) for t in chosen_titles]
-        
-        for i in range(len(wrapped)):
-            msg = f"{wrapped[i]} 이 방금 나눔됐어요!\n 놓치기 전에 데려가보세요."
-            push(user=ui.user, type_="book_recommendation", message=msg)
-
-            #《》
\ No newline at end of file
+        for i, _ in picks[:k]:
+            msg = f"{wrap_title(title_of.get(book_isbns[i], '도서'))} 이 방금 나눔됐어요!\n 놓치기 전에 데려가보세요."
+            out.append((user_ids[r], "book_recommendation", msg))
+    return out
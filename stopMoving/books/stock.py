@@ -0,0 +1,173 @@
+# books/stock.py
+# 장바구니/기증 단위 재고 처리: (도서관, isbn) 행을 한 번에 잠그고 메모리에서 검증 후 UPDATE 1회
+from django.db import transaction
+from django.db.models import Case, CharField, F, IntegerField, Value, When
+from rest_framework import status
+
+from bookinfo.models import BookInfoLibrary
+from bookinfo.service.meta_cache import get_books
+from bookinfo.signals import notify_stock_changed
+from users.models import UserBook
+
+
+def _merge(items: list) -> dict:
+    """[(isbn, qty), ...] -> {isbn: 합계 qty} (같은 isbn이 여러 번 오면 합산해서 검증)"""
+    total: dict = {}
+    for isbn, qty in items:
+        total[isbn] = total.get(isbn, 0) + int(qty)
+    return total
+
+
+def lock_stock(library_id: int, isbns) -> dict:
+    """
+    (library_id, isbn) 재고 행을 isbn 순서로 한 번에 SELECT ... FOR UPDATE -> {isbn: BookInfoLibrary}
+    항상 같은 순서로 잠가 동시에 들어온 장바구니끼리 교착되지 않게 함. 트랜잭션 안에서 호출
+    """
+    rows = (BookInfoLibrary.objects
+            .select_for_update()
+            .filter(library_id=library_id, isbn__in=sorted(set(isbns)))
+            .order_by("isbn"))
+    return {bil.isbn_id: bil for bil in rows}
+
+
+def check_pickup(items: list, titles: dict, locked: dict) -> list:
+    """
+    잠근 재고 행 기준으로 픽업 가능 여부 검증. 실패 항목만 입력 순서대로 반환
+    (isbn, title, stock, error, error_code)
+    """
+    need = _merge(items)
+    failed, seen = [], set()
+    for isbn, _qty in items:
+        if isbn in seen:
+            continue
+        seen.add(isbn)
+        title = titles.get(isbn)
+        bil = locked.get(isbn)
+        if isbn not in titles:
+            failed.append({"isbn": isbn, "title": None, "stock": None,
+                           "error": "책 정보가 없습니다. 먼저 BookInfo를 생성하세요.",
+                           "error_code": status.HTTP_404_NOT_FOUND})
+        elif bil is None:
+            failed.append({"isbn": isbn, "title": title, "stock": None,
+                           "error": "해당 도서관에 재고 항목이 없습니다.",
+                           "error_code": status.HTTP_404_NOT_FOUND})
+        elif bil.status != "AVAILABLE":
+            failed.append({"isbn": isbn, "title": title, "stock": None,
+                           "error": "구매 불가 상품입니다.",
+                           "error_code": status.HTTP_400_BAD_REQUEST})
+        elif bil.quantity < need[isbn]:
+            short = need[isbn] - bil.quantity
+            failed.append({"isbn": isbn, "title": title, "stock": short,
+                           "error": f"{short}권 부족합니다.",
+                           "error_code": status.HTTP_409_CONFLICT})
+    return failed
+
+
+def apply_decrements(locked: dict, need: dict) -> None:
+    """
+    잠근 행들의 수량을 CASE 식 UPDATE 1회로 감소, 0이 되면 PICKED.
+    메모리의 행도 같은 값으로 맞춘 뒤 stock_changed 전송 (커밋 후)
+    """
+    bils = [locked[isbn] for isbn in sorted(need)]
+    if not bils:
+        return
+    BookInfoLibrary.objects.filter(pk__in=[b.pk for b in bils]).update(
+        quantity=Case(
+            *[When(pk=b.pk, then=F("quantity") - Value(need[b.isbn_id])) for b in bils],
+            default=F("quantity"),
+            output_field=IntegerField(),
+        ),
+        status=Case(
+            *[When(pk=b.pk, then=Value("PICKED")) for b in bils if b.quantity - need[b.isbn_id] == 0],
+            default=F("status"),
+            output_field=CharField(),
+        ),
+    )
+    for b in bils:
+        b.quantity -= need[b.isbn_id]
+        if b.quantity == 0:
+            b.status = "PICKED"
+        notify_stock_changed(b)
+
+
+@transaction.atomic
+def reserve_pickup(user, library_id: int, items: list) -> tuple[list, dict]:
+    """
+    장바구니 일괄 픽업. items = [(isbn, qty), ...]
+    - 하나라도 실패하면 아무것도 바꾸지 않고 (실패 목록, titles) 반환
+    - 모두 가능하면 재고 감소 + UserBook(PURCHASED) 일괄 생성 후 ([], titles) 반환
+    titles: {isbn: title} (알림 문구 등 후처리용)
+    """
+    isbns = [isbn for isbn, _ in items]
+    titles = {isbn: b.title for isbn, b in get_books(isbns).items()}
+    locked = lock_stock(library_id, isbns)
+
+    failed = check_pickup(items, titles, locked)
+    if failed:
+        return failed, titles
+
+    apply_decrements(locked, _merge(items))
+    UserBook.objects.bulk_create([
+        UserBook(user=user, bookinfo_id=isbn, status="PURCHASED", library_id=library_id, quantity=qty)
+        for isbn, qty in items
+    ])
+    return [], titles
+
+
+def apply_increments(locked: dict, add: dict) -> None:
+    """잠근 행들의 수량을 CASE 식 UPDATE 1회로 증가, 재고가 생기면 AVAILABLE. 이후 stock_changed 전송 (커밋 후)"""
+    bils = [locked[isbn] for isbn in sorted(add) if isbn in locked]
+    if not bils:
+        return
+    BookInfoLibrary.objects.filter(pk__in=[b.pk for b in bils]).update(
+        quantity=Case(
+            *[When(pk=b.pk, then=F("quantity") + Value(add[b.isbn_id])) for b in bils],
+            default=F("quantity"),
+            output_field=IntegerField(),
+        ),
+        status=Case(
+            *[When(pk=b.pk, then=Value("AVAILABLE")) for b in bils if b.quantity + add[b.isbn_id] > 0],
+            default=F("status"),
+            output_field=CharField(),
+        ),
+    )
+    for b in bils:
+        b.quantity += add[b.isbn_id]
+        if b.quantity > 0:
+            b.status = "AVAILABLE"
+        notify_stock_changed(b)
+
+
+@transaction.atomic
+def receive_donation(user, library_id: int, items: list) -> tuple[dict, dict]:
+    """
+    일괄 기증. items = [(isbn, qty), ...]
+    - BookInfo가 없는 isbn은 건너뜀 (반환된 titles에 없는 isbn = 실패)
+    - 없는 재고 행은 수량 0으로 한 번에 INSERT (이미 있으면 무시) -> 전체를 isbn 순서로 잠금 -> CASE UPDATE로 증가
+    - UserBook(DONATED) 일괄 생성
+    (titles, stock) 반환. titles: {isbn: title}, stock: {isbn: (증가 후 quantity, status)}
+    """
+    isbns = {isbn for isbn, _ in items}
+    titles = {isbn: b.title for isbn, b in get_books(isbns).items()}
+    accepted = [(isbn, qty) for isbn, qty in items if isbn in titles]
+    if not accepted:
+        return titles, {}
+    add = _merge(accepted)
+
+    # 증가량은 기존 수량에 더해야 해서 update_conflicts(덮어쓰기) 대신 INSERT IGNORE + 잠금 후 UPDATE
+    # bulk_create는 save()를 거치지 않으므로 median_date/expired_at 기본값을 직접 세팅
+    new_rows = []
+    for isbn in sorted(add):
+        bil = BookInfoLibrary(library_id_id=library_id, isbn_id=isbn, quantity=0)
+        bil.init_dates()
+        new_rows.append(bil)
+    BookInfoLibrary.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    locked = lock_stock(library_id, add)
+    apply_increments(locked, add)
+    UserBook.objects.bulk_create([
+        UserBook(user=user, bookinfo_id=isbn, status="DONATED", library_id=library_id, quantity=qty)
+        for isbn, qty in accepted
+    ])
+    # apply_increments가 잠근 행을 UPDATE 결과와 같은 값으로 맞춰 둠
+    return titles, {isbn: (bil.quantity, bil.status) for isbn, bil in locked.items()}
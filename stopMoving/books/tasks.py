@@ -0,0 +1,39 @@
+# books/tasks.py
+# 기증/픽업 후처리 작업 (jobs 큐에서 실행)
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from jobs.queue import task
+from .services import preference_books_activity, preference_books_combined, preference_notification
+
+
+# 기증된 책과 취향이 맞는 유저에게 알림 (전체 유저 점수 계산이라 요청 경로에서 분리)
+@task("books.donation_fanout")
+def donation_fanout(donor_id: int, isbns: list):
+    User = get_user_model()
+    donor = User.objects.using('default').filter(id=donor_id).first()
+    if donor is None or not isbns:
+        return
+    preference_notification(donor_user=donor, donated_isbns=isbns)
+
+
+# 픽업 후 추천 목록 재계산
+@task("books.refresh_recommendations")
+def refresh_recommendations(user_id: int):
+    User = get_user_model()
+    user = User.objects.using('default').filter(id=user_id).first()  # 반드시 primary
+    if user is None:
+        return
+    preference_books_combined(user, db_alias='default')
+    preference_books_activity(user, db_alias='default')
+
+
+def schedule_recompute(user_id: int):
+    """
+    픽업 후 추천 재계산 예약. 유저별로 RECOMMEND_RECOMPUTE_DELAY초 안에 이어진 픽업은 재계산 1회로 합쳐짐
+    (키오스크에서 한 권씩 연속 픽업해도 전체 후보 계산은 마지막 픽업 뒤 1번)
+    """
+    refresh_recommendations.enqueue(
+        user_id=user_id,
+        dedupe_key=f"recommend:{user_id}",
+        delay=float(getattr(settings, "RECOMMEND_RECOMPUTE_DELAY", 30)),
+    )
@@ -1,3 +1,45 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from bookinfo.models import BookInfo, BookInfoLibrary
+from library.models import Library
+from users.models import UserBook
+from .stock import reserve_pickup
+
+
+# 장바구니 픽업(reserve_pickup): 전부 되거나 하나도 안 되거나
+class ReservePickupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="picker", password="pw")
+        self.library = Library.objects.create(name="도서관", address="주소")
+        for isbn, qty in (("9780000000001", 2), ("9780000000002", 1)):
+            BookInfo.objects.create(isbn=isbn, title=f"책 {isbn}")
+            BookInfoLibrary.objects.create(library_id=self.library, isbn_id=isbn, quantity=qty)
+
+    def _stock(self):
+        return dict(BookInfoLibrary.objects.filter(library_id=self.library).values_list("isbn", "quantity"))
+
+    def test_short_isbn_fails_whole_basket(self):
+        before = self._stock()
+        failed, _ = reserve_pickup(self.user, self.library.id, [("9780000000001", 1), ("9780000000002", 2)])
+
+        self.assertEqual([f["isbn"] for f in failed], ["9780000000002"])
+        self.assertEqual(failed[0]["stock"], 1)
+        self.assertEqual(failed[0]["error_code"], 409)
+        self.assertEqual(self._stock(), before)
+        self.assertFalse(UserBook.objects.filter(user=self.user).exists())
+
+    def test_duplicate_isbns_are_summed(self):
+        # 2권 재고에 1권 + 2권 -> 합계 3권이라 실패
+        failed, _ = reserve_pickup(self.user, self.library.id, [("9780000000001", 1), ("9780000000001", 2)])
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0]["stock"], 1)
+        self.assertEqual(self._stock()["9780000000001"], 2)
+
+        # 1권 + 1권 -> 합계 2권, 재고 0이 되어 PICKED
+        failed, titles = reserve_pickup(self.user, self.library.id, [("9780000000001", 1), ("9780000000001", 1)])
+        self.assertEqual(failed, [])
+        self.assertEqual(titles["9780000000001"], "책 9780000000001")
+        bil = BookInfoLibrary.objects.get(library_id=self.library, isbn="9780000000001")
+        self.assertEqual((bil.quantity, bil.status), (0, "PICKED"))
+        self.assertEqual(UserBook.objects.filter(user=self.user, status="PURCHASED").count(), 2)
@@ -12,8 +12,10 @@ from library.models import Library
 from bookinfo.models import BookInfo, BookInfoLibrary
 from bookinfo.serializers import DonationDisplaySerializer, PickupDisplaySerializer, BookDetailDisplaySerializer
 from bookinfo.services import ensure_bookinfo
+from bookinfo.signals import notify_stock_changed
+from bookinfo.service.meta_cache import get_book
+from library.geo import libraries_with_stock
 from django.db.models import Q, Count, F, Value, Sum
-from math import radians, sin, cos, acos
 from decimal import Decimal
 from django.db import transaction
 from users.models import UserInfo, Status
@@ -22,129 +24,27 @@ from notification.service import push
 from notification.models import Notification as N
 from django.conf import settings
 from django.db import transaction
-from preferences.services.embeddings import deserialize_sparse, serialize_sparse, weighted_sum, l2_normalize
+from preferences.services.user_vectors import apply_pickups
 from users.models import UserBook
-from .services import preference_books_activity, preference_books_combined, preference_notification
+from .stock import receive_donation, reserve_pickup
+from .tasks import donation_fanout, schedule_recompute
 from typing import Tuple, Dict, Union
 
-EARTH_KM = 6371.0
 POINT_PER_BOOK = 500
 DISCOUNT_RATE = Decimal("0.15")
+def _parse_latlng(request) -> Tuple:
+    """쿼리스트링 lat/lng -> (float|None, float|None). 숫자가 아니면 ValueError"""
+    lat_str = request.GET.get("lat")
+    lng_str = request.GET.get("lng")
+    lat = float(lat_str) if lat_str is not None else None
+    lng = float(lng_str) if lng_str is not None else None
+    return lat, lng
+
 # 《》
 def message(first_title: str, count: int, verb: str) -> str:
     # verb: "기증 접수", "픽업 완료"
     return f"《{first_title}》 {verb}" if count == 1 else f"《{first_title}》 외 {count-1}권{verb}"
 
-def _increase_stock_one(library_id, isbn: str, qty: int):
-    """
-    해당 도서관 책 권 수 증가
-    """
-    isbn = BookInfo.objects.filter(isbn=isbn).first()
-    if not isbn:
-        return False, {"error": "책 정보가 없습니다. 먼저 BookInfo를 생성하세요.", "isbn": isbn}
-
-    with transaction.atomic():
-        bil, _created = (
-            BookInfoLibrary.objects
-            .select_for_update()
-            .get_or_create(library_id=library_id, isbn=isbn, defaults={"quantity": 0})
-        )
-        BookInfoLibrary.objects.filter(pk=bil.pk).update(quantity=F("quantity") + qty)
-        bil.refresh_from_db()
-
-        if bil.quantity > 0 and bil.status != "AVAILABLE":
-            bil.status = "AVAILABLE"
-            bil.save(update_fields=["status"])
-
-    return True, {
-        "library_id": getattr(library_id, "id", None),
-        "isbn": isbn.isbn,
-        "added_quantity": qty,
-        "total_quantity": bil.quantity,
-        "status": bil.status,
-    }
-# isbn 책 제목 몇권 부족한지
-def _check_stock(library_id, isbn: str, qty: int) -> tuple[bool, dict, int]:
-
-    bookinfo = BookInfo.objects.filter(isbn=isbn).first()
-    if not bookinfo:
-        return (False,
-                {"isbn": isbn, "error": "책 정보가 없습니다. 먼저 BookInfo를 생성하세요."},
-                status.HTTP_404_NOT_FOUND,
-        )
-    
-    bil = (
-            BookInfoLibrary.objects
-            .select_for_update()
-            .filter(library_id=library_id, isbn=bookinfo)
-            .first()
-        )
-    if not bil:
-        result = {"isbn": isbn, "title": bookinfo.title, "error":"해당 도서관에 재고 항목이 없습니다."}
-        return (False, {"result": result}, status.HTTP_404_NOT_FOUND)
-        # return Response({"isbn": isbn, "title": bookinfo.title, "error":"해당 도서관에 재고 항목이 없습니다."},
-        #                 status=status.HTTP_404_NOT_FOUND)
-        
-    if bil.status != "AVAILABLE":
-        result = {"isbn":isbn, "title": bookinfo.title, "error":"구매 불가 상품입니다."}
-        return (False, {"result": result}, status.HTTP_400_BAD_REQUEST)
-        # return Response({"isbn":isbn, "title": bookinfo.title, "error":"구매 불가 상품입니다."},
-        #                 status=status.HTTP_400_BAD_REQUEST)
-    
-    if bil.quantity - qty < 0:
-        print(f"qty{qty}")
-        print(f"bil.quantity{bil.quantity}")
-
-        stock = qty - bil.quantity
-        print(stock)
-        result = {"isbn": isbn, "title": bookinfo.title, "stock": stock, "error":f"{stock}권 부족합니다."}
-        return (False, {"result": result}, status.HTTP_409_CONFLICT)
-        # return Response({"isbn": isbn, "title": bookinfo.title, "stock": stock, "error":f"{stock}권 부족합니다."},
-        #                 status=status.HTTP_409_CONFLICT)
-    return (True,{
-        "library_id": getattr(library_id, "id", None),  
-        "isbn": bookinfo.isbn,                           
-        "removed_quantity": qty,                         
-        "total_quantity": bil.quantity,
-        "status": bil.status,
-    }, status.HTTP_200_OK)
-
-def _decrease_stock_one(library_id, isbn: str, qty: int) -> tuple[bool, dict, int]:
-    """
-    해당 도서관에서 특정 ISBN 재고(quantity) 감소.
-    qty는 1 이상 정수.
-    """
-
-    bookinfo = BookInfo.objects.filter(isbn=isbn).first()
-    if not bookinfo:
-        return (False,
-                {"isbn": isbn, "error": "책 정보가 없습니다. 먼저 BookInfo를 생성하세요."},
-                status.HTTP_404_NOT_FOUND,
-        )
-    with transaction.atomic():
-        bil = (
-            BookInfoLibrary.objects
-            .select_for_update()
-            .filter(library_id=library_id, isbn=bookinfo)
-            .first()
-        ) 
-
-        BookInfoLibrary.objects.filter(pk=bil.pk).update(quantity=F("quantity") - qty)
-        bil.refresh_from_db()
-
-        
-        if bil.quantity == 0:
-            bil.status = "PICKED" 
-            bil.save(update_fields=["status"])
-
-    return (True,{
-        "library_id": getattr(library_id, "id", None),  
-        "isbn": bookinfo.isbn,                           
-        "removed_quantity": qty,                         
-        "total_quantity": bil.quantity,
-        "status": bil.status,
-    }, status.HTTP_200_OK)
-
 # 책 나눔하기 마지막에 나눔하기 버튼
 class DonationAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -169,33 +69,38 @@ class DonationAPIView(APIView):
         if not library:
             return Response({"error": "해당 도서관이 존재하지 않습니다."}, status=status.HTTP_404_NOT_FOUND)
 
+        items = [(str(item["isbn"]).replace("-", "").strip(), int(item["quantity"])) for item in v["books"]]
+
+        # BookInfo 조회 1회 + 재고 행 일괄 upsert + UserBook 일괄 생성
+        titles, stock = receive_donation(request.user, lib_id, items)
+
         results, success_cnt = [], 0
         success_isbn = [] # 기증 성공한 책 목록
         total_qty = 0
         point_cnt = 0
+        # 같은 isbn이 여러 번 오면 책마다 그 시점까지 더한 수량을 보여줌 (한 권씩 처리하던 때와 같은 값)
+        running = {isbn: quantity - sum(q for i, q in items if i == isbn)
+                   for isbn, (quantity, _status) in stock.items()}
 
-        for item in v["books"]:
-            isbn_str = str(item["isbn"]).replace("-", "").strip()
-            qty = int(item["quantity"])
-
-            ok, out = _increase_stock_one(library, isbn_str, qty)
-            if ok:
+        for item, (isbn_str, qty) in zip(v["books"], items):
+            if isbn_str in titles:
                 success_cnt += 1
-                results.append({"input": item, "status": "OK", "data": out})
+                running[isbn_str] += qty
+                total_quantity = running[isbn_str]
+                results.append({"input": item, "status": "OK", "data": {
+                    "library_id": library.id,
+                    "isbn": isbn_str,
+                    "added_quantity": qty,
+                    "total_quantity": total_quantity,
+                    "status": "AVAILABLE" if total_quantity > 0 else stock[isbn_str][1],
+                }})
                 point_cnt += qty
                 total_qty += qty
                 success_isbn.append(isbn_str)
-                UserBook.objects.create(
-                    user=request.user,
-                    bookinfo_id=isbn_str,  # to_field='isbn'
-                    status="DONATED",
-                    library_id=lib_id,
-                    quantity=qty)
-
             else:
-                results.append({"input": item, "status": "ERROR", "error": out})
+                results.append({"input": item, "status": "ERROR",
+                                "error": {"error": "책 정보가 없습니다. 먼저 BookInfo를 생성하세요.", "isbn": isbn_str}})
 
-            
         # 유저 포인트 증가 로직
         points_earned = point_cnt * POINT_PER_BOOK
         if request.user.is_authenticated and success_cnt > 0:
@@ -205,8 +110,7 @@ class DonationAPIView(APIView):
         
         # 알림 보내기
         if total_qty > 0:
-            bi = BookInfo.objects.filter(isbn=success_isbn[0]).only("title").first()
-            first_title = (bi.title if bi else None) or "도서"
+            first_title = titles.get(success_isbn[0]) or "도서"
             base_msg = message(first_title, total_qty,"을 나눔했어요!")
             msg = f"{base_msg}\n +{points_earned:,}P 적립"
             push(user=request.user,
@@ -214,8 +118,9 @@ class DonationAPIView(APIView):
                  message=msg,
             )
 
-        # 취향 일치하는 유저에게 알림 보내기
-        preference_notification(donor_user=request.user, donated_isbns=success_isbn)
+        # 취향 일치하는 유저에게 알림 보내기 (백그라운드 작업)
+        if success_isbn:
+            donation_fanout.enqueue(donor_id=request.user.id, isbns=success_isbn)
 
         return Response({
             "message": "일괄 기증 처리 완료",
@@ -248,105 +153,46 @@ class PickupAPIView(APIView):
         if not library:
             return Response({"error": "해당 도서관이 존재하지 않습니다."}, status=status.HTTP_404_NOT_FOUND)
 
+        items = [(str(item["isbn"]).replace("-", "").strip(), int(item["quantity"])) for item in v["books"]]
+
+        # 장바구니 전체를 한 번에 잠그고 검증 -> 모두 가능할 때만 재고 감소 + UserBook 생성
+        failed, titles = reserve_pickup(request.user, lib_id, items)
+
         results, success_cnt = [], 0
-        success_books = [] # 기증 성공한 책 목록
-        ok_cnt = []
-        check = []
-        codes = []
-        any_success = False # 책 추천 기능 관련 플래그
-
-        for item in v["books"]:
-            isbn_str = str(item["isbn"]).replace("-", "").strip()
-            qty = int(item["quantity"])
-            ok, payload, code = _check_stock(library, isbn_str, qty)
-            ok_cnt.append(ok)
-            check.append(payload)
-            codes.append(code)
-
-        if all(ok_cnt):
-            for item in v["books"]:
-                isbn_str = str(item["isbn"]).replace("-", "").strip()
-                qty = int(item["quantity"])
-                ok, payload, code = _decrease_stock_one(library, isbn_str, qty)
-                if ok:
-                    any_success = True
-                    # FIX: 성공 카운트 변수 오타
-                    success_cnt += 1
-                    # results.append({"input": item, "status": "OK", "data": out})
-                    success_books.append(isbn_str)
-
-                    results.append({
-                        "isbn": item["isbn"],
-                        "status": "PICKED",
-                    })
-                    with transaction.atomic():
-                        UserBook.objects.create(
-                            user=request.user,
-                            bookinfo_id=isbn_str,  # to_field='isbn'
-                            status="PURCHASED",
-                            library_id=lib_id,
-                            quantity=qty
-                        )
-                        info = BookInfo.objects.filter(isbn=isbn_str).only("isbn", "title", "vector").first()
-                        if info:
-                            ui, _ = UserInfo.objects.get_or_create(user = request.user)
-                            book_v = deserialize_sparse(info.vector)
-                            if book_v is not None:
-                                # 활동 벡터 EMA 업데이트
-                                beta = settings.ACTIVITY_EMA_BETA
-                                old_act = deserialize_sparse(ui.preference_vector_activity)
-                                new_act = book_v if old_act is None else (beta * old_act + (1 - beta) * book_v)
-                                ui.preference_vector_activity = serialize_sparse(new_act)
-                                # 통합 벡터 갱신: α*survey + (1-α)*activity
-                                survey = deserialize_sparse(ui.preference_vector_survey)
-                                combined = weighted_sum(survey, new_act, alpha = settings.RECOMMEND_ALPHA)
-                                # l2 정규화 추가
-                                combined = l2_normalize(combined)
-                                ui.preference_vector = serialize_sparse(combined if combined is not None else new_act)
-
-                                ui.save(update_fields=["preference_vector_activity", "preference_vector"])
-                else:
-                    # 실패 케이스
-                    results.append({
-                        "isbn": payload.get("isbn", isbn_str),        
-                        "status": "FAILED",
-                        "error": payload.get("error", "decrease failed"),
-                        "error_code": code
-                    })             
-        
-        # ok에 false 있을 때            
+        success_books = [] # 픽업 성공한 책 목록
+        if failed:
+            for f in failed:
+                results.append({
+                    "isbn": f["isbn"],
+                    "title": f["title"],
+                    "stock": f["stock"],
+                    "status": "FAILED",
+                    "error": f["error"],
+                    "error_code": f["error_code"],
+                })
         else:
-            
-            for idx, ok in enumerate(ok_cnt):
-                if not ok:
-                    p = check[idx] if idx < len(check) else {}
-                   
-                    body = p.get("result", p)
-                    results.append({
-                        "isbn": (body or {}).get("isbn"),
-                        "title": (body or {}).get("title"),
-                        "stock": (body or {}).get("stock"),
-                        "status": "FAILED",
-                        "error": (body or {}).get("error", "stock check failed"),
-                        "error_code": codes[idx] if idx < len(codes) else None
-                    })
-
-        # 모든 save 끝난뒤 한 번만 등록        
-        if any_success:
-            def _after_commit(user_id):
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.using('default').get(id=user_id)  # 반드시 primary
-                preference_books_combined(user, db_alias='default')
-                preference_books_activity(user, db_alias='default')
-
-            transaction.on_commit(lambda: _after_commit(request.user.id))
+            for item, (isbn_str, _qty) in zip(v["books"], items):
+                success_cnt += 1
+                success_books.append(isbn_str)
+                results.append({
+                    "isbn": item["isbn"],
+                    "status": "PICKED",
+                })
+
+            # 활동/통합 벡터: 장바구니 전체 EMA를 한 번에 계산해서 1회 저장
+            infos = BookInfo.objects.filter(isbn__in=set(success_books)).only("isbn", "vector_bin", "vector").in_bulk()
+            ui, _ = UserInfo.objects.get_or_create(user=request.user)
+            fields = apply_pickups(ui, [infos.get(isbn_str) for isbn_str in success_books])
+            if fields:
+                ui.save(update_fields=fields)
+
+        # 모든 save 끝난뒤 한 번만 등록 (커밋 후 유저별로 모아서 추천 재계산)
+        if success_books:
+            schedule_recompute(request.user.id)
         
         # 알림 보내기
         if success_books:
-            first_isbn = success_books[0]
-            _bi = BookInfo.objects.filter(isbn=first_isbn).only("title").first()
-            first_title = (_bi.title if _bi else None) or "도서"
+            first_title = titles.get(success_books[0]) or "도서"
             msg = message(first_title, len(success_books),"을 데려왔어요!\n 좋은 시간 보내세요")
             push(
                 user=request.user,
@@ -388,58 +234,18 @@ class BookDetailAPIView(APIView):
 
     def get(self, request, isbn):
         # 책 정보 가져오기
-        try:
-            info = BookInfo.objects.get(isbn=isbn)
-        except BookInfo.DoesNotExist:
+        info = get_book(isbn)
+        if info is None:
             return Response({"detail": "존재하지 않는 ISBN입니다."}, status=status.HTTP_404_NOT_FOUND)
         
-        # 도서관 별 책 집계
-        qs = (
-            BookInfoLibrary.objects
-            .filter(isbn=isbn)
-            .values('library_id__id', 'library_id__name', 'library_id__lat', 'library_id__long')
-            .annotate(
-                available_books=Sum('quantity', filter=Q(status='AVAILABLE')),
-            )
-            .filter(available_books__gt=0)
-        )
-        
         # 사용자 위치 받음
-        lat_str = request.GET.get("lat")
-        lng_str = request.GET.get("lng")
         try:
-            lat = float(lat_str) if lat_str is not None else None
-            lng = float(lng_str) if lng_str is not None else None
+            lat, lng = _parse_latlng(request)
         except ValueError:
             return Response({"detail": "lat/lng 숫자여야 합니다."}, status=400)
-        
-        # 거리 계산
-        libraries = []
-        for row in qs:
-            la = row['library_id__lat']
-            lo = row['library_id__long']  
-            d_m = None
-            if lat is not None and lng is not None and la is not None and lo is not None:
-                φ1, φ2 = radians(lat), radians(float(la))
-                Δλ = radians(float(lo) - lng)
-                dist_km = acos(cos(φ1)*cos(φ2)*cos(Δλ) + sin(φ1)*sin(φ2)) * EARTH_KM
-                d_m = int(round(dist_km * 1000))
-
-            distance_display = None
-            
-            if d_m is not None:
-                distance_display = f"{d_m/1000:.1f}km" if d_m >= 1000 else f"{d_m}m"
-            
-            libraries.append({
-                "library_id": row["library_id__id"],
-                "name": row["library_id__name"],
-                "distance_m": distance_display,                 # 좌표 없으면 None
-                "available_books": row["available_books"],
-            })
-
-        # 5) 거리 기준 정렬 (있으면 앞으로)
-        if lat is not None and lng is not None:
-            libraries.sort(key=lambda x: (x["distance_m"] is None, x["distance_m"] or 0))
+
+        # 도서관 별 재고 집계 + 거리순 정렬 (좌표 없으면 뒤로)
+        libraries = libraries_with_stock(isbn, lat, lng)
 
         # 6) 책 메타 + 도서관 목록
         info_data = BookDetailDisplaySerializer(info).data
@@ -447,6 +253,36 @@ class BookDetailAPIView(APIView):
 
 
 
+# 이 책이 있는 가까운 도서관 N곳
+class NearbyLibrariesAPIView(APIView):
+    @swagger_auto_schema(
+        operation_description="ISBN 재고가 있는 도서관 중 사용자 위치에서 가까운 순 N곳",
+        manual_parameters=[
+            openapi.Parameter('isbn', openapi.IN_PATH, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('lat', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True, description="사용자 위도"),
+            openapi.Parameter('lng', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True, description="사용자 경도"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False, description="최대 개수"),
+        ],
+        responses={200: 'OK', 404: '존재하지 않는 ISBN', 400: '요청 오류'}
+    )
+
+    def get(self, request, isbn):
+        try:
+            lat, lng = _parse_latlng(request)
+            limit = int(request.GET.get("limit", getattr(settings, "NEARBY_LIBRARIES_LIMIT", 10)))
+        except ValueError:
+            return Response({"detail": "lat/lng/limit 숫자여야 합니다."}, status=400)
+        if lat is None or lng is None:
+            return Response({"detail": "lat/lng 필요합니다."}, status=400)
+        if limit <= 0:
+            return Response({"detail": "limit은 1 이상이어야 합니다."}, status=400)
+
+        if get_book(isbn) is None:
+            return Response({"detail": "존재하지 않는 ISBN입니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"isbn": isbn, "libraries": libraries_with_stock(isbn, lat, lng, limit=limit)}, status=200)
+
+
 class PickUpBookDetailAPIView(APIView):
     """
     스캔한 ISBN과 도서관 id로 픽업 상세 조회
@@ -494,7 +330,7 @@ class PickUpBookDetailAPIView(APIView):
             return Response({"error": "해당 도서관이 존재하지 않습니다."},
                             status=status.HTTP_404_NOT_FOUND)
 
-        info = BookInfo.objects.filter(isbn=isbn).first()
+        info = get_book(isbn)
         if not info:
             return Response({"error": "해당 isbn의 책 정보가 없습니다."},
                             status=status.HTTP_404_NOT_FOUND)
@@ -2,6 +2,8 @@
 # 로깅 요청을 위한 미들웨어
 import logging
 
+from bookinfo.service.meta_cache import identity_map
+
 logger = logging.getLogger(__name__)
 
 class RequestLoggingMiddleware:
@@ -12,3 +14,13 @@ class RequestLoggingMiddleware:
         logger.info(f"[{request.method}] {request.get_full_path()}")
         response = self.get_response(request)
         return response
+
+
+# 요청 단위 BookInfo identity map (같은 요청에서 같은 책을 두 번 조회하지 않게)
+class BookInfoIdentityMapMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map():
+            return self.get_response(request)
@@ -30,16 +30,57 @@ pymysql.install_as_MySQLdb()
 BASE_DIR = Path(__file__).resolve().parent.parent
 VECTOR_DATA_DIR = os.path.join(BASE_DIR, "vector_data")
 VECTOR_PICKLE_PATH = os.path.join(VECTOR_DATA_DIR, "vectorizer.pkl")
+VECTORIZER_RELOAD_CHECK = 5 # vectorizer.pkl 변경 확인 주기(초), 바뀌면 프로세스 캐시 다시 로드
 
 # 수정: 0.7 -> 0.85
 RECOMMEND_ALPHA = 0.85 # 통합 = a*설문 + (1-a)+활동
 ACTIVITY_EMA_BETA = 0.8 # 활동벡터 EMA: new = b*old + (1-b)*new_book
+PREFERENCE_VECTOR_MIN_WEIGHT = 1e-4 # 활동벡터 EMA 후 이보다 작은 가중치는 제거
+PREFERENCE_VECTOR_MAX_NNZ = 4000 # 유저 벡터 최대 nnz (가중치 큰 순으로 유지)
 # 추천 튜닝 파라미터
 RECOMMEND_MMR_POOL = 100 # 초기 상위 N개 후보에서 리랭킹
 RECOMMEND_MMR_LAMBDA = 0.3 # 연관도 ↑, 분포 ↓
 RECOMMEND_SURVEY_BOOST = 0.25 # combined mode: 설문 벡터 가중치
 RECOMMEND_RECENT_BOOST = 0.30 # activity mode: 최근 픽업 벡터 가중치
 RECOMMEND_RECENT_N = 3 # 최근 N권 평균으로 최근 벡터 구성
+RECOMMEND_MATRIX_TTL = 600 # 후보 행렬 캐시 전체 재빌드 주기(초), 다른 프로세스 변경분 반영용
+BOOK_SEARCH_INDEX_TTL = 600 # 책 검색 색인 전체 재빌드 주기(초)
+# 추천 후보 근사 검색 (단어 역색인 + 쿼리 상위 단어만 사용)
+RECOMMEND_ANN_MIN_ITEMS = 20000 # 후보가 이보다 적으면 근사 검색 없이 전수 계산
+RECOMMEND_ANN_CANDIDATES = 2000 # 근사 검색으로 고른 뒤 정확히 재채점할 후보 수
+RECOMMEND_ANN_QUERY_TERMS = 16 # 후보 검색에 쓸 쿼리 상위 가중치 단어 수 (클수록 정확, 느림)
+# 도서관 위치 색인
+LIBRARY_GEO_TTL = 600 # 도서관 좌표 색인 전체 재빌드 주기(초)
+LIBRARY_GEO_CELL_DEG = 0.05 # 격자 한 칸 크기(도), 약 5km
+NEARBY_LIBRARIES_LIMIT = 10 # 근처 도서관 API 기본 개수
+LIBRARY_STOCK_INDEX_TTL = 600 # 도서관 x ISBN 재고 비트맵 전체 재빌드 주기(초)
+LIBRARY_AVAILABILITY_RADIUS_M = 3000 # 근처 재고 API 기본 반경(m)
+# 도서관 보유 도서 목록
+LIBRARY_BOOKS_PAGE_SIZE = 50 # cursor 페이지 기본 크기
+LIBRARY_BOOKS_MAX_PAGE_SIZE = 200 # cursor 페이지 최대 크기
+LIBRARY_BOOKS_STREAM_CHUNK = 500 # 전체 목록 스트리밍 시 한 번에 읽는 행 수
+# 알라딘 API 호출
+ALADIN_BASE_URL = "http://www.aladin.co.kr/ttb/api" # 로컬 스텁 서버로 테스트할 때 변경
+ALADIN_CONCURRENCY = 8 # 수집 시 동시 상세 조회 스레드 수
+ALADIN_RATE_PER_SEC = 10 # 초당 최대 호출 수 (프로세스 전체)
+ALADIN_RATE_MIN = 1 # 429/5xx로 속도를 줄일 때 하한 (초당 호출 수)
+ALADIN_POOL_SIZE = 16 # keep-alive 연결 풀 크기
+ALADIN_MAX_RETRIES = 3 # 연결 오류/429/5xx 재시도 횟수
+ALADIN_RETRY_BACKOFF = 0.5 # 재시도 대기 기준(초), 0~backoff*2^n 사이 임의
+ALADIN_UPSERT_BATCH = 500 # 수집 결과를 모아서 한 번에 저장할 책 수 (트랜잭션 1개)
+ALADIN_INGEST_STALE_DAYS = 30 # 증분 수집 시 이 기간 안에 받은 책은 다시 조회하지 않음(일)
+INGEST_RUN_STALE_SECONDS = 1800 # 이 시간 동안 진행 기록이 없는 RUNNING 실행은 죽은 것으로 보고 이어받음(초)
+ALADIN_COVER_CHUNK = 500 # 표지 갱신 시 한 번에 조회/저장하고 체크포인트를 남기는 책 수
+ALADIN_CACHE_PATH = os.getenv("ALADIN_CACHE_PATH", os.path.join(BASE_DIR, "aladin_cache", "responses.sqlite3")) # 응답 디스크 캐시, 빈 값이면 사용 안 함
+ALADIN_CACHE_TTLS = { # 응답 캐시 유효 기간(초), 0이면 캐시 안 함. 지난 달 이전 Bestseller 주차는 영구
+    "ItemLookUp": 30 * 24 * 3600,
+    "ItemNewAll": 6 * 3600,
+    "ItemNewSpecial": 6 * 3600,
+    "ItemEditorChoice": 24 * 3600,
+    "Bestseller": 6 * 3600,
+    "BlogBest": 6 * 3600,
+    "default": 6 * 3600,
+}
 secret_file = os.path.join(BASE_DIR, 'secrets.json') 
 
 with open(secret_file) as f:
@@ -65,6 +106,16 @@ DEBUG = os.getenv("DJANGO_DEBUG", "True") == "True"
 
 SHOW_SWAGGER = DEBUG
 
+# 백그라운드 작업 큐 (jobs)
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "thread" if DEBUG else "db") # db | thread | sync
+JOBS_THREAD_WORKERS = 2 # thread 모드 워커 수
+JOBS_THREAD_MAX_PENDING = 100 # thread 모드 대기 상한, 넘치면 DB 큐로 넘김
+JOBS_MAX_ATTEMPTS = 3 # 작업당 최대 시도 횟수
+JOBS_RETRY_BASE_DELAY = 5 # 재시도 대기(초), 시도마다 2배 + jitter
+JOBS_LOCK_TIMEOUT = 300 # RUNNING 상태로 이 시간(초) 넘으면 워커 죽은 것으로 보고 재선점
+JOBS_DEBOUNCE_MAX_WAIT = 300 # dedupe_key 작업을 처음 등록 후 최대 이 시간(초)까지만 미룸
+RECOMMEND_RECOMPUTE_DELAY = 30 # 픽업 후 추천 재계산 대기(초), 이 안의 픽업은 재계산 1회로 합침
+
 # 운영 시에는 보안상의 이유로 IP를 직접 기재하는 것이 좋습니다.
 ALLOWED_HOSTS = ['*']
 
@@ -89,6 +140,7 @@ PROJECT_APPS = [
     'books.management.commands', # 커맨드 추가
     'preferences', # 선호도 기반 추천
     'notification', # 알림기능
+    'jobs', # 백그라운드 작업 큐
 ]
 
 THIRD_PARTY_APPS = [ 
@@ -108,6 +160,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'config.middleware.RequestLoggingMiddleware',  # 로깅 미들웨어 추가
+    'config.middleware.BookInfoIdentityMapMiddleware',  # 요청 단위 BookInfo 조회 재사용
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -158,6 +211,21 @@ DATABASES = {
 }
 
 
+# 캐시 (BookInfo 메타 등). 기본 프로세스 메모리(locmem), DJANGO_CACHE_DIR를 주면 파일 캐시(프로세스 간 공유)
+CACHE_DIR = os.getenv("DJANGO_CACHE_DIR")
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    } if CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'stopmoving',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+}
+BOOKINFO_CACHE_TTL = 3600 # BookInfo 메타 캐시 유지 시간(초), 저장/삭제 시에는 바로 지움
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
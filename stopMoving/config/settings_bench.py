@@ -0,0 +1,22 @@
+# config/settings_bench.py
+# 추천 벤치마크용 설정 (SQLite 파일 DB)
+#   python manage.py bench_recommend --settings=config.settings_bench
+#   DJANGO_SETTINGS_MODULE=config.settings_bench pytest tests/bench_recommend.py
+import os
+
+os.environ.setdefault("DISABLE_PREFERENCES_PRELOAD", "1") # KeyBERT 모델 로딩 생략
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import BASE_DIR, PROJECT_APPS  # noqa: E402
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv("BENCH_DB_PATH", os.path.join(BASE_DIR, "bench.sqlite3")),
+    }
+}
+
+# 일부 마이그레이션이 MySQL 전용 SQL을 써서 프로젝트 앱은 모델 기준으로 바로 테이블 생성 (migrate --run-syncdb)
+MIGRATION_MODULES = {app.split(".")[0]: None for app in PROJECT_APPS}
+
+JOBS_BACKEND = "sync"
@@ -0,0 +1,114 @@
+# core/aladin_cache.py
+# 알라딘 API 응답 디스크 캐시 (sqlite 파일 1개, 프로세스/재실행 간 공유)
+# - 키: 엔드포인트 + 파라미터(ttbkey 제외)
+# - 유효 기간은 호출 종류별(ALADIN_CACHE_TTLS), 지난 달 이전 Bestseller 주차는 바뀌지 않으므로 영구 보관
+# - ALADIN_CACHE_PATH가 비어 있으면 캐시 사용 안 함
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    body TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL
+)
+"""
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+
+
+def _path() -> Optional[str]:
+    return getattr(settings, "ALADIN_CACHE_PATH", None) or None
+
+
+def _db() -> Optional[sqlite3.Connection]:
+    """캐시 파일 연결 (스레드 공유, 사용은 _lock 안에서만)"""
+    global _conn, _conn_path
+    path = _path()
+    if not path:
+        return None
+    if _conn is None or _conn_path != path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        _conn, _conn_path = conn, path
+    return _conn
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    items = sorted((str(k), str(v)) for k, v in params.items() if k.lower() != "ttbkey")
+    raw = json.dumps([endpoint, items], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def ttl_for(endpoint: str, params: dict) -> Optional[float]:
+    """유효 기간(초). None = 영구, 0 = 캐시하지 않음"""
+    ttls = getattr(settings, "ALADIN_CACHE_TTLS", {})
+    default = ttls.get("default", 21600)
+    if endpoint == "ItemLookUp":
+        return ttls.get("ItemLookUp", default)
+    qt = params.get("QueryType")
+    if qt == "Bestseller" and params.get("Year") and params.get("Month"):
+        today = date.today()
+        if (int(params["Year"]), int(params["Month"])) < (today.year, today.month):
+            return None
+    return ttls.get(qt, default)
+
+
+def get(endpoint: str, params: dict) -> Optional[dict]:
+    with _lock:
+        db = _db()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT body, expires_at FROM response WHERE key = ?", (cache_key(endpoint, params),)
+        ).fetchone()
+    if row is None or (row[1] is not None and row[1] < time.time()):
+        return None
+    return json.loads(row[0])
+
+
+def put(endpoint: str, params: dict, data: dict) -> None:
+    ttl = ttl_for(endpoint, params)
+    if ttl == 0:
+        return
+    now = time.time()
+    expires_at = None if ttl is None else now + float(ttl)
+    body = json.dumps(data, ensure_ascii=False)
+    with _lock:
+        db = _db()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO response (key, endpoint, body, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (cache_key(endpoint, params), endpoint, body, now, expires_at),
+        )
+        db.commit()
+
+
+def purge_expired() -> int:
+    """만료된 응답 삭제, 지운 행 수 반환"""
+    with _lock:
+        db = _db()
+        if db is None:
+            return 0
+        cur = db.execute("DELETE FROM response WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        db.commit()
+        return cur.rowcount
@@ -1,8 +1,25 @@
+# core/aladin_client.py
+# 알라딘 TTB API 클라이언트
+# - requests.Session 1개를 프로세스에서 공유 (keep-alive 연결 풀, 스레드 여러 개에서 동시에 사용 가능)
+# - 토큰 버킷으로 초당 호출 수 제한 (ALADIN_RATE_PER_SEC, 동시 실행 스레드 전체 합계 기준)
+#   429/5xx를 받으면 속도를 절반으로(ALADIN_RATE_MIN까지), 성공할 때마다 조금씩 원래 속도로 회복
+# - 연결 오류/타임아웃/429/5xx는 지수 백오프 + 지터로 재시도 (ALADIN_MAX_RETRIES)
+# - 성공한 응답은 디스크 캐시(core/aladin_cache.py)에 저장, 유효 기간 안이면 네트워크 호출 없이 반환 (refresh=True면 무시하고 새로 받음)
+# ALADIN_BASE_URL을 바꾸면 로컬 스텁 서버로 테스트 가능
+import logging
+import random
+import threading
 import time
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import aladin_cache
+
+logger = logging.getLogger(__name__)
 
-BASE = "http://www.aladin.co.kr/ttb/api"
+BASE = getattr(settings, "ALADIN_BASE_URL", "http://www.aladin.co.kr/ttb/api")
 TTBKEY = settings.API_KEY
 COMMON_PARAMS = {
     "ttbkey": TTBKEY,
@@ -10,11 +27,131 @@ COMMON_PARAMS = {
     "Version": "20131101"
 }
 
-# get 요청을 위한 헬퍼 함수
-def _get(url, params, timeout=20):
-    r = requests.get(url, params=params, timeout=timeout)
-    r.raise_for_status()
-    return r.json()
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    초당 rate개, 최대 burst개까지 몰아서 허용. acquire()는 토큰이 생길 때까지 대기
+    slow_down()/speed_up()으로 rate를 min_rate ~ 처음 rate 사이에서 조절 (AIMD)
+    """
+
+    def __init__(self, rate: float, burst: float, min_rate: float | None = None):
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.min_rate = min(float(min_rate if min_rate is not None else self.rate), self.rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._at = time.monotonic()
+        self._slowed_at = 0.0
+        self._lock = threading.Lock()
+
+    def slow_down(self) -> None:
+        """서버가 거절(429/5xx) -> 속도 절반, 모아 둔 토큰도 버림 (동시에 여러 번 받아도 1초에 한 번만 줄임)"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._slowed_at < 1.0:
+                return
+            self._slowed_at = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            logger.info("aladin: rate -> %.2f/s", self.rate)
+
+    def speed_up(self) -> None:
+        """성공 -> 처음 속도의 5%씩 회복"""
+        if self.rate <= 0 or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+                self._at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_lock = threading.Lock()
+_session = None
+_bucket = None
+
+
+def session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                pool = int(getattr(settings, "ALADIN_POOL_SIZE", 16))
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
+
+
+def rate_limiter() -> TokenBucket:
+    global _bucket
+    if _bucket is None:
+        with _lock:
+            if _bucket is None:
+                rate = float(getattr(settings, "ALADIN_RATE_PER_SEC", 10))
+                _bucket = TokenBucket(rate, getattr(settings, "ALADIN_RATE_BURST", rate),
+                                      getattr(settings, "ALADIN_RATE_MIN", 1))
+    return _bucket
+
+
+class RetryableResponse(Exception):
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+# get 요청을 위한 헬퍼 함수 (endpoint가 있으면 디스크 캐시 사용)
+def _get(url, params, timeout=20, endpoint=None, refresh=False):
+    if endpoint and not refresh:
+        cached = aladin_cache.get(endpoint, params)
+        if cached is not None:
+            return cached
+    data = _fetch(url, params, timeout)
+    # 알라딘은 오류도 200 + errorCode로 주므로 그런 응답은 저장하지 않음
+    if endpoint and isinstance(data, dict) and "errorCode" not in data:
+        aladin_cache.put(endpoint, params, data)
+    return data
+
+
+def _fetch(url, params, timeout):
+    retries = int(getattr(settings, "ALADIN_MAX_RETRIES", 3))
+    backoff = float(getattr(settings, "ALADIN_RETRY_BACKOFF", 0.5))
+    for attempt in range(retries + 1):
+        rate_limiter().acquire()
+        try:
+            r = session().get(url, params=params, timeout=timeout)
+            if r.status_code in _RETRY_STATUS:
+                rate_limiter().slow_down()
+                raise RetryableResponse(r)
+            r.raise_for_status()
+            rate_limiter().speed_up()
+            return r.json()
+        except (requests.ConnectionError, requests.Timeout, RetryableResponse) as e:
+            if attempt == retries:
+                if isinstance(e, RetryableResponse):
+                    e.response.raise_for_status()
+                raise
+            # full jitter: 0 ~ backoff * 2^attempt 사이 임의 대기 (여러 스레드가 동시에 재시도하지 않도록)
+            delay = random.uniform(0, backoff * (2 ** attempt))
+            logger.warning("aladin: %s %s, retry %d in %.2fs", url, e, attempt + 1, delay)
+            time.sleep(delay)
 
 # 상품 리스트 API
 def get_booklist(
@@ -26,6 +163,7 @@ def get_booklist(
     year: int | None = None,
     month: int | None = None,
     week: int | None = None,
+    refresh: bool = False,
 ):
     params = {
         **COMMON_PARAMS,
@@ -44,13 +182,15 @@ def get_booklist(
     if week is not None:
         params["Week"] = week
 
-    return _get(f"{BASE}/ItemList.aspx", params)
+    return _get(f"{BASE}/ItemList.aspx", params, endpoint="ItemList", refresh=refresh)
 
-# 상품 상세 조회 API
-def item_lookup(isbn: str):
+# 상품 상세 조회 API (cover: 표지 크기, 예: "Big")
+def item_lookup(isbn: str, refresh: bool = False, cover: str | None = None):
     params = {
         **COMMON_PARAMS,
         "ItemIdType": "ISBN13" if len(isbn) == 13 else "ISBN",
         "ItemId": isbn
     }
-    return _get(f"{BASE}/ItemLookUp.aspx", params)
\ No newline at end of file
+    if cover is not None:
+        params["Cover"] = cover
+    return _get(f"{BASE}/ItemLookUp.aspx", params, endpoint="ItemLookUp", refresh=refresh)
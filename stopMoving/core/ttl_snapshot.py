@@ -0,0 +1,61 @@
+# core/ttl_snapshot.py
+# 프로세스 캐시 공통: DB에서 읽은 값(스냅샷)을 TTL 동안 재사용
+# - get(load): 유효하면 락 없이 바로 반환, 없거나 만료됐으면 락 안에서 한 번만 load()
+#   TTL(settings의 ttl_setting, 초)은 다른 프로세스에서 바뀐 내용을 반영하기 위한 주기
+# - 시그널로 들어오는 변경분은 peek()으로 확인해 아직 읽기 전이면 무시 (처음 get() 때 DB에서 어차피 읽음)
+# - 변경분 반영/교체는 lock 안에서 (RLock: load/update 안에서 expire() 등을 불러도 됨)
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from django.conf import settings
+
+T = TypeVar("T")
+
+
+class TTLSnapshot(Generic[T]):
+    def __init__(self, ttl_setting: str, default_ttl: float = 600):
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self.lock = threading.RLock()
+        self._value: Optional[T] = None
+        self._loaded_at = 0.0
+
+    def ttl(self) -> float:
+        return float(getattr(settings, self.ttl_setting, self.default_ttl))
+
+    def _fresh(self) -> bool:
+        return self._value is not None and time.monotonic() - self._loaded_at < self.ttl()
+
+    def get(self, load: Callable[[], T], update: Optional[Callable[[T], T]] = None) -> T:
+        """
+        유효한 값 반환. 없거나 만료됐으면 load()로 다시 읽음
+        update가 있으면 유효한 값에 락 안에서 적용한 결과로 교체 (쌓아둔 변경분 반영용)
+        """
+        value = self._value
+        if update is None and value is not None and time.monotonic() - self._loaded_at < self.ttl():
+            return value
+        with self.lock:
+            if not self._fresh():
+                self._value = load()
+                self._loaded_at = time.monotonic()
+            elif update is not None:
+                self._value = update(self._value)
+            return self._value
+
+    def peek(self) -> Optional[T]:
+        """읽어 둔 값 (아직 없으면 None). 만료 여부는 보지 않음"""
+        return self._value
+
+    def replace(self, value: T) -> None:
+        """읽어 둔 값을 새 스냅샷으로 교체 (TTL 시계는 그대로). lock 안에서 호출"""
+        self._value = value
+
+    def expire(self) -> None:
+        """값은 두고 다음 get()에서 다시 읽게 함"""
+        self._loaded_at = 0.0
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self._value = None
+            self._loaded_at = 0.0
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after", "locked_by", "updated_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "last_error")
+    ordering = ("-id",)
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # 각 앱의 tasks.py에 있는 @task 등록을 불러옴
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules("tasks")
@@ -0,0 +1,26 @@
+# jobs/management/commands/run_jobs.py
+from django.core.management.base import BaseCommand
+from jobs.worker import run_worker
+
+class Command(BaseCommand):
+    help = "DB 작업 큐(Job) 워커 실행"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="동시에 실행할 작업 수 (기본 2)")
+        parser.add_argument("--batch-size", type=int, default=10, help="한 번에 선점할 최대 작업 수 (기본 10)")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="대기 작업이 없을 때 폴링 간격(초)")
+        parser.add_argument("--once", action="store_true", help="지금 실행 가능한 작업만 처리하고 종료")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(self.style.NOTICE(f"run_jobs: concurrency={opts['concurrency']} 시작"))
+        try:
+            processed = run_worker(
+                concurrency=opts["concurrency"],
+                batch_size=opts["batch_size"],
+                poll_interval=opts["poll_interval"],
+                once=opts["once"],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("run_jobs: 중단"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"run_jobs: {processed}건 처리"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='dedupe_key',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['dedupe_key', 'status'], name='Job_dedupe__546939_idx'),
+        ),
+    ]
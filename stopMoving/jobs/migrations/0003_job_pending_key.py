@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_dedupe_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pending_key',
+            field=models.CharField(blank=True, max_length=150, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+
+# DB 기반 백그라운드 작업 큐
+class Job(models.Model):
+    STATUS = [
+        ("PENDING", "대기"),
+        ("RUNNING", "실행중"),
+        ("DONE", "완료"),
+        ("FAILED", "실패"),
+    ]
+
+    name = models.CharField(max_length=100) # 등록된 task 이름
+    payload = models.JSONField(default=dict, blank=True) # task 인자(kwargs)
+    dedupe_key = models.CharField(max_length=150, blank=True, default="") # 같은 키의 대기 작업은 1개로 합침 (debounce)
+    pending_key = models.CharField(max_length=150, null=True, blank=True, unique=True) # 새로 등록된 대기 작업만 dedupe_key, 선점되면 NULL -> 키당 대기 작업 1개를 DB가 보장
+    status = models.CharField(max_length=10, choices=STATUS, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField() # 이 시각 이후 실행 (재시도 backoff)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "Job"
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["dedupe_key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name}#{self.pk} [{self.status}]"
@@ -0,0 +1,225 @@
+# jobs/queue.py
+# 백그라운드 작업 등록/실행
+# settings.JOBS_BACKEND
+#   "db"     : Job 테이블에 저장 -> `manage.py run_jobs` 워커가 실행 (운영)
+#   "thread" : 프로세스 내 스레드풀에서 실행, 가득 차면 DB 큐로 넘김 (개발)
+#   "sync"   : 커밋 직후 요청 스레드에서 바로 실행 (디버깅)
+# dedupe_key를 주면 같은 키의 대기 작업은 1개로 합쳐지고, 다시 등록될 때마다 실행 시각이 delay만큼 밀림 (debounce)
+# 같은 키 작업은 동시에 1개만 실행 (실행 중에 등록된 작업은 끝난 뒤 실행)
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_registry: dict = {}
+
+
+class Task:
+    def __init__(self, fn, name: str, max_attempts: int):
+        self.fn = fn
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def enqueue(self, *, delay: float = 0, dedupe_key: str = "", **payload):
+        return enqueue(self.name, delay=delay, dedupe_key=dedupe_key, **payload)
+
+
+# tasks.py에서 @task("앱.이름")으로 등록
+def task(name: str | None = None, max_attempts: int | None = None):
+    def deco(fn):
+        t = Task(
+            fn,
+            name or f"{fn.__module__}.{fn.__name__}",
+            max_attempts or int(getattr(settings, "JOBS_MAX_ATTEMPTS", 3)),
+        )
+        _registry[t.name] = t
+        return t
+    return deco
+
+
+def get_task(name: str) -> Task | None:
+    return _registry.get(name)
+
+
+# 재시도 대기시간: 지수 backoff + jitter
+def retry_delay(attempts: int) -> float:
+    base = float(getattr(settings, "JOBS_RETRY_BASE_DELAY", 5))
+    return base * (2 ** max(attempts - 1, 0)) * (0.5 + random.random())
+
+
+def _backend() -> str:
+    return getattr(settings, "JOBS_BACKEND", "db")
+
+
+def enqueue(name: str, *, on_commit: bool = True, delay: float = 0, dedupe_key: str = "", **payload):
+    """
+    작업 등록. payload는 JSON 직렬화 가능한 값만(id, isbn 등).
+    기본은 현재 트랜잭션 커밋 후 등록 -> 롤백되면 작업도 생기지 않음.
+    dedupe_key: 같은 키로 아직 실행 안 된 작업이 있으면 새로 만들지 않고 실행 시각만 now + delay로 미룸
+    (단, 처음 등록 후 JOBS_DEBOUNCE_MAX_WAIT초가 지나면 더 미루지 않음)
+    """
+    if name not in _registry:
+        raise KeyError(f"등록되지 않은 task입니다: {name}")
+    if on_commit:
+        transaction.on_commit(lambda: _dispatch(name, payload, delay, dedupe_key))
+    else:
+        _dispatch(name, payload, delay, dedupe_key)
+
+
+def _dispatch(name: str, payload: dict, delay: float, dedupe_key: str = ""):
+    backend = _backend()
+    if backend == "sync":
+        try:
+            _registry[name].fn(**payload)
+        except Exception:
+            logger.exception("job %s failed (sync)", name)
+    elif backend == "thread":
+        _thread_backend.submit(name, payload, delay, dedupe_key)
+    else:
+        save_job(name, payload, delay, dedupe_key)
+
+
+def _max_wait() -> float:
+    return float(getattr(settings, "JOBS_DEBOUNCE_MAX_WAIT", 300))
+
+
+def save_job(name: str, payload: dict, delay: float = 0, dedupe_key: str = ""):
+    from .models import Job
+    t = _registry[name]
+    now = timezone.now()
+    run_after = now + timedelta(seconds=delay)
+    if dedupe_key:
+        pending = Job.objects.filter(dedupe_key=dedupe_key, status="PENDING")
+        # 대기 중인 작업이 있으면 합침: 오래 기다린 작업(max wait 초과)은 그대로 두고 나머지는 실행 시각만 미룸
+        if pending.filter(created_at__gte=now - timedelta(seconds=_max_wait())).update(run_after=run_after):
+            return None
+        if pending.exists():
+            return None
+    try:
+        # 같은 키로 동시에 등록되면 pending_key unique 위반 -> 먼저 만든 쪽에 합쳐진 것으로 봄
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                payload=payload,
+                dedupe_key=dedupe_key,
+                pending_key=dedupe_key or None,
+                max_attempts=t.max_attempts,
+                run_after=run_after,
+            )
+    except IntegrityError:
+        if not dedupe_key:
+            raise
+        Job.objects.filter(pending_key=dedupe_key, created_at__gte=now - timedelta(seconds=_max_wait())).update(
+            run_after=run_after,
+        )
+        return None
+
+
+class _ThreadBackend:
+    """개발용 스레드풀. 대기 슬롯(JOBS_THREAD_MAX_PENDING)이 가득 차면 DB 큐로 넘겨 유실 방지"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pending: dict = {}  # dedupe_key -> [실행 예정 시각, 최초 등록 시각, name, payload]
+        self._running: set = set()  # 실행 중인 dedupe_key
+
+    def _ensure(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = int(getattr(settings, "JOBS_THREAD_WORKERS", 2))
+                    self._slots = threading.BoundedSemaphore(int(getattr(settings, "JOBS_THREAD_MAX_PENDING", 100)))
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+
+    def submit(self, name: str, payload: dict, delay: float, dedupe_key: str = ""):
+        self._ensure()
+        if dedupe_key:
+            self._debounce(name, payload, delay, dedupe_key)
+            return
+        if not self._slots.acquire(blocking=False):
+            logger.warning("job thread pool full, spilling %s to db queue", name)
+            save_job(name, payload, delay)
+            return
+        self._executor.submit(self._run, name, payload, delay)
+
+    def _run_task(self, name: str, payload: dict, delay: float):
+        t = _registry[name]
+        try:
+            if delay:
+                time.sleep(delay)
+            for attempt in range(1, t.max_attempts + 1):
+                close_old_connections()
+                try:
+                    t.fn(**payload)
+                    return
+                except Exception:
+                    logger.exception("job %s failed (attempt %d/%d)", name, attempt, t.max_attempts)
+                    if attempt < t.max_attempts:
+                        time.sleep(retry_delay(attempt))
+        finally:
+            close_old_connections()
+            self._slots.release()
+
+    # 같은 키는 타이머 1개만 유지, 재등록 시 실행 예정 시각만 갱신 (풀의 워커 스레드는 대기에 쓰지 않음)
+    def _debounce(self, name: str, payload: dict, delay: float, key: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[0] = min(now + delay, entry[1] + _max_wait())
+                entry[3] = payload
+                return
+            self._pending[key] = [now + delay, now, name, payload]
+        self._arm(key, delay)
+
+    def _arm(self, key: str, delay: float):
+        timer = threading.Timer(max(delay, 0), self._fire, args=(key,))
+        timer.daemon = True
+        timer.start()
+
+    def _fire(self, key: str):
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                return
+            wait = entry[0] - time.monotonic()
+            if wait <= 0 and key in self._running:
+                wait = 0.5  # 같은 키 작업이 아직 실행 중 -> 끝난 뒤 실행
+            if wait > 0:
+                self._arm(key, wait)
+                return
+            del self._pending[key]
+            self._running.add(key)
+            name, payload = entry[2], entry[3]
+        if not self._slots.acquire(blocking=False):
+            logger.warning("job thread pool full, spilling %s to db queue", name)
+            with self._lock:
+                self._running.discard(key)
+            save_job(name, payload, 0, key)
+            close_old_connections()
+            return
+        self._executor.submit(self._run, name, payload, 0, key)
+
+    def _run(self, name: str, payload: dict, delay: float, dedupe_key: str = ""):
+        try:
+            self._run_task(name, payload, delay)
+        finally:
+            if dedupe_key:
+                with self._lock:
+                    self._running.discard(dedupe_key)
+
+
+_thread_backend = _ThreadBackend()
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import save_job, task
+from .worker import claim, execute
+
+calls = {"once": 0, "fail": 0}
+
+
+@task("jobs.tests.once")
+def once_task():
+    calls["once"] += 1
+
+
+@task("jobs.tests.always_fails", max_attempts=2)
+def always_fails():
+    calls["fail"] += 1
+    raise RuntimeError("boom")
+
+
+def _run_all(worker: str = "test") -> int:
+    """지금 실행 가능한 작업을 모두 선점해서 실행, 실행한 수 반환"""
+    jobs = claim(10, worker)
+    for job in jobs:
+        execute(job)
+    return len(jobs)
+
+
+@override_settings(JOBS_BACKEND="db", JOBS_RETRY_BASE_DELAY=0, JOBS_DEBOUNCE_MAX_WAIT=300)
+class JobWorkerTests(TestCase):
+    def setUp(self):
+        calls.update(once=0, fail=0)
+
+    def test_dedupe_key_runs_once(self):
+        for _ in range(3):
+            save_job("jobs.tests.once", {}, dedupe_key="k1")
+        self.assertEqual(Job.objects.filter(dedupe_key="k1").count(), 1)
+
+        self.assertEqual(_run_all(), 1)
+        self.assertEqual(_run_all(), 0)
+        self.assertEqual(calls["once"], 1)
+        self.assertEqual(Job.objects.get(dedupe_key="k1").status, "DONE")
+
+    def test_concurrent_save_with_same_key_is_merged(self):
+        first = save_job("jobs.tests.once", {}, dedupe_key="k3")
+        # 동시에 등록된 다른 요청은 아직 커밋 전인 대기 작업을 보지 못함 -> create에서 합쳐져야 함
+        with mock.patch.object(Job.objects, "filter", return_value=Job.objects.none()):
+            self.assertIsNone(save_job("jobs.tests.once", {}, dedupe_key="k3"))
+        self.assertEqual(list(Job.objects.filter(dedupe_key="k3")), [first])
+
+    def test_same_key_waits_while_running(self):
+        save_job("jobs.tests.once", {}, dedupe_key="k2")
+        running = claim(10, "w1")
+        self.assertEqual(len(running), 1)
+
+        # 실행 중에 들어온 같은 키 작업은 끝날 때까지 선점되지 않음
+        save_job("jobs.tests.once", {}, dedupe_key="k2")
+        self.assertEqual(claim(10, "w2"), [])
+
+        execute(running[0])
+        self.assertEqual(_run_all("w2"), 1)
+        self.assertEqual(calls["once"], 2)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        save_job("jobs.tests.always_fails", {})
+
+        with self.assertLogs("jobs.worker", "ERROR"):
+            self.assertEqual(_run_all(), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ("PENDING", 1))
+        self.assertIn("boom", job.last_error)
+
+        with self.assertLogs("jobs.worker", "ERROR"):
+            self.assertEqual(_run_all(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 2))
+        self.assertEqual(_run_all(), 0)
+        self.assertEqual(calls["fail"], 2)
+
+    def test_stale_running_job_at_max_attempts_is_failed(self):
+        # 워커가 죽어 RUNNING으로 남은 작업: 시도 횟수가 남았으면 다시 선점, 다 썼으면 FAILED
+        stale = timezone.now() - timedelta(hours=1)
+        common = dict(name="jobs.tests.once", status="RUNNING", max_attempts=2,
+                      run_after=stale, locked_at=stale, locked_by="dead")
+        spent = Job.objects.create(attempts=2, **common)
+        retry = Job.objects.create(attempts=1, **common)
+
+        self.assertEqual([j.pk for j in claim(10, "w1")], [retry.pk])
+        spent.refresh_from_db()
+        self.assertEqual(spent.status, "FAILED")
+        self.assertIsNone(spent.locked_at)
+        self.assertIn("dead", spent.last_error)
@@ -0,0 +1,132 @@
+# jobs/worker.py
+# DB 큐(Job 테이블) 워커: 선점(claim) -> 실행 -> 완료/재시도/실패 기록
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, F, OuterRef, Q, TextField, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_task, retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(batch_size: int, locked_by: str) -> list[Job]:
+    """
+    실행할 작업을 batch_size개까지 선점.
+    SKIP LOCKED로 다른 워커가 잡은 행은 건너뛰고, 오래 RUNNING인 행(워커 죽음)은 다시 가져온다.
+    (단, 이미 max_attempts만큼 시도한 행은 FAILED로 -> 워커를 죽이는 작업이 무한히 다시 잡히지 않음)
+    같은 dedupe_key 작업이 실행 중이면 그 키의 대기 작업은 끝날 때까지 건너뜀 (키당 동시 실행 1개)
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=int(getattr(settings, "JOBS_LOCK_TIMEOUT", 300)))
+    in_flight = Job.objects.filter(
+        dedupe_key=OuterRef("dedupe_key"), status="RUNNING", locked_at__gte=stale,
+    ).exclude(dedupe_key="")
+    with transaction.atomic():
+        Job.objects.filter(status="RUNNING", locked_at__lt=stale, attempts__gte=F("max_attempts")).update(
+            status="FAILED", locked_at=None,
+            last_error=Concat(Value("워커가 응답 없이 종료됨 (JOBS_LOCK_TIMEOUT 초과): "), F("locked_by"),
+                              output_field=TextField()),
+        )
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING", run_after__lte=now)
+                    | Q(status="RUNNING", locked_at__lt=stale, attempts__lt=F("max_attempts")))
+            .exclude(Q(status="PENDING") & Exists(in_flight))
+            .order_by("run_after", "id")[:batch_size]
+        )
+        # 같은 키 작업이 한 번에 여러 개 잡히면 첫 번째만 실행
+        seen = set()
+        picked = []
+        for j in jobs:
+            if j.dedupe_key and j.dedupe_key in seen:
+                continue
+            seen.add(j.dedupe_key)
+            picked.append(j)
+        jobs = picked
+        if jobs:
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(
+                status="RUNNING", locked_at=now, locked_by=locked_by, attempts=F("attempts") + 1, pending_key=None,
+            )
+    for j in jobs:
+        j.attempts += 1
+    return jobs
+
+
+def execute(job: Job) -> bool:
+    t = get_task(job.name)
+    try:
+        if t is None:
+            raise LookupError(f"등록되지 않은 task입니다: {job.name}")
+        t.fn(**(job.payload or {}))
+    except Exception:
+        err = traceback.format_exc()
+        logger.exception("job %s#%s failed (attempt %d/%d)", job.name, job.pk, job.attempts, job.max_attempts)
+        if t is not None and job.attempts < job.max_attempts:
+            # 재시도 대기는 pending_key 없이 (실행 중에 같은 키로 새 작업이 등록됐을 수 있음)
+            Job.objects.filter(pk=job.pk).update(
+                status="PENDING", locked_at=None, locked_by="", last_error=err,
+                run_after=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(status="FAILED", locked_at=None, last_error=err)
+        return False
+    Job.objects.filter(pk=job.pk).update(status="DONE", locked_at=None, last_error="")
+    return True
+
+
+def run_worker(concurrency: int = 2, batch_size: int = 10, poll_interval: float = 1.0,
+               once: bool = False, stop: threading.Event | None = None) -> int:
+    """
+    작업 루프. 실행 중인 작업 수가 concurrency를 넘지 않도록 빈 슬롯만큼만 선점(백프레셔).
+    once=True면 지금 실행 가능한 작업만 처리하고 종료. 처리한 작업 수 반환.
+    """
+    stop = stop or threading.Event()
+    me = worker_id()
+    slots = threading.Semaphore(concurrency)
+    processed = 0
+
+    def _run(job):
+        try:
+            close_old_connections()
+            execute(job)
+        finally:
+            close_old_connections()
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="jobs-worker") as pool:
+        while not stop.is_set():
+            free = 0
+            while free < batch_size and slots.acquire(blocking=False):
+                free += 1
+            if free == 0:
+                time.sleep(min(poll_interval, 0.2))
+                continue
+
+            jobs = claim(free, me)
+            for _ in range(free - len(jobs)):
+                slots.release()
+            for job in jobs:
+                pool.submit(_run, job)
+            processed += len(jobs)
+
+            if not jobs:
+                if once:
+                    break
+                stop.wait(poll_interval)
+    return processed
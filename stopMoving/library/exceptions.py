@@ -10,4 +10,9 @@ class LibraryNotFound(APIException):
 class BookNotFound(APIException):
     status_code = 404
     default_detail = "해당 도서관에 구매 가능한(AVAILABLE) 도서가 없습니다."
-    default_code = "BOOK_404"
\ No newline at end of file
+    default_code = "BOOK_404"
+
+class InvalidHoldingsQuery(APIException):
+    status_code = 400
+    default_detail = "잘못된 목록 조회 파라미터입니다."
+    default_code = "LIBRARY_400"
@@ -0,0 +1,167 @@
+# library/geo.py
+# 도서관 위치 색인 (프로세스 캐시)
+# - 좌표 배열을 미리 만들어 두고 거리(haversine)는 numpy로 한 번에 계산
+# - 위/경도 격자(LIBRARY_GEO_CELL_DEG도 단위) -> 가까운 칸부터 링 단위로 넓혀가며 "가까운 N개" 검색
+# Library 저장/삭제 시그널(library/signals.py)에서 invalidate()
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q, Sum
+
+from core.ttl_snapshot import TTLSnapshot
+
+logger = logging.getLogger(__name__)
+
+EARTH_M = 6371000.0
+_DEG_M = EARTH_M * np.pi / 180.0  # 위도 1도 거리(m)
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """(lat, lng)에서 각 좌표까지의 거리(m) 배열"""
+    p1, p2 = np.radians(lat), np.radians(lats)
+    dp = p2 - p1
+    dl = np.radians(lngs - lng)
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def format_distance(d_m: Optional[float]) -> Optional[str]:
+    """표시용: 1km 이상은 "1.2km", 미만은 "850m" (정렬은 숫자 거리로)"""
+    if d_m is None:
+        return None
+    d_m = int(round(d_m))
+    return f"{d_m/1000:.1f}km" if d_m >= 1000 else f"{d_m}m"
+
+
+class _Snapshot:
+    """좌표가 있는 도서관만. ids/lats/lngs는 같은 순서, cells: (행, 열) -> 배열 위치들"""
+
+    def __init__(self, rows: list, cell_deg: float):
+        self.ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.lats = np.array([r[1] for r in rows], dtype=np.float64)
+        self.lngs = np.array([r[2] for r in rows], dtype=np.float64)
+        self.pos_of = {int(i): p for p, i in enumerate(self.ids)}
+        self.cell_deg = cell_deg
+        cells: dict = {}
+        for p, key in enumerate(zip(self._cell(self.lats), self._cell(self.lngs))):
+            cells.setdefault(key, []).append(p)
+        self.cells = {k: np.array(v, dtype=np.int64) for k, v in cells.items()}
+        self.keys = np.array(list(self.cells), dtype=np.int64).reshape(-1, 2)
+        self.max_abs_lat = float(np.abs(self.lats).max()) if len(rows) else 0.0
+
+    def _cell(self, v):
+        return np.floor(np.asarray(v) / self.cell_deg).astype(np.int64)
+
+
+class LibraryGeoIndex:
+    def __init__(self):
+        self._cache: TTLSnapshot[_Snapshot] = TTLSnapshot("LIBRARY_GEO_TTL")
+
+    def _load(self) -> _Snapshot:
+        from .models import Library
+        rows = list(Library.objects
+                    .filter(lat__isnull=False, long__isnull=False)
+                    .order_by("id")
+                    .values_list("id", "lat", "long"))
+        logger.debug("geo: indexed %d libraries", len(rows))
+        return _Snapshot(rows, float(getattr(settings, "LIBRARY_GEO_CELL_DEG", 0.05)))
+
+    def get(self) -> _Snapshot:
+        return self._cache.get(self._load)
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def distances(self, lat: float, lng: float, library_ids: Iterable[int]) -> dict:
+        """{library_id: 거리(m)} (좌표 없는 도서관은 빠짐)"""
+        snap = self.get()
+        pos = [snap.pos_of[i] for i in map(int, library_ids) if i in snap.pos_of]
+        if not pos:
+            return {}
+        pos = np.array(pos, dtype=np.int64)
+        d = haversine_m(lat, lng, snap.lats[pos], snap.lngs[pos])
+        return {int(snap.ids[p]): float(x) for p, x in zip(pos, d)}
+
+    def nearest(self, lat: float, lng: float, n: int, allowed: Optional[set] = None,
+                max_m: Optional[float] = None) -> list:
+        """
+        가까운 순 [(library_id, 거리 m)] 최대 n개. allowed가 있으면 그 도서관만.
+        내 칸에서 링(r칸)씩 넓혀가며 후보를 모으고, n개를 찾았고 n번째 거리가 아직 안 본 칸까지의 최소 거리보다 가까우면 멈춤
+        """
+        snap = self.get()
+        if not snap.cells or n <= 0:
+            return []
+        ci, cj = int(snap._cell(lat)), int(snap._cell(lng))
+        # 이 링까지 돌면 모든 칸을 본 것
+        last_ring = int(np.abs(snap.keys - np.array([ci, cj])).max())
+        # 링 r 바깥의 점까지 최소 거리 >= r칸. 경도 칸이 가장 좁은 위도 기준으로 보수적으로
+        cos_lat = max(np.cos(np.radians(min(max(abs(lat), snap.max_abs_lat), 89.0))), 1e-6)
+        cell_m = snap.cell_deg * _DEG_M * cos_lat
+        allowed_ids = np.fromiter(allowed, dtype=np.int64) if allowed is not None else None
+
+        seen: list = []
+        best: list = []
+        for r in range(last_ring + 1):
+            ring = [(ci + di, cj + dj) for di in range(-r, r + 1) for dj in range(-r, r + 1)
+                    if max(abs(di), abs(dj)) == r]
+            got = [snap.cells[k] for k in ring if k in snap.cells]
+            if got:
+                pos = np.concatenate(got)
+                if allowed_ids is not None:
+                    pos = pos[np.isin(snap.ids[pos], allowed_ids)]
+                if pos.size:
+                    seen.append(pos)
+                    pos = np.concatenate(seen)
+                    d = haversine_m(lat, lng, snap.lats[pos], snap.lngs[pos])
+                    order = np.argsort(d, kind="stable")[:n]
+                    best = [(int(snap.ids[pos[i]]), float(d[i])) for i in order]
+            bound = r * cell_m
+            if max_m is not None and bound >= max_m:
+                break
+            if len(best) >= n and best[-1][1] <= bound:
+                break
+        if max_m is not None:
+            best = [b for b in best if b[1] <= max_m]
+        return best
+
+
+library_geo_index = LibraryGeoIndex()
+
+
+def libraries_with_stock(isbn: str, lat: Optional[float] = None, lng: Optional[float] = None,
+                         limit: Optional[int] = None) -> list:
+    """
+    isbn 재고(AVAILABLE)가 있는 도서관 목록.
+    좌표가 있으면 가까운 순(숫자 거리 기준), 좌표 없는 도서관은 뒤로. limit이 있으면 가까운 limit개만
+    """
+    from bookinfo.models import BookInfoLibrary
+
+    qs = (BookInfoLibrary.objects
+          .filter(isbn=isbn)
+          .values("library_id__id", "library_id__name")
+          .annotate(available_books=Sum("quantity", filter=Q(status="AVAILABLE")))
+          .filter(available_books__gt=0))
+    stock = {row["library_id__id"]: row for row in qs}
+
+    if lat is None or lng is None:
+        ranked = [(i, None) for i in stock]
+    elif limit is not None:
+        ranked = library_geo_index.nearest(lat, lng, limit, allowed=set(stock))
+        # 좌표가 없는 도서관은 거리순 뒤에 채움
+        if len(ranked) < limit:
+            have = {i for i, _ in ranked}
+            ranked += [(i, None) for i in stock if i not in have and i not in library_geo_index.get().pos_of]
+    else:
+        dist = library_geo_index.distances(lat, lng, stock)
+        ranked = sorted(((i, dist.get(i)) for i in stock), key=lambda x: (x[1] is None, x[1] or 0.0))
+
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [{
+        "library_id": i,
+        "name": stock[i]["library_id__name"],
+        "distance_m": format_distance(d),
+        "available_books": stock[i]["available_books"],
+    } for i, d in ranked]
@@ -0,0 +1,72 @@
+# library/holdings.py
+# 도서관 보유 도서 목록 (LibraryBooksAPIView)
+# - -id 기준 keyset 페이지네이션: cursor = 이전 페이지 마지막 행 id -> id < cursor 로 이어서 조회 (OFFSET 없음)
+# - values_list로 필요한 컬럼만 읽어 바로 dict로 (모델 인스턴스/serializer 거치지 않음)
+# - 전체 내보내기는 같은 keyset 조회를 청크 단위로 돌며 JSON을 흘려보냄 -> 메모리 일정
+import json
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+from bookinfo.models import BookInfoLibrary
+from .services import CATEGORIES
+
+_FIELDS = ("id", "isbn__isbn", "isbn__title", "isbn__author", "isbn__publisher", "isbn__cover_url", "quantity")
+
+
+def holdings_queryset(library_id: int, category: Optional[str] = None, title_prefix: Optional[str] = None):
+    qs = BookInfoLibrary.objects.filter(library_id=library_id, status="AVAILABLE")
+    if category:
+        qs = qs.filter(isbn__category__startswith=f"국내도서>{category}")
+    if title_prefix:
+        qs = qs.filter(isbn__title__startswith=title_prefix)
+    return qs
+
+
+def valid_category(category: Optional[str]) -> bool:
+    return not category or category in CATEGORIES
+
+
+def _item(row: tuple, compact: bool) -> dict:
+    _, isbn, title, author, publisher, cover, quantity = row
+    if compact:
+        return {"isbn": isbn, "title": title, "cover": cover}
+    # LibraryHoldingItemSerializer와 같은 필드
+    return {"isbn": isbn, "title": title, "author": author, "publisher": publisher, "cover": cover, "quantity": quantity}
+
+
+def holdings_page(qs, after: Optional[int], limit: int, compact: bool = False) -> tuple:
+    """(items, next_cursor). 다음 페이지가 없으면 next_cursor=None"""
+    if after is not None:
+        qs = qs.filter(id__lt=after)
+    rows = list(qs.order_by("-id").values_list(*_FIELDS)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1][0] if has_more else None
+    return [_item(r, compact) for r in rows], next_cursor
+
+
+def first_chunk(qs) -> tuple:
+    """스트리밍 첫 청크 (rows, 마지막 id)"""
+    chunk = int(getattr(settings, "LIBRARY_BOOKS_STREAM_CHUNK", 500))
+    rows = list(qs.order_by("-id").values_list(*_FIELDS)[:chunk])
+    return rows, (rows[-1][0] if rows else None)
+
+
+def stream_holdings(qs, first: list, after: Optional[int], compact: bool = False) -> Iterator[str]:
+    """
+    JSON 배열을 조각으로 생성. first/after는 뷰에서 미리 읽은 첫 청크(빈 목록 404 판단용)와 그 마지막 id
+    """
+    chunk = int(getattr(settings, "LIBRARY_BOOKS_STREAM_CHUNK", 500))
+    yield "["
+    sep = ""
+    rows = first
+    while True:
+        if rows:
+            yield sep + ",".join(json.dumps(_item(r, compact), ensure_ascii=False) for r in rows)
+            sep = ","
+        if after is None or len(rows) < chunk:
+            break
+        rows = list(qs.filter(id__lt=after).order_by("-id").values_list(*_FIELDS)[:chunk])
+        after = rows[-1][0] if rows else None
+    yield "]"
@@ -48,3 +48,21 @@ class LibraryDetailSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "library_image_url")
 
 
+
+class AvailabilityRequestSerializer(serializers.Serializer):
+    isbns = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=200)
+    lat = serializers.FloatField(required=False)
+    lng = serializers.FloatField(required=False)
+    radius_m = serializers.FloatField(required=False, min_value=1)
+    library_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+    def validate_isbns(self, v):
+        return list(dict.fromkeys(str(i).replace("-", "").strip() for i in v))
+
+    def validate(self, attrs):
+        has_pos = "lat" in attrs and "lng" in attrs
+        if not has_pos and "library_ids" not in attrs:
+            raise serializers.ValidationError("lat/lng 또는 library_ids가 필요합니다.")
+        if ("lat" in attrs) != ("lng" in attrs):
+            raise serializers.ValidationError("lat과 lng는 함께 보내야 합니다.")
+        return attrs
@@ -1,9 +1,10 @@
 from django.conf import settings
 from rest_framework.response import Response
 from preferences.services.embeddings import deserialize_sparse, l2_normalize
-from preferences.services.recommend import apply_boosts, cosine_scores, mmr_rerank
+from preferences.services.library_index import library_index
+from preferences.services.ann_index import ann_index
+from preferences.services.recommend import apply_boosts, boost_query, cosine_scores, mmr_rerank
 from users.models import UserBook, UserInfo
-from bookinfo.models import BookInfo, BookInfoLibrary
 from rest_framework import status
 
 CATEGORIES = ["소설/시/희곡", "만화", "어린이", "인문학", "에세이", "수험서/자격증", "경제경영", "과학"]
@@ -26,28 +27,6 @@ def preference_books_per_lib(user, lib_id: int):
         .values_list("bookinfo_id", flat=True)
     )
 
-    # lib_id에 해당하는 도서관의 수령 가능한 책들만 가져오기
-    lib_isbns = set(BookInfoLibrary.objects
-                    .filter(library_id=lib_id, status="AVAILABLE")
-                    .values_list("isbn", flat=True))
-
-    # 후보군 로드
-    cand_isbns = lib_isbns - exclude_isbns
-    items = []
-    book_qs = (
-        BookInfo.objects.filter(isbn__in=cand_isbns)
-        .exclude(vector__isnull=True).only("isbn", "vector").iterator()
-    )
-    for bi in book_qs:
-        csr = deserialize_sparse(bi.vector)
-        if csr is None or getattr(csr, "nnz", 0) > 0:
-            items.append((bi.isbn, csr))
-
-    # base scores
-    cleaned, M, base_scores = cosine_scores(user_vec, items)
-    if not cleaned:
-        return Response({"results": []}, status=status.HTTP_200_OK)
-
     # 모드별 부스트용 벡터
     sv = deserialize_sparse(getattr(ui, "preference_vector_survey", None))
     recent_vec = None
@@ -56,6 +35,16 @@ def preference_books_per_lib(user, lib_id: int):
     survey_w = float(getattr(settings, "RECOMMEND_SURVEY_BOOST", 0.25))
     recent_w = float(getattr(settings, "RECOMMEND_RECENT_BOOST", 0.30))
 
+    # lib_id 도서관의 수령 가능한 책 후보 행렬 (캐시, 본인 책은 -inf 마스킹)
+    # 도서관 후보가 많으면 근사 검색으로 좁힌 뒤 정확히 재채점
+    items = library_index.get(lib_id)
+    items = ann_index.candidates(items, boost_query(user_vec, sv, survey_w), extra=len(exclude_isbns))
+
+    # base scores
+    isbns, M, base_scores = cosine_scores(user_vec, items, exclude=exclude_isbns)
+    if not isbns:
+        return Response({"results": []}, status=status.HTTP_200_OK)
+
     boosted = apply_boosts(
         mode=mode,
         M=M,
@@ -71,6 +60,6 @@ def preference_books_per_lib(user, lib_id: int):
     lam = float(getattr(settings, "RECOMMEND_MMR_LAMBDA", 0.3))
 
     sel_idx = mmr_rerank(M, boosted, k=5, pool=pool, lam=lam)
-    ordered_isbns = [cleaned[i][0] for i in sel_idx]            # ← MMR 순서 보존
+    ordered_isbns = [isbns[i] for i in sel_idx]            # ← MMR 순서 보존
         
     return ordered_isbns
\ No newline at end of file
@@ -0,0 +1,32 @@
+# library/signals.py
+# Library 좌표 변경 -> 위치 색인(library_geo_index) 다시 만들기
+# 도서관 재고 변경 -> 재고 비트맵(library_stock_index)에 반영
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from bookinfo.signals import stock_changed
+from .geo import library_geo_index
+from .models import Library
+from .stock_index import library_stock_index
+
+
+@receiver(post_save, sender=Library)
+def sync_geo_index_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not ({"lat", "long"} & set(update_fields)):
+        return
+    transaction.on_commit(library_geo_index.invalidate)
+
+
+@receiver(post_delete, sender=Library)
+def sync_geo_index_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(library_geo_index.invalidate)
+    transaction.on_commit(library_stock_index.invalidate)
+
+
+# stock_changed는 이미 커밋 후에 전송됨
+@receiver(stock_changed)
+def sync_stock_index(sender, library_id, isbn, quantity, status, **kwargs):
+    # quantity가 F() 식인 채로 온 경우는 상태만 보고 판단
+    empty = isinstance(quantity, int) and quantity <= 0
+    library_stock_index.set_stock(library_id, isbn, status == "AVAILABLE" and not empty)
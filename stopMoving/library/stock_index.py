@@ -0,0 +1,113 @@
+# library/stock_index.py
+# 도서관 x ISBN 재고 비트맵 (프로세스 캐시)
+# - 행: 도서관, 열: isbn 번호(처음 본 순서대로 부여), 값: AVAILABLE이고 quantity > 0
+# - 재고 변경(stock_changed 시그널, library/signals.py) -> 해당 칸만 갱신
+# - LIBRARY_STOCK_INDEX_TTL(초)이 지나면 DB에서 다시 읽음 (core.ttl_snapshot)
+# "이 isbn들이 이 도서관들에 있나"를 DB 조회 없이 한 번의 배열 인덱싱으로 답함 (근처 재고 API)
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+
+from core.ttl_snapshot import TTLSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class _Bitmap:
+    """lib_row: {library_id: 행}, col_of: {isbn: 열}, bits: bool[도서관 수, 열 용량]"""
+
+    def __init__(self, lib_ids: list, col_of: dict, bits: np.ndarray):
+        self.lib_ids = lib_ids
+        self.lib_row = {lid: r for r, lid in enumerate(lib_ids)}
+        self.col_of = col_of
+        self.bits = bits
+
+
+class LibraryStockIndex:
+    def __init__(self):
+        self._cache: TTLSnapshot[_Bitmap] = TTLSnapshot("LIBRARY_STOCK_INDEX_TTL")
+
+    def _load(self) -> _Bitmap:
+        from bookinfo.models import BookInfoLibrary
+        from .models import Library
+
+        lib_ids = list(Library.objects.order_by("id").values_list("id", flat=True))
+        rows = list(BookInfoLibrary.objects
+                    .filter(status="AVAILABLE", quantity__gt=0)
+                    .values_list("library_id", "isbn"))
+        col_of: dict = {}
+        for _, isbn in rows:
+            col_of.setdefault(isbn, len(col_of))
+        bm = _Bitmap(lib_ids, col_of, np.zeros((len(lib_ids), max(len(col_of), 64)), dtype=bool))
+        if rows:
+            r = np.fromiter((bm.lib_row.get(lid, -1) for lid, _ in rows), dtype=np.int64, count=len(rows))
+            c = np.fromiter((col_of[isbn] for _, isbn in rows), dtype=np.int64, count=len(rows))
+            ok = r >= 0
+            bm.bits[r[ok], c[ok]] = True
+        logger.debug("stock index: %d libraries x %d isbns", len(lib_ids), len(col_of))
+        return bm
+
+    def get(self) -> _Bitmap:
+        return self._cache.get(self._load)
+
+    def set_stock(self, library_id: Optional[int], isbn: str, available: bool) -> None:
+        """재고 한 칸 갱신 (아직 읽지 않았으면 무시)"""
+        if library_id is None or not isbn or self._cache.peek() is None:
+            return
+        library_id = int(library_id)
+        with self._cache.lock:
+            bm = self._cache.peek()
+            if bm is None:
+                return
+            row = bm.lib_row.get(library_id)
+            col = bm.col_of.get(isbn)
+            if not available and (row is None or col is None):
+                return
+            # 쓰기는 락 안에서 하지만 읽는 쪽(availability 등)은 락 없이 같은 배열을 봄:
+            # 칸 하나씩 제자리에서 바꾸므로 한 번의 조회에 이전/이후 칸이 섞일 수 있음 (칸 단위로는 항상 옛 값 또는 새 값)
+            if row is None or (col is None and len(bm.col_of) >= bm.bits.shape[1]):
+                # 새 도서관 행 / 열 용량 부족 -> 늘린 배열로 교체 (이미 읽기 시작한 쪽은 이전 배열을 끝까지 씀)
+                lib_ids = bm.lib_ids + ([library_id] if row is None else [])
+                cap = bm.bits.shape[1] * (2 if col is None and len(bm.col_of) >= bm.bits.shape[1] else 1)
+                bits = np.zeros((len(lib_ids), cap), dtype=bool)
+                bits[:bm.bits.shape[0], :bm.bits.shape[1]] = bm.bits
+                bm = _Bitmap(lib_ids, dict(bm.col_of), bits)
+                self._cache.replace(bm)
+                row = bm.lib_row[library_id]
+            if col is None:
+                col = len(bm.col_of)
+                bm.bits[row, col] = available
+                bm.col_of[isbn] = col  # 칸을 채운 뒤 열 번호 공개 -> col_of에 보이는 열은 항상 값이 들어 있음
+            else:
+                bm.bits[row, col] = available
+
+    def invalidate(self) -> None:
+        self._cache.invalidate()
+
+    def availability(self, library_ids: Iterable[int], isbns: Iterable[str]) -> dict:
+        """{isbn: [재고 있는 library_id, ...]} (library_ids 순서 유지, 없는 isbn은 빈 목록)"""
+        bm = self.get()
+        isbns = list(dict.fromkeys(isbns))
+        libs = [lid for lid in map(int, library_ids) if lid in bm.lib_row]
+        out = {isbn: [] for isbn in isbns}
+        cols = [(isbn, bm.col_of[isbn]) for isbn in isbns if isbn in bm.col_of]
+        if not libs or not cols:
+            return out
+        rows = np.array([bm.lib_row[lid] for lid in libs], dtype=np.int64)
+        sub = bm.bits[np.ix_(rows, np.array([c for _, c in cols], dtype=np.int64))]  # [도서관, isbn]
+        for j, (isbn, _) in enumerate(cols):
+            out[isbn] = [libs[i] for i in np.flatnonzero(sub[:, j])]
+        return out
+
+    def libraries_with_any(self, isbns: Iterable[str]) -> set:
+        """isbns 중 하나라도 재고가 있는 도서관 id 집합"""
+        bm = self.get()
+        cols = [bm.col_of[i] for i in isbns if i in bm.col_of]
+        if not cols:
+            return set()
+        rows = np.flatnonzero(bm.bits[:, np.array(cols, dtype=np.int64)].any(axis=1))
+        return {bm.lib_ids[r] for r in rows}
+
+
+library_stock_index = LibraryStockIndex()
@@ -1,6 +1,6 @@
 # libraryapp/urls.py
 from django.urls import path
-from .views import LibraryDetailAPIView, LibraryBooksAPIView, LibraryListAPIView, LibraryImageUploadView, LibraryRecommendationView, LibraryDetailView, LibraryBooksDetailView
+from .views import LibraryDetailAPIView, LibraryBooksAPIView, LibraryListAPIView, LibraryImageUploadView, LibraryRecommendationView, LibraryDetailView, LibraryBooksDetailView, LibraryAvailabilityAPIView
 
 
 urlpatterns = [
@@ -11,5 +11,6 @@ urlpatterns = [
     path('upload/<int:library_id>/', LibraryImageUploadView.as_view(), name='image-upload'),
     path('recommendations/<int:library_id>/', LibraryRecommendationView.as_view(), name='library-recommendation' ), # 도서관 보유 도서에서 책 추천
     path('book-detail/<int:library_id>/', LibraryBooksDetailView.as_view(), name='library-countbook'),
+    path('availability/', LibraryAvailabilityAPIView.as_view(), name='library-availability'), # 여러 isbn x 근처 도서관 재고 일괄 조회
 
 ]
\ No newline at end of file
@@ -5,15 +5,21 @@ from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .serializer import LibraryHoldingItemSerializer, LibraryInfoSerializer, LibraryNameSerializer, LibraryDetailSerializer
+from .serializer import LibraryHoldingItemSerializer, LibraryInfoSerializer, LibraryNameSerializer, LibraryDetailSerializer, AvailabilityRequestSerializer
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from django.http import StreamingHttpResponse
 from .models import Library, LibraryImage
 from bookinfo.models import BookInfoLibrary, BookInfo
-from .exceptions import LibraryNotFound, BookNotFound  
+from bookinfo.service.meta_cache import get_book, get_books
+from .exceptions import LibraryNotFound, BookNotFound, InvalidHoldingsQuery
 from .serializer import ImageSerializer
 from django.conf import settings
 import boto3, re
 from .services import preference_books_per_lib
+from .holdings import first_chunk, holdings_page, holdings_queryset, stream_holdings, valid_category
+from .geo import format_distance, library_geo_index
+from .stock_index import library_stock_index
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count
 from bookinfo.serializers import BookDetailDisplaySerializer
@@ -49,7 +55,7 @@ class LibraryBooksDetailView(APIView):
         #     return Response({"error": "ISBN 형식이 올바르지 않습니다(10 또는 13자리)."}, status=400)
 
         books = BookInfoLibrary.objects.filter(library_id=library_id, isbn=isbn, status="AVAILABLE").aggregate(Count('isbn'))
-        bookinfo = BookInfo.objects.filter(isbn=isbn).first()
+        bookinfo = get_book(isbn)
         if not bookinfo:
             return Response({"error":"책 정보가 존재하지 않습니다."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -63,8 +69,16 @@ class LibraryBooksAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
     @swagger_auto_schema(
-        operation_description="도서관의 책 목록 조회",
-        manual_parameters=[ ],
+        operation_description="도서관의 책 목록 조회 (cursor/limit이 있으면 페이지 단위, 없으면 전체 목록을 스트리밍)",
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                              description="이전 응답의 next_cursor"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False, description="페이지 크기"),
+            openapi.Parameter('category', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="카테고리"),
+            openapi.Parameter('title', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False, description="제목 앞부분"),
+            openapi.Parameter('compact', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False,
+                              description="isbn/title/cover만 반환"),
+        ],
         responses={
             200: "성공",
             400: "잘못된 요청",
@@ -73,30 +87,41 @@ class LibraryBooksAPIView(APIView):
     )
     def get(self, request, library_id: int):
         # 1) 도서관 존재 확인 (없으면 404 커스텀)
-        library = Library.objects.filter(pk=library_id).first()
-        if not library:
+        if not Library.objects.filter(pk=library_id).exists():
             raise LibraryNotFound
-        
-        # 2) 상태가 AVAILABLE인 책만 필터링 + BookInfo 조인
-        qs = (
-            BookInfoLibrary.objects
-            .filter(library_id=library.id, status="AVAILABLE")
-            .select_related("isbn") 
-            .only(
-                "id", "status",
-                "isbn__isbn", "isbn__title", "isbn__author",
-                "isbn__publisher", "isbn__cover_url"
-            )
-            .order_by("-id")
-        )
 
-        # 3) 책 없음 → 404 커스텀
-        if not qs.exists():
-            raise BookNotFound
+        # 2) 파라미터
+        category = (request.GET.get("category") or "").strip() or None
+        title = (request.GET.get("title") or "").strip() or None
+        compact = request.GET.get("compact", "").lower() in ("1", "true")
+        if not valid_category(category):
+            raise InvalidHoldingsQuery(f"허용되지 않은 category: {category}")
+        try:
+            cursor = int(request.GET["cursor"]) if request.GET.get("cursor") else None
+            limit = int(request.GET["limit"]) if request.GET.get("limit") else None
+        except ValueError:
+            raise InvalidHoldingsQuery("cursor/limit은 정수입니다.")
+
+        # 3) AVAILABLE인 책만 (-id 순)
+        qs = holdings_queryset(library_id, category, title)
+
+        # 4) 페이지 단위: {"results": [...], "next_cursor": 마지막 id 또는 null}
+        if cursor is not None or limit is not None:
+            max_limit = int(getattr(settings, "LIBRARY_BOOKS_MAX_PAGE_SIZE", 200))
+            limit = min(max(limit or int(getattr(settings, "LIBRARY_BOOKS_PAGE_SIZE", 50)), 1), max_limit)
+            items, next_cursor = holdings_page(qs, cursor, limit, compact)
+            if not items and cursor is None:
+                raise BookNotFound
+            return Response({"results": items, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
 
-        # 4) 직렬화 & 반환 (전체 목록 그대로)
-        data = LibraryHoldingItemSerializer(qs, many=True).data
-        return Response(data, status=status.HTTP_200_OK)
+        # 5) 전체 목록: 첫 청크로 404 판단 후 나머지는 청크 단위로 흘려보냄 (응답 형식은 기존과 같은 배열)
+        rows, last_id = first_chunk(qs)
+        if not rows:
+            raise BookNotFound
+        return StreamingHttpResponse(
+            stream_holdings(qs, rows, last_id, compact),
+            content_type="application/json", status=status.HTTP_200_OK,
+        )
 
 class LibraryListAPIView(APIView):
     permission_classes = [permissions.AllowAny]
@@ -175,9 +200,7 @@ class LibraryRecommendationView(APIView):
         # 3) 추천 책 isbn 목록으로
         isbn_list = preference_books_per_lib(user=request.user, lib_id=library_id)
         
-        books_by_isbn = BookInfo.objects.filter(isbn__in=isbn_list)\
-                                        .only("isbn", "title", "author", "cover_url", "category")\
-                                        .in_bulk(field_name="isbn")
+        books_by_isbn = get_books(isbn_list)
         
         results = []
         for isbn in isbn_list:
@@ -195,3 +218,47 @@ class LibraryRecommendationView(APIView):
         response_data = {"library": library_id, "results": results}
         return Response(response_data, status=status.HTTP_200_OK)
 
+
+
+# 여러 isbn x 근처(또는 지정) 도서관 재고 한 번에 조회 (지도 화면)
+class LibraryAvailabilityAPIView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="isbn 목록이 반경 안(또는 library_ids) 도서관 중 어디에 있는지 한 번에 조회",
+        request_body=AvailabilityRequestSerializer,
+        responses={200: "성공", 400: "검증 오류"}
+    )
+    def post(self, request):
+        s = AvailabilityRequestSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        v = s.validated_data
+        isbns = v["isbns"]
+
+        # 1) 재고 비트맵: 하나라도 있는 도서관만 후보
+        candidates = library_stock_index.libraries_with_any(isbns)
+        if "library_ids" in v:
+            candidates &= set(v["library_ids"])
+
+        # 2) 위치가 있으면 반경 안에서 가까운 순, 없으면 요청한 library_ids 순서
+        if "lat" in v:
+            radius = v.get("radius_m", getattr(settings, "LIBRARY_AVAILABILITY_RADIUS_M", 3000))
+            ranked = library_geo_index.nearest(v["lat"], v["lng"], len(candidates), allowed=candidates, max_m=radius)
+        else:
+            ranked = [(lid, None) for lid in dict.fromkeys(v["library_ids"]) if lid in candidates]
+
+        # 3) 도서관 x isbn 재고
+        by_isbn = library_stock_index.availability([lid for lid, _ in ranked], isbns)
+        names = dict(Library.objects.filter(id__in=[lid for lid, _ in ranked]).values_list("id", "name"))
+        held: dict = {lid: [] for lid, _ in ranked}
+        for isbn, lids in by_isbn.items():
+            for lid in lids:
+                held[lid].append(isbn)
+
+        libraries = [{
+            "library_id": lid,
+            "name": names.get(lid),
+            "distance_m": format_distance(d),
+            "isbns": held[lid],
+        } for lid, d in ranked if lid in names]
+        return Response({"libraries": libraries, "isbns": by_isbn}, status=status.HTTP_200_OK)
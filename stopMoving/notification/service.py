@@ -7,3 +7,13 @@ def push(user, type_, message="", data=None):
         type=type_,
         message=message or "",
     )
+
+# 여러 유저에게 보내는 알림을 한 번에 저장
+# rows: [(user_id, type_, message), ...]
+def push_many(rows, batch_size=1000):
+    if not rows:
+        return
+    Notification.objects.bulk_create(
+        [Notification(user_id=uid, type=type_, message=message or "") for uid, type_, message in rows],
+        batch_size=batch_size,
+    )
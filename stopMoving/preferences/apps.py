@@ -6,6 +6,9 @@ class PreferencesConfig(AppConfig):
     name = 'preferences'
 
     def ready(self):
+        # BookInfo 변경 -> 추천 후보 행렬 캐시 동기화
+        from . import signals  # noqa: F401
+
         import os, sys
         if any(cmd in sys.argv for cmd in ['migrate','makemigrations','showmigrations','collectstatic','check','dbshell']):
             return
@@ -0,0 +1,252 @@
+# preferences/benchmark.py
+# 추천 벤치마크: 합성 카탈로그/유저 생성 + 추천 함수별 시간 측정
+# bench_recommend 커맨드와 tests/bench_recommend.py(pytest-benchmark)에서 같이 사용
+import platform
+import random
+import statistics
+import time
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import connection, transaction
+
+from accounts.models import User
+from bookinfo.models import BookInfo
+from books.services import (
+    CATEGORIES, preference_books_activity, preference_books_combined, preference_notification,
+)
+from users.models import UserBook, UserInfo
+from .services.embeddings import deserialize_sparse, l2_normalize, l2_normalize_rows, pack_sparse, serialize_sparse
+from .services.item_matrix import item_matrix
+from .services.recommend import apply_boosts, cosine_scores, mmr_rerank
+
+BENCH_ISBN_PREFIX = "979"  # 합성 책 isbn: 979 + 10자리 일련번호
+BENCH_USERNAME_PREFIX = "bench_"
+
+
+def _random_rows(rng, n: int, dim: int, nnz: int, cats: np.ndarray) -> sparse.csr_matrix:
+    """
+    카테고리별 단어 대역에서 70%, 전체에서 30% 뽑은 희소 행 n개 (l2 정규화).
+    같은 카테고리 책끼리 유사도가 생기도록 해서 MMR/부스트가 의미 있게 동작하게 함
+    """
+    band = max(dim // len(CATEGORIES), 1)
+    n_band = int(round(nnz * 0.7))
+    local = cats[:, None] * band + rng.integers(0, band, size=(n, n_band))
+    glob = rng.integers(0, dim, size=(n, nnz - n_band))
+    cols = np.concatenate([local, glob], axis=1) % dim
+    data = rng.random(cols.shape, dtype=np.float32) + 0.1
+    rows = np.repeat(np.arange(n), cols.shape[1])
+    M = sparse.csr_matrix((data.ravel(), (rows, cols.ravel())), shape=(n, dim), dtype=np.float32)
+    M.sum_duplicates()
+    return l2_normalize_rows(M)
+
+
+def generate(books: int = 10000, users: int = 1000, history: int = 5, dim: int = 5000,
+             nnz: int = 40, seed: int = 0, batch_size: int = 5000, log=None) -> dict:
+    """
+    합성 BookInfo(vector_bin) / User + UserInfo(선호 벡터) / UserBook(수령 이력) 생성.
+    기존 합성 데이터(bench_ 유저, 979 isbn)는 먼저 지움. 생성 수 반환
+    """
+    log = log or (lambda msg: None)
+    rng = np.random.default_rng(seed)
+    clear()
+
+    # 책
+    started = time.perf_counter()
+    book_cats = rng.integers(0, len(CATEGORIES), size=books)
+    isbns = [f"{BENCH_ISBN_PREFIX}{i:010d}" for i in range(books)]
+    for lo in range(0, books, batch_size):
+        hi = min(lo + batch_size, books)
+        M = _random_rows(rng, hi - lo, dim, nnz, book_cats[lo:hi])
+        BookInfo.objects.bulk_create([
+            BookInfo(
+                isbn=isbns[i],
+                title=f"벤치 도서 {i}",
+                author=f"저자{i % 997}",
+                category=f"국내도서>{CATEGORIES[book_cats[i]]}>합성",
+                vector_bin=pack_sparse(M[i - lo]),
+            )
+            for i in range(lo, hi)
+        ], batch_size=batch_size)
+        log(f"books {hi}/{books}")
+    t_books = time.perf_counter() - started
+
+    # 유저 + 선호 벡터 + 이력
+    started = time.perf_counter()
+    py_rng = random.Random(seed)
+    for lo in range(0, users, batch_size):
+        hi = min(lo + batch_size, users)
+        created = User.objects.bulk_create([
+            User(username=f"{BENCH_USERNAME_PREFIX}{i}", password="!", is_survey=True)
+            for i in range(lo, hi)
+        ], batch_size=batch_size)
+        if created[0].pk is None:
+            created = list(User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX)
+                           .order_by("id")[lo:hi])
+
+        # 선호 카테고리 1~2개 대역으로 설문/활동 벡터 구성
+        fav = rng.integers(0, len(CATEGORIES), size=hi - lo)
+        survey = _random_rows(rng, hi - lo, dim, nnz // 2, fav)
+        activity = _random_rows(rng, hi - lo, dim, nnz, (fav + 1) % len(CATEGORIES))
+        combined = l2_normalize_rows(survey * float(settings.RECOMMEND_ALPHA)
+                                     + activity * (1 - float(settings.RECOMMEND_ALPHA)))
+        infos, links = [], []
+        for j, u in enumerate(created):
+            infos.append(UserInfo(
+                user=u,
+                survey_done=True,
+                preference_vector=serialize_sparse(combined[j]),
+                preference_vector_survey=serialize_sparse(survey[j]),
+                preference_vector_activity=serialize_sparse(activity[j]),
+            ))
+            for isbn in py_rng.sample(isbns, min(history, books)):
+                links.append(UserBook(user=u, bookinfo_id=isbn, status="PURCHASED", quantity=1))
+        UserInfo.objects.bulk_create(infos, batch_size=batch_size)
+        UserBook.objects.bulk_create(links, batch_size=batch_size)
+        log(f"users {hi}/{users}")
+    t_users = time.perf_counter() - started
+
+    return {"books": books, "users": users, "history": history, "dim": dim, "nnz": nnz,
+            "seed": seed, "generate_books_s": round(t_books, 3), "generate_users_s": round(t_users, 3)}
+
+
+def clear() -> None:
+    bench_users = User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX)
+    from notification.models import Notification
+    Notification.objects.filter(user__in=bench_users).delete()
+    UserBook.objects.filter(user__in=bench_users).delete()
+    UserInfo.objects.filter(user__in=bench_users).delete()
+    bench_users.delete()
+    BookInfo.objects.filter(isbn__startswith=BENCH_ISBN_PREFIX).delete()
+    item_matrix.invalidate()
+
+
+class BenchContext:
+    """측정 대상 유저 샘플과 미리 풀어둔 벡터 (측정에서 DB/역직렬화 비용 제외용)"""
+
+    def __init__(self, sample_users: int = 50, donate: int = 5, seed: int = 0):
+        rng = random.Random(seed)
+        user_ids = list(User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX)
+                        .values_list("id", flat=True))
+        if not user_ids:
+            raise RuntimeError("합성 데이터가 없습니다. 먼저 generate()를 실행하세요.")
+        picked = rng.sample(user_ids, min(sample_users, len(user_ids)))
+        self.users = list(User.objects.filter(id__in=picked).order_by("id"))
+
+        self.items = item_matrix.get()
+        infos = {ui.user_id: ui for ui in UserInfo.objects.filter(user_id__in=picked)}
+        owned: dict = {}
+        for uid, isbn in UserBook.objects.filter(user_id__in=picked).values_list("user_id", "bookinfo_id"):
+            owned.setdefault(uid, set()).add(isbn)
+
+        self.cases = []  # (user, user_vec, survey_vec, exclude)
+        for u in self.users:
+            ui = infos.get(u.id)
+            if ui is None:
+                continue
+            self.cases.append((
+                u,
+                l2_normalize(deserialize_sparse(ui.preference_vector)),
+                deserialize_sparse(ui.preference_vector_survey),
+                owned.get(u.id, set()),
+            ))
+
+        self.donor = self.users[0]
+        self.donated_isbns = rng.sample(self.items.isbns, min(donate, len(self.items)))
+        self.pool = int(getattr(settings, "RECOMMEND_MMR_POOL", 100))
+        self.lam = float(getattr(settings, "RECOMMEND_MMR_LAMBDA", 0.3))
+        self.survey_w = float(getattr(settings, "RECOMMEND_SURVEY_BOOST", 0.25))
+        self.base = []
+        self.boosted = []
+        for i in range(len(self.cases)):
+            self.base.append(self.cosine_scores(i)[2])
+            self.boosted.append(self.apply_boosts(i))
+
+    # 각 측정 함수: 유저 1명(i번째 케이스) 기준 1회 실행
+    def cosine_scores(self, i: int):
+        _, uv, _, ex = self.cases[i % len(self.cases)]
+        return cosine_scores(uv, self.items, exclude=ex)
+
+    # 앞 단계 결과는 미리 계산해둔 값을 사용 -> 단계별 시간만 측정
+    def apply_boosts(self, i: int):
+        i %= len(self.cases)
+        return apply_boosts("combined", self.items.M, self.base[i], self.cases[i][2], None, survey_w=self.survey_w)
+
+    def mmr_rerank(self, i: int, k: int = 5):
+        return mmr_rerank(self.items.M, self.boosted[i % len(self.cases)], k=k, pool=self.pool, lam=self.lam)
+
+    def preference_books_combined(self, i: int):
+        return preference_books_combined(self.cases[i % len(self.cases)][0])
+
+    def preference_books_activity(self, i: int):
+        return preference_books_activity(self.cases[i % len(self.cases)][0])
+
+    # 알림은 측정 후 롤백 (반복 실행해도 데이터가 쌓이지 않게)
+    def preference_notification(self, i: int = 0):
+        with transaction.atomic():
+            preference_notification(donor_user=self.donor, donated_isbns=self.donated_isbns)
+            transaction.set_rollback(True)
+
+
+def _stats(samples: list) -> dict:
+    ms = sorted(s * 1e3 for s in samples)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "min_ms": round(ms[0], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def _measure(fn, n: int, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        for i in range(n):
+            t = time.perf_counter()
+            fn(i)
+            samples.append(time.perf_counter() - t)
+    return _stats(samples)
+
+
+def run(sample_users: int = 50, repeat: int = 3, donate: int = 5, seed: int = 0, log=None) -> dict:
+    """생성된 합성 데이터로 함수별 시간 측정 -> JSON 직렬화 가능한 dict"""
+    log = log or (lambda msg: None)
+    results = {}
+
+    item_matrix.invalidate()
+    t = time.perf_counter()
+    ctx = BenchContext(sample_users=sample_users, donate=donate, seed=seed)
+    results["context_load"] = _stats([time.perf_counter() - t])
+
+    n = len(ctx.cases)
+    steps = [
+        ("cosine_scores", ctx.cosine_scores, n),
+        ("apply_boosts", ctx.apply_boosts, n),
+        ("mmr_rerank_k5", lambda i: ctx.mmr_rerank(i, k=5), n),
+        ("mmr_rerank_k80", lambda i: ctx.mmr_rerank(i, k=len(CATEGORIES) * 5 * 2), n),
+        ("preference_books_combined", ctx.preference_books_combined, n),
+        ("preference_books_activity", ctx.preference_books_activity, n),
+        ("preference_notification", ctx.preference_notification, 1),
+    ]
+    for name, fn, count in steps:
+        results[name] = _measure(fn, count, repeat)
+        log(f"{name}: {results[name]['mean_ms']} ms")
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "db_vendor": connection.vendor,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "books": len(ctx.items),
+            "users": User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX).count(),
+            "sample_users": n,
+            "repeat": repeat,
+            "donated": len(ctx.donated_isbns),
+        },
+        "results": results,
+    }
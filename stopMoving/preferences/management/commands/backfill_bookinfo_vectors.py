@@ -1,19 +1,32 @@
 # preferences/management/commands/backfill_bookinfo_vectors.py
 from django.core.management.base import BaseCommand
-from bookinfo.models import BookInfo
-from preferences.services.embeddings import load_vectorizer, build_text_from_bookinfo, serialize_sparse
+from bookinfo.models import BookInfo, HAS_VECTOR
+from preferences.services.embeddings import transform_many, build_text_from_bookinfo, pack_sparse
 
 class Command(BaseCommand):
     help = "기존 BookInfo.vector 백필"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="한 번에 변환/저장할 행 수 (기본 500)")
+
     def handle(self, *args, **opts):
-        vec = load_vectorizer()
-        qs = BookInfo.objects.all()
-        for bi in qs.iterator(chunk_size=500):
-            if bi.vector:
-                continue
-            text = build_text_from_bookinfo(bi)
-            X = vec.transform([text])
-            bi.vector = serialize_sparse(X)
-            bi.save(update_fields=["vector"])
-        self.stdout.write(self.style.SUCCESS("backfill_bookinfo_vectors: done"))
\ No newline at end of file
+        batch_size = max(1, opts["batch_size"])
+        qs = BookInfo.objects.exclude(HAS_VECTOR).only("isbn", "title", "category", "description")
+        done = 0
+        batch = []
+        for bi in qs.iterator(chunk_size=batch_size):
+            batch.append(bi)
+            if len(batch) >= batch_size:
+                done += self._flush(batch)
+                batch = []
+        if batch:
+            done += self._flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"backfill_bookinfo_vectors: {done} rows done"))
+
+    # 배치 단위로 한 번에 변환 -> bulk_update
+    def _flush(self, batch) -> int:
+        X = transform_many(build_text_from_bookinfo(bi) for bi in batch)
+        for i, bi in enumerate(batch):
+            bi.vector_bin = pack_sparse(X[i])
+        BookInfo.objects.bulk_update(batch, ["vector_bin"])
+        return len(batch)
@@ -0,0 +1,122 @@
+# preferences/management/commands/bench_mmr.py
+# MMR 리랭킹 벤치마크 (DB 없이 랜덤 희소 벡터로 실행)
+# 1) 이전 구현(선택마다 M_pool @ M_sel.T 재계산) vs mmr_rerank(P x P 유사도 1회 + running max), 후보 N개
+# 2) 기증 알림: 유저별 mmr_rerank vs mmr_rerank_batch(전체 유저 동시에), 기증된 책 --books개
+import time
+
+import numpy as np
+from scipy import sparse
+from django.core.management.base import BaseCommand
+
+from preferences.services.embeddings import l2_normalize_rows
+from preferences.services.recommend import mmr_rerank, mmr_rerank_batch
+
+
+# 이전 구현 (비교 기준)
+def mmr_rerank_legacy(M, scores, k=5, pool=100, lam=0.3):
+    if M is None or M.shape[0] == 0:
+        return []
+    top_idx = np.argsort(-scores)[:min(pool, M.shape[0])]
+    top_idx = top_idx[np.isfinite(scores[top_idx])]
+    if top_idx.size == 0:
+        return []
+    M_pool = M[top_idx]
+    rel = scores[top_idx]
+
+    selected = []
+    cand_mask = np.ones(M_pool.shape[0], dtype=bool)
+    for _ in range(min(k, M_pool.shape[0])):
+        if not selected:
+            i = int(np.argmax(rel))
+            selected.append(i)
+            cand_mask[i] = False
+            continue
+        M_sel = M_pool[selected]
+        sims = (M_pool @ M_sel.T).toarray()
+        max_sim = sims.max(axis=1)
+        mmr = lam * rel - (1 - lam) * max_sim
+        mmr[~cand_mask] = -1e9
+        i = int(np.argmax(mmr))
+        if not cand_mask[i]:
+            break
+        selected.append(i)
+        cand_mask[i] = False
+    return [int(top_idx[i]) for i in selected]
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+class Command(BaseCommand):
+    help = "MMR 리랭킹 이전/현재 구현 속도 및 결과 비교 (랜덤 희소 벡터)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=5000, help="후보 수 N (기본 5000)")
+        parser.add_argument("--dim", type=int, default=5000, help="벡터 차원 D (기본 5000)")
+        parser.add_argument("--nnz", type=int, default=40, help="행당 0이 아닌 값 수 (기본 40)")
+        parser.add_argument("--users", type=int, default=50, help="유저 수 (기본 50)")
+        parser.add_argument("--books", type=int, default=30, help="2) 기증된 책 수 (기본 30)")
+        parser.add_argument("--k", type=int, nargs="+", default=[5, 80], help="선택 개수 (기본 5 80: combined/activity)")
+        parser.add_argument("--pool", type=int, default=100)
+        parser.add_argument("--lam", type=float, default=0.3)
+        parser.add_argument("--repeat", type=int, default=3, help="반복 측정 후 최솟값 사용")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(opts["seed"])
+        N, D, nnz = opts["items"], opts["dim"], opts["nnz"]
+        M = sparse.random(N, D, density=nnz / D, format="csr", dtype=np.float32, random_state=opts["seed"])
+        M = l2_normalize_rows(M)
+        U = l2_normalize_rows(sparse.random(opts["users"], D, density=nnz * 3 / D, format="csr", random_state=opts["seed"] + 1))
+        scores = (U @ M.T).toarray()
+        # 일부 후보는 제외(-inf) 상태로
+        scores[rng.random(scores.shape) < 0.05] = -np.inf
+
+        pool, lam, repeat = opts["pool"], opts["lam"], opts["repeat"]
+        self.stdout.write(f"N={N} D={D} nnz/row={nnz} users={len(scores)} pool={pool} lam={lam}")
+
+        for k in opts["k"]:
+            legacy = [mmr_rerank_legacy(M, s, k=k, pool=pool, lam=lam) for s in scores]
+            current = [mmr_rerank(M, s, k=k, pool=pool, lam=lam) for s in scores]
+
+            t_legacy = _timeit(lambda: [mmr_rerank_legacy(M, s, k=k, pool=pool, lam=lam) for s in scores], repeat)
+            t_current = _timeit(lambda: [mmr_rerank(M, s, k=k, pool=pool, lam=lam) for s in scores], repeat)
+
+            n = len(scores)
+            self.stdout.write(
+                f"k={k:<3} legacy {t_legacy / n * 1e3:8.2f} ms/user | "
+                f"mmr_rerank {t_current / n * 1e3:8.2f} ms/user ({t_legacy / t_current:5.1f}x)"
+            )
+            self._report(f"k={k}", legacy == current)
+
+        # 2) 기증 알림과 같은 형태: 후보 = 기증된 책 B개, 전체 유저가 같은 후보를 공유
+        B = min(opts["books"], N)
+        MB = M[:B]
+        sims = (MB @ MB.T).toarray()
+        # 희소 벡터라 0점 동점이 많음 -> 동점 처리 순서 차이가 비교에 섞이지 않게 작은 잡음 추가
+        bscores = scores[:, :B] + rng.random((len(scores), B)) * 1e-9
+        k = min(opts["k"])
+        self.stdout.write(f"donation: books={B} users={len(bscores)} k={k}")
+        per_user = [mmr_rerank(MB, s, k=k, pool=pool, lam=lam) for s in bscores]
+        batch = [[int(i) for i in row if i >= 0] for row in mmr_rerank_batch(bscores, sims, k=k, pool=pool, lam=lam)]
+
+        t_per_user = _timeit(lambda: [mmr_rerank(MB, s, k=k, pool=pool, lam=lam) for s in bscores], repeat)
+        t_batch = _timeit(lambda: mmr_rerank_batch(bscores, (MB @ MB.T).toarray(), k=k, pool=pool, lam=lam), repeat)
+        n = len(bscores)
+        self.stdout.write(
+            f"mmr_rerank {t_per_user / n * 1e3:8.3f} ms/user | "
+            f"mmr_rerank_batch {t_batch / n * 1e3:8.3f} ms/user ({t_per_user / t_batch:5.1f}x)"
+        )
+        self._report("donation", per_user == batch)
+
+    def _report(self, label: str, same: bool) -> None:
+        if same:
+            self.stdout.write(self.style.SUCCESS(f"{label}: 결과 일치"))
+        else:
+            self.stdout.write(self.style.ERROR(f"{label}: 결과 불일치"))
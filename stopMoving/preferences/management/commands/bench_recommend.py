@@ -0,0 +1,59 @@
+# preferences/management/commands/bench_recommend.py
+# 합성 카탈로그/유저로 추천 함수 벤치마크 (SQLite 전용)
+#   python manage.py bench_recommend --settings=config.settings_bench --books 100000 --users 10000 --output bench.json
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import User
+from preferences import benchmark
+
+
+class Command(BaseCommand):
+    help = "합성 데이터 생성 후 cosine_scores/apply_boosts/mmr_rerank/추천/알림 시간 측정 (JSON 출력)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10000, help="합성 책 수 (기본 10000)")
+        parser.add_argument("--users", type=int, default=1000, help="합성 유저 수 (기본 1000)")
+        parser.add_argument("--history", type=int, default=5, help="유저당 수령 이력 수 (기본 5)")
+        parser.add_argument("--dim", type=int, default=5000, help="벡터 차원 (기본 5000)")
+        parser.add_argument("--nnz", type=int, default=40, help="책 벡터당 0이 아닌 값 수 (기본 40)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--reuse", action="store_true", help="이미 생성된 합성 데이터가 있으면 재생성하지 않음")
+        parser.add_argument("--sample-users", type=int, default=50, help="측정에 쓸 유저 수 (기본 50)")
+        parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (기본 3)")
+        parser.add_argument("--donate", type=int, default=5, help="알림 측정 시 기증 권수 (기본 5)")
+        parser.add_argument("--output", type=str, default=None, help="결과 JSON 파일 경로 (없으면 stdout)")
+        parser.add_argument("--clear", action="store_true", help="측정 후 합성 데이터 삭제")
+
+    def handle(self, *args, **opts):
+        # 합성 데이터를 대량으로 쓰고 지우므로 운영 DB(MySQL)에서는 실행 금지
+        if connection.vendor != "sqlite":
+            raise CommandError("bench_recommend는 SQLite에서만 실행합니다. --settings=config.settings_bench 를 사용하세요.")
+
+        log = lambda msg: self.stderr.write(msg)
+        gen = None
+        has_data = User.objects.filter(username__startswith=benchmark.BENCH_USERNAME_PREFIX).exists()
+        if not (opts["reuse"] and has_data):
+            gen = benchmark.generate(
+                books=opts["books"], users=opts["users"], history=opts["history"],
+                dim=opts["dim"], nnz=opts["nnz"], seed=opts["seed"], log=log,
+            )
+
+        report = benchmark.run(
+            sample_users=opts["sample_users"], repeat=opts["repeat"],
+            donate=opts["donate"], seed=opts["seed"], log=log,
+        )
+        report["meta"]["generate"] = gen
+
+        if opts["clear"]:
+            benchmark.clear()
+
+        out = json.dumps(report, ensure_ascii=False, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as f:
+                f.write(out)
+            self.stdout.write(self.style.SUCCESS(f"bench_recommend: saved {opts['output']}"))
+        else:
+            self.stdout.write(out)
@@ -6,8 +6,11 @@ from preferences.services.embeddings import ensure_vectorizer, build_text_from_b
 class Command(BaseCommand):
     help = "TF-IDF 벡터라이저 학습(vectorizer.pkl 생성)"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--refit", action="store_true", help="vectorizer.pkl이 있어도 다시 학습 (실행 중인 프로세스는 자동으로 다시 로드)")
+
     def handle(self, *args, **opts):
         qs = BookInfo.objects.all()
         corpus = [build_text_from_bookinfo(bi) for bi in qs]
-        ensure_vectorizer(corpus)
+        ensure_vectorizer(corpus, refit=opts["refit"])
         self.stdout.write(self.style.SUCCESS(f"fit_vectorizer: trained on {len(corpus)} docs"))
\ No newline at end of file
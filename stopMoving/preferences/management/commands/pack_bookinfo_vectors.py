@@ -0,0 +1,62 @@
+# preferences/management/commands/pack_bookinfo_vectors.py
+# 예전 JSON 형식 BookInfo.vector -> 바이너리 vector_bin 변환(백필)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bookinfo.models import BookInfo
+from preferences.services.embeddings import deserialize_sparse, pack_sparse
+
+class Command(BaseCommand):
+    help = "BookInfo.vector(JSON)를 vector_bin(float32 data + int32 indices)으로 변환"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="bulk_update 단위 (기본 500)")
+        parser.add_argument("--clear-json", action="store_true", help="변환 후 JSON vector 컬럼을 비움(행 크기 축소)")
+        parser.add_argument("--dry-run", action="store_true", help="DB에 저장하지 않고 변환 대상 수만 출력")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        clear_json = opts["clear_json"]
+        dry = opts["dry_run"]
+
+        qs = BookInfo.objects.filter(vector__isnull=False)
+        if not clear_json:
+            qs = qs.filter(vector_bin__isnull=True)
+        fields = ["vector_bin", "vector"] if clear_json else ["vector_bin"]
+
+        packed, cleared, failed = 0, 0, 0
+        bytes_json, bytes_bin = 0, 0
+        last_isbn = ""
+        while True:
+            # isbn 키셋으로 끊어서 읽음 (갱신 중인 테이블을 오프셋 없이 순회)
+            rows = list(qs.filter(isbn__gt=last_isbn).order_by("isbn")
+                        .only("isbn", "vector", "vector_bin")[:batch_size])
+            if not rows:
+                break
+            last_isbn = rows[-1].isbn
+
+            for bi in rows:
+                try:
+                    if not bi.vector_bin:
+                        csr = deserialize_sparse(bi.vector)
+                        if csr is None:
+                            continue
+                        bi.vector_bin = pack_sparse(csr)
+                        bytes_json += len(str(bi.vector))
+                        bytes_bin += len(bi.vector_bin)
+                        packed += 1
+                    if clear_json:
+                        bi.vector = None
+                        cleared += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"[ERR]  {bi.isbn}: {e}")
+
+            if not dry:
+                with transaction.atomic():
+                    BookInfo.objects.bulk_update(rows, fields, batch_size=batch_size)
+
+        ratio = f" (JSON {bytes_json:,}B -> {bytes_bin:,}B)" if packed else ""
+        msg = f"pack_bookinfo_vectors: packed={packed}, cleared_json={cleared}, failed={failed}{ratio}"
+        if dry:
+            msg = "[DRY RUN] " + msg
+        self.stdout.write(self.style.SUCCESS(msg))
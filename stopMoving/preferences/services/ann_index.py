@@ -0,0 +1,80 @@
+# preferences/services/ann_index.py
+# 추천 후보 근사 검색: 단어(열) -> 책(행) 역색인 + 쿼리 상위 가중치 단어만 사용 (query term pruning)
+# 전체 행렬 mat-vec 대신 쿼리 상위 T개 단어의 posting만 훑어 부분 점수 상위 N개를 고르고,
+# 고른 후보만 원래 희소 벡터로 정확히 재채점 -> MMR
+import logging
+import threading
+import time
+import weakref
+
+import numpy as np
+from django.conf import settings
+
+from .item_matrix import ItemMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class AnnIndexCache:
+    """
+    후보 행렬(전역 스냅샷, 도서관 슬라이스 등)별 CSC(열 = 단어 posting) 캐시.
+    스냅샷은 불변이고 새 책이 들어오면 item_matrix가 새 스냅샷을 만들므로 색인도 다음 조회 때 다시 만들어짐
+    후보 행렬을 약하게 참조 -> 스냅샷이 버려지면 CSC도 같이 해제
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = weakref.WeakKeyDictionary()  # items -> CSC
+
+    def postings(self, items: ItemMatrix):
+        C = self._postings.get(items)
+        if C is not None:
+            return C
+        started = time.monotonic()
+        C = items.M.tocsc()
+        with self._lock:
+            self._postings[items] = C
+        logger.debug("ann_index: postings for %d rows in %.3fs", len(items), time.monotonic() - started)
+        return C
+
+    def search(self, items: ItemMatrix, query_csr, n: int) -> np.ndarray:
+        """query 상위 가중치 단어 posting만으로 부분 점수 -> 상위 n개 행 번호 (오름차순)"""
+        q = query_csr.tocsr()
+        terms = int(getattr(settings, "RECOMMEND_ANN_QUERY_TERMS", 16))
+        top = np.argsort(-q.data)[:terms]
+        cols, weights = q.indices[top], q.data[top]
+
+        C = self.postings(items)
+        starts, ends = C.indptr[cols], C.indptr[cols + 1]
+        rows = np.concatenate([C.indices[s:e] for s, e in zip(starts, ends)])
+        if rows.size == 0:
+            return rows.astype(np.int64)
+        vals = np.concatenate([C.data[s:e] * w for s, e, w in zip(starts, ends, weights)])
+        partial = np.bincount(rows, weights=vals, minlength=len(items))
+        hit = np.flatnonzero(partial)
+        if hit.size > n:
+            hit = np.sort(hit[np.argpartition(-partial[hit], n - 1)[:n]])
+        return hit
+
+    def candidates(self, items: ItemMatrix, query_csr, extra: int = 0) -> ItemMatrix:
+        """
+        query(유저 벡터 + 부스트 벡터의 선형 결합)와 가까운 상위
+        RECOMMEND_ANN_CANDIDATES + extra(이후 마스킹될 본인 책 수)개 행만 남긴 ItemMatrix.
+        후보가 RECOMMEND_ANN_MIN_ITEMS보다 적으면 items 그대로 반환 (전수 계산)
+        """
+        if len(items) < int(getattr(settings, "RECOMMEND_ANN_MIN_ITEMS", 20000)):
+            return items
+        if query_csr is None or query_csr.nnz == 0 or query_csr.shape[1] != items.dim:
+            return items
+        n = int(getattr(settings, "RECOMMEND_ANN_CANDIDATES", 2000)) + extra
+        rows = self.search(items, query_csr, n)
+        if rows.size == 0:
+            return items
+        return ItemMatrix(
+            [items.isbns[i] for i in rows],
+            [items.categories[i] for i in rows],
+            items.M[rows],
+        )
+
+
+ann_index = AnnIndexCache()
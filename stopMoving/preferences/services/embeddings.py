@@ -1,9 +1,10 @@
 # preferences/services/embeddings.py
-import os, re, pickle, numpy as np
-from typing import List, Optional
+import os, re, struct, numpy as np
+from typing import Iterable, List, Optional
 from django.conf import settings
 from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
+from .vectorizer import vectorizer_registry
 
 TOKEN_RE = re.compile(r"[A-Za-z가-힣0-9]{2,}")
 
@@ -36,12 +37,9 @@ def build_text_from_meta(meta: dict) -> str:
         title
     ]))
 
-def ensure_vectorizer(corpus: Optional[List[str]] = None) -> TfidfVectorizer:
-    os.makedirs(settings.VECTOR_DATA_DIR, exist_ok=True)
-    path = settings.VECTOR_PICKLE_PATH
-    if os.path.exists(path):
-        with open(path, "rb") as f:
-            return pickle.load(f)
+def ensure_vectorizer(corpus: Optional[List[str]] = None, refit: bool = False) -> TfidfVectorizer:
+    if not refit and os.path.exists(settings.VECTOR_PICKLE_PATH):
+        return vectorizer_registry.get()
     assert corpus is not None and len(corpus) > 0, "Vectorizer가 없어 corpus가 필요합니다."
     vec = TfidfVectorizer(
         tokenizer=simple_tokenize,
@@ -50,13 +48,16 @@ def ensure_vectorizer(corpus: Optional[List[str]] = None) -> TfidfVectorizer:
         sublinear_tf=True, norm="l2"
     )
     vec.fit(corpus)
-    with open(path, "wb") as f:
-        pickle.dump(vec, f)
+    vectorizer_registry.save(vec)
     return vec
 
+# 프로세스 캐시에서 반환 (pkl 파일이 바뀌면 자동으로 다시 로드)
 def load_vectorizer() -> TfidfVectorizer:
-    with open(settings.VECTOR_PICKLE_PATH, "rb") as f:
-        return pickle.load(f)
+    return vectorizer_registry.get()
+
+# 여러 문서를 한 번에 TF-IDF 변환 -> (len(texts) x D) CSR
+def transform_many(texts: Iterable[str]) -> sparse.csr_matrix:
+    return vectorizer_registry.transform_many(texts)
     
 def serialize_sparse(csr: sparse.csc_matrix) -> dict:
     csr = csr.tocsr()
@@ -67,12 +68,92 @@ def serialize_sparse(csr: sparse.csc_matrix) -> dict:
         "shape": csr.shape,
     }
 
-def deserialize_sparse(obj: dict | None) -> Optional[sparse.csr_matrix]:
+# BookInfo.vector_bin 바이너리 포맷 (1 x D 벡터 전용)
+# header(magic, dim, nnz) + float32 data[nnz] + int32 indices[nnz], little-endian
+_PACK_MAGIC = b"SPV1"
+_PACK_HEADER = struct.Struct("<4sII")
+
+def pack_sparse(csr: sparse.spmatrix) -> bytes:
+    csr = csr.tocsr()
+    if csr.shape[0] != 1:
+        raise ValueError(f"pack_sparse는 1행 벡터만 지원합니다: shape={csr.shape}")
+    data = np.ascontiguousarray(csr.data, dtype="<f4")
+    ind = np.ascontiguousarray(csr.indices, dtype="<i4")
+    return _PACK_HEADER.pack(_PACK_MAGIC, csr.shape[1], data.size) + data.tobytes() + ind.tobytes()
+
+# 여러 행 CSR -> 행마다 pack_sparse 결과 (배치 변환 후 저장용)
+def pack_sparse_rows(M: sparse.spmatrix) -> list[bytes]:
+    M = M.tocsr()
+    data = np.ascontiguousarray(M.data, dtype="<f4")
+    ind = np.ascontiguousarray(M.indices, dtype="<i4")
+    out = []
+    for i in range(M.shape[0]):
+        a, b = M.indptr[i], M.indptr[i + 1]
+        out.append(_PACK_HEADER.pack(_PACK_MAGIC, M.shape[1], b - a) + data[a:b].tobytes() + ind[a:b].tobytes())
+    return out
+
+# 바이너리 -> (data, indices, dim), 복사 없이 버퍼를 그대로 봄
+def unpack_sparse_arrays(buf) -> tuple[np.ndarray, np.ndarray, int]:
+    buf = memoryview(buf)
+    magic, dim, nnz = _PACK_HEADER.unpack_from(buf)
+    if magic != _PACK_MAGIC:
+        raise ValueError("알 수 없는 벡터 포맷입니다.")
+    off = _PACK_HEADER.size
+    data = np.frombuffer(buf, dtype="<f4", count=nnz, offset=off)
+    ind = np.frombuffer(buf, dtype="<i4", count=nnz, offset=off + 4 * nnz)
+    return data, ind, dim
+
+def unpack_sparse(buf) -> sparse.csr_matrix:
+    data, ind, dim = unpack_sparse_arrays(buf)
+    return sparse.csr_matrix((data, ind, np.array([0, data.size])), shape=(1, dim))
+
+# JSON dict(예전 형식)과 바이너리 둘 다 읽음
+def deserialize_sparse(obj: dict | bytes | None) -> Optional[sparse.csr_matrix]:
     if not obj:
         return None
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return unpack_sparse(obj)
     data = np.array(obj["data"]); ind = np.array(obj["indices"]); ptr = np.array(obj["indptr"])
     return sparse.csr_matrix((data, ind, ptr), shape=tuple(obj["shape"]))
 
+# BookInfo 벡터 로드: vector_bin 우선, 아직 백필 안 된 행은 JSON vector
+def book_vector(bi) -> Optional[sparse.csr_matrix]:
+    return deserialize_sparse(getattr(bi, "vector_bin", None) or getattr(bi, "vector", None))
+
+# 저장된 1행 벡터(바이너리/JSON) -> (float32 data, int32 indices, dim). 비어있으면 None
+def vector_arrays(obj) -> Optional[tuple[np.ndarray, np.ndarray, int]]:
+    if not obj:
+        return None
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        data, ind, dim = unpack_sparse_arrays(obj)
+    else:
+        data = np.asarray(obj["data"], dtype=np.float32)
+        ind = np.asarray(obj["indices"], dtype=np.int32)
+        dim = int(obj["shape"][1])
+    return (data, ind, dim) if data.size else None
+
+# 저장된 벡터 여러 개 -> (n, dim) CSR 한 번에 구성 (행별 csr 생성/vstack 없이)
+# 비었거나 차원이 다른 벡터는 빈 행으로 둔다
+def stack_vectors(objs, dim: int) -> sparse.csr_matrix:
+    datas, inds = [], []
+    indptr = np.zeros(len(objs) + 1, dtype=np.int64)
+    for r, obj in enumerate(objs):
+        arrs = vector_arrays(obj)
+        n = 0
+        if arrs is not None and arrs[2] == dim:
+            datas.append(arrs[0]); inds.append(arrs[1])
+            n = arrs[0].size
+        indptr[r + 1] = indptr[r] + n
+    data = np.concatenate(datas) if datas else np.array([], dtype=np.float32)
+    ind = np.concatenate(inds) if inds else np.array([], dtype=np.int32)
+    return sparse.csr_matrix((data, ind, indptr), shape=(len(objs), dim))
+
+# 행별 L2 정규화 (CSR 전체를 한 번에)
+def l2_normalize_rows(M: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(M.multiply(M).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ M).tocsr()
+
 def weighted_sum(v1: Optional[sparse.csr_matrix], v2: Optional[sparse.csr_matrix], alpha: float):
     if v1 is None: return v2
     if v2 is None: return v1
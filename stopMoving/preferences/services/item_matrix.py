@@ -0,0 +1,168 @@
+# preferences/services/item_matrix.py
+# 추천 후보 행렬 캐시 (프로세스 단위)
+# BookInfo.vector 전체를 CSR 하나로 쌓아두고 isbn -> row 인덱스로 재사용
+import logging
+import time
+from typing import Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from core.ttl_snapshot import TTLSnapshot
+from .embeddings import vector_arrays
+
+logger = logging.getLogger(__name__)
+
+
+class ItemMatrix:
+    """
+    불변 스냅샷: 쌓인 CSR(M), 행 순서대로의 isbn/카테고리, isbn -> row 인덱스.
+    갱신은 항상 새 스냅샷을 만들어 교체하므로 읽는 쪽은 락 없이 사용해도 된다.
+    """
+    __slots__ = ("isbns", "categories", "row_of", "M", "__weakref__")
+
+    def __init__(self, isbns: List[str], categories: List[str], M: sparse.csr_matrix):
+        self.isbns = isbns
+        self.categories = categories
+        self.row_of = {isbn: i for i, isbn in enumerate(isbns)}
+        self.M = M
+
+    def __len__(self):
+        return len(self.isbns)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.M.shape[1] if self.M is not None else None
+
+    def rows_for(self, isbns: Iterable[str]) -> np.ndarray:
+        row_of = self.row_of
+        return np.fromiter((row_of[i] for i in isbns if i in row_of), dtype=np.int64)
+
+    # 유저 벡터 1개로 전체 행렬 점수 계산 (sparse mat-vec 1회)
+    # 제외할 isbn은 행을 잘라내지 않고 -inf로 마스킹 -> M을 복사하지 않음
+    def scores(self, user_csr, exclude: Optional[Iterable[str]] = None) -> np.ndarray:
+        if len(self) == 0:
+            return np.array([])
+        scores = np.asarray(self.M @ user_csr.T.toarray()).ravel()
+        if exclude:
+            rows = self.rows_for(exclude)
+            if rows.size:
+                scores[rows] = -np.inf
+        return scores
+
+
+def _empty() -> ItemMatrix:
+    return ItemMatrix([], [], sparse.csr_matrix((0, 0), dtype=np.float32))
+
+
+def _stack(rows) -> tuple[list, list, Optional[sparse.csr_matrix]]:
+    """[(isbn, category, (data, indices, dim)), ...] -> (isbns, categories, CSR)"""
+    isbns, cats, datas, inds, lens = [], [], [], [], []
+    dim = None
+    for isbn, category, arrs in rows:
+        data, indices, d = arrs
+        if dim is None:
+            dim = d
+        elif d != dim:
+            # vectorizer 재학습 전후 벡터가 섞인 경우 -> 현재 차원과 다른 행은 건너뜀
+            logger.warning("item_matrix: dim mismatch for %s (%s != %s), skipped", isbn, d, dim)
+            continue
+        isbns.append(isbn)
+        cats.append(category or "")
+        datas.append(data)
+        inds.append(indices)
+        lens.append(data.size)
+    if not isbns:
+        return [], [], None
+    indptr = np.zeros(len(lens) + 1, dtype=np.int64)
+    np.cumsum(lens, out=indptr[1:])
+    M = sparse.csr_matrix(
+        (np.concatenate(datas), np.concatenate(inds), indptr),
+        shape=(len(isbns), dim),
+    )
+    return isbns, cats, M
+
+
+class ItemMatrixCache:
+    """
+    프로세스 전역 후보 행렬 캐시.
+    - 최초 get()에서 1회 빌드, RECOMMEND_MATRIX_TTL(초)마다 전체 재빌드 (core.ttl_snapshot)
+    - BookInfo 저장/삭제 시 upsert()/remove()로 변경분만 쌓아두고 다음 get()에서 반영
+    """
+
+    def __init__(self):
+        self._cache: TTLSnapshot[ItemMatrix] = TTLSnapshot("RECOMMEND_MATRIX_TTL")
+        self._pending: dict = {}  # isbn -> (category, arrays) | None(삭제)
+
+    def get(self, db_alias: str = "default") -> ItemMatrix:
+        return self._cache.get(lambda: self._rebuild(db_alias), self._apply_pending if self._pending else None)
+
+    def _rebuild(self, db_alias: str) -> ItemMatrix:
+        snap = self._build(db_alias)
+        self._pending.clear()  # 빌드가 DB에서 이미 읽음
+        return snap
+
+    def _build(self, db_alias: str) -> ItemMatrix:
+        from bookinfo.models import BookInfo, HAS_VECTOR
+
+        started = time.monotonic()
+        qs = (BookInfo.objects.using(db_alias)
+              .filter(HAS_VECTOR)
+              .values_list("isbn", "category", "vector_bin", "vector"))
+        rows = []
+        for isbn, category, vec_bin, vec in qs.iterator(chunk_size=2000):
+            arrs = vector_arrays(vec_bin or vec)
+            if arrs is not None:
+                rows.append((isbn, category, arrs))
+        isbns, cats, M = _stack(rows)
+        snap = ItemMatrix(isbns, cats, M) if M is not None else _empty()
+        logger.info("item_matrix: built %d rows in %.2fs", len(snap), time.monotonic() - started)
+        return snap
+
+    def _apply_pending(self, snap: ItemMatrix) -> ItemMatrix:
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return snap
+        keep = np.ones(len(snap), dtype=bool)
+        drop = snap.rows_for(pending.keys())
+        keep[drop] = False
+        keep_idx = np.flatnonzero(keep)
+
+        new_rows = [(isbn, v[0], v[1]) for isbn, v in pending.items() if v is not None]
+        new_isbns, new_cats, new_M = _stack(new_rows)
+        if new_M is not None and snap.dim is not None and len(snap) and new_M.shape[1] != snap.dim:
+            # 차원이 바뀌었으면(vectorizer 교체) 부분 갱신 대신 다음 get()에서 재빌드
+            self._cache.expire()
+            return snap
+
+        parts = [snap.M[keep_idx]] if keep_idx.size else []
+        if new_M is not None:
+            parts.append(new_M)
+        if not parts:
+            return _empty()
+        M = sparse.vstack(parts, format="csr")
+        isbns = [snap.isbns[i] for i in keep_idx] + new_isbns
+        cats = [snap.categories[i] for i in keep_idx] + new_cats
+        return ItemMatrix(isbns, cats, M)
+
+    # BookInfo.vector/카테고리 변경 반영 (빌드 전이면 무시)
+    def upsert(self, isbn: str, category: str, vector) -> None:
+        if self._cache.peek() is None:
+            return
+        arrs = vector_arrays(vector)
+        with self._cache.lock:
+            self._pending[isbn] = (category, arrs) if arrs is not None else None
+
+    def remove(self, isbn: str) -> None:
+        if self._cache.peek() is None:
+            return
+        with self._cache.lock:
+            self._pending[isbn] = None
+
+    def invalidate(self) -> None:
+        with self._cache.lock:
+            self._cache.invalidate()
+            self._pending.clear()
+
+
+item_matrix = ItemMatrixCache()
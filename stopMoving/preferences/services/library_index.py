@@ -0,0 +1,93 @@
+# preferences/services/library_index.py
+# 도서관별 추천 후보 행렬 캐시 (프로세스 단위)
+# 도서관의 수령 가능(AVAILABLE) isbn 집합 -> 전역 후보 행렬(item_matrix)에서 해당 행만 잘라 재사용
+import logging
+import threading
+from typing import Optional
+
+from core.ttl_snapshot import TTLSnapshot
+from .item_matrix import ItemMatrix, item_matrix
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("isbns", "slice")
+
+    def __init__(self, isbns: set):
+        self.isbns = isbns  # AVAILABLE isbn 집합
+        self.slice = None  # (전역 스냅샷, 도서관 ItemMatrix)
+
+
+class LibraryItemIndex:
+    """
+    - 도서관별 AVAILABLE isbn 집합은 처음 요청될 때 1회 조회, RECOMMEND_MATRIX_TTL(초)마다 다시 읽음 (core.ttl_snapshot)
+    - 재고 변경(stock_changed 시그널)은 set_status()로 집합만 갱신 -> 다음 get()에서 다시 슬라이스
+    - 전역 후보 행렬 스냅샷이 바뀌어도(벡터 추가/수정) 다시 슬라이스
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches: dict = {}  # library_id -> TTLSnapshot[_Entry]
+
+    def _cache(self, library_id: int) -> TTLSnapshot:
+        cache = self._caches.get(library_id)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.setdefault(library_id, TTLSnapshot("RECOMMEND_MATRIX_TTL"))
+        return cache
+
+    def _load(self, library_id: int, db_alias: str) -> _Entry:
+        from bookinfo.models import BookInfoLibrary
+        return _Entry(set(BookInfoLibrary.objects.using(db_alias)
+                          .filter(library_id=library_id, status="AVAILABLE")
+                          .values_list("isbn", flat=True)))
+
+    def get(self, library_id: int, db_alias: str = "default") -> ItemMatrix:
+        library_id = int(library_id)
+        snap = item_matrix.get(db_alias)
+        cache = self._cache(library_id)
+        entry = cache.get(lambda: self._load(library_id, db_alias))
+
+        cached = entry.slice
+        if cached is not None and cached[0] is snap:
+            return cached[1]
+
+        with cache.lock:
+            rows = snap.rows_for(sorted(entry.isbns))
+            lib = ItemMatrix(
+                [snap.isbns[i] for i in rows],
+                [snap.categories[i] for i in rows],
+                snap.M[rows],
+            )
+            entry.slice = (snap, lib)
+        return lib
+
+    # 재고 상태 변경 반영 (아직 읽지 않은 도서관이면 무시)
+    def set_status(self, library_id: Optional[int], isbn: str, status: str) -> None:
+        if library_id is None:
+            return
+        cache = self._caches.get(int(library_id))
+        if cache is None or cache.peek() is None:
+            return
+        with cache.lock:
+            entry = cache.peek()
+            if entry is None:
+                return
+            before = isbn in entry.isbns
+            if status == "AVAILABLE":
+                entry.isbns.add(isbn)
+            else:
+                entry.isbns.discard(isbn)
+            if before != (isbn in entry.isbns):
+                entry.slice = None
+
+    def invalidate(self, library_id: Optional[int] = None) -> None:
+        with self._lock:
+            caches = list(self._caches.values()) if library_id is None else [self._caches.get(int(library_id))]
+        for cache in caches:
+            if cache is not None:
+                cache.invalidate()
+
+
+library_index = LibraryItemIndex()
@@ -2,6 +2,7 @@
 from typing import List
 import numpy as np
 from scipy import sparse
+from .item_matrix import ItemMatrix
 
 def _clean_items(items):
     cleaned = []
@@ -24,14 +25,21 @@ def cosine_topk(user_csr, items, k=5):
     idx = np.argsort(-scores)[:k]
     return [(cleaned[i][0], float(scores[i])) for i in idx]
 
-# (cleaned_items, M, base_scores) 반환
-def cosine_scores(user_csr, items):
+# (isbns, M, base_scores) 반환
+# items가 ItemMatrix면 캐시된 행렬로 mat-vec 1회, exclude는 -inf로 마스킹
+def cosine_scores(user_csr, items, exclude=None):
+    if isinstance(items, ItemMatrix):
+        if len(items) == 0:
+            return [], None, np.array([])
+        return items.isbns, items.M, items.scores(user_csr, exclude=exclude)
     cleaned = _clean_items(items)
+    if exclude:
+        cleaned = [(isbn, v) for isbn, v in cleaned if isbn not in exclude]
     if not cleaned:
         return [], None, np.array([])
     M = sparse.vstack([v for _, v in cleaned])
     scores = (M @ user_csr.T).toarray().ravel()
-    return cleaned, M, scores
+    return [isbn for isbn, _ in cleaned], M, scores
 
 # combined/activity 모드에 따라 추가 점수 부여
 def apply_boosts(mode: str,
@@ -48,6 +56,12 @@ def apply_boosts(mode: str,
         scores += recent_w * (M @ recent_vec.T).toarray().ravel()
     return scores
 
+# apply_boosts 결과 = M @ (user + w * boost) 이므로 후보 근사 검색도 같은 선형 결합 벡터로
+def boost_query(user_vec, boost_vec, w: float):
+    if boost_vec is None or getattr(boost_vec, "nnz", 0) == 0:
+        return user_vec
+    return user_vec + w * boost_vec
+
 def mmr_rerank(M: sparse.csr_matrix,
                scores: np.ndarray,
                k: int = 5,
@@ -55,32 +69,67 @@ def mmr_rerank(M: sparse.csr_matrix,
                lam: float = 0.3) -> List[int]:
     if M is None or M.shape[0] == 0:
         return []
-    # 후보: base score 상위인 pool개
+    # 후보: base score 상위인 pool개 (마스킹된 -inf 후보는 제외)
     top_idx = np.argsort(-scores)[:min(pool, M.shape[0])]
+    top_idx = top_idx[np.isfinite(scores[top_idx])]
+    if top_idx.size == 0:
+        return []
     M_pool = M[top_idx] # (P, D)
     rel = scores[top_idx] # (P, )
 
+    # pool 내 유사도 (P, P)를 한 번만 계산하고, 선택될 때마다 해당 행으로 최대 유사도만 갱신
+    sims = (M_pool @ M_pool.T).toarray()
+    P = top_idx.size
     selected = []
-    cand_mask = np.ones(M_pool.shape[0], dtype=bool)
+    cand_mask = np.ones(P, dtype=bool)
+    max_sim = np.full(P, -np.inf)
 
-    for _ in range(min(k, M_pool.shape[0])):
-        if not selected:
+    for step in range(min(k, P)):
+        if step == 0:
             i = int(np.argmax(rel))
-            selected.append(i)
-            cand_mask[i] = False
-            continue
-        # 현재 선택된 것과의 유사도 중 최대값 계싼
-        M_sel = M_pool[selected] # (s, D)
-        # (P, D) @ (D, s) -> (P, s) -> 각 후보별 최대 유사도
-        sims = (M_pool @ M_sel.T).toarray()
-        max_sim = sims.max(axis=1) # (P, )
-        mmr = lam * rel - (1 - lam) * max_sim
-        mmr[~cand_mask] = -1e9 # 이미 뽑힌 후보는 제외
-        i = int(np.argmax(mmr))
-        if not cand_mask[i]:
-            break
+        else:
+            mmr = lam * rel - (1 - lam) * max_sim
+            mmr[~cand_mask] = -1e9 # 이미 뽑힌 후보는 제외
+            i = int(np.argmax(mmr))
+            if not cand_mask[i]:
+                break
         selected.append(i)
         cand_mask[i] = False
+        np.maximum(max_sim, sims[:, i], out=max_sim)
 
     # pool 내 인덱스를 원본 인덱스로 환산
-    return [int(top_idx[i]) for i in selected]
\ No newline at end of file
+    return [int(top_idx[i]) for i in selected]
+
+# 여러 유저 x 같은 후보 P개에 대한 MMR을 한 번에 계산 (기증 알림처럼 후보가 적을 때)
+# scores: (n, P) 유저별 관련도(-inf = 제외), sims: (P, P) 후보 간 유사도
+# 반환: (n, k) 유저별 선택 인덱스(선택 순서), 더 고를 후보가 없으면 -1 (동점이 없으면 유저별 mmr_rerank와 같은 결과)
+def mmr_rerank_batch(scores: np.ndarray,
+                     sims: np.ndarray,
+                     k: int = 5,
+                     pool: int = 100,
+                     lam: float = 0.3) -> np.ndarray:
+    n, P = scores.shape
+    k = min(k, P)
+    out = np.full((n, k), -1, dtype=np.int64)
+    if n == 0 or k == 0:
+        return out
+
+    valid = np.isfinite(scores)
+    if P > pool:
+        # 유저별 상위 pool개 밖은 후보에서 제외
+        kth = np.partition(np.where(valid, scores, -np.inf), P - pool, axis=1)[:, P - pool]
+        valid &= scores >= kth[:, None]
+    rel = np.where(valid, scores, 0.0)
+
+    rows = np.arange(n)
+    max_sim = np.zeros((n, P))
+    for step in range(k):
+        # 첫 선택은 관련도 최댓값, 이후는 이미 뽑힌 것들과의 최대 유사도로 패널티
+        mmr = rel if step == 0 else lam * rel - (1 - lam) * max_sim
+        mmr = np.where(valid, mmr, -np.inf)
+        i = mmr.argmax(axis=1)
+        ok = valid[rows, i]
+        out[ok, step] = i[ok]
+        valid[rows[ok], i[ok]] = False
+        max_sim = np.maximum(max_sim, sims[i])  # 선택된 후보의 유사도 행으로 running max 갱신
+    return out
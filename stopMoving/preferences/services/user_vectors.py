@@ -0,0 +1,141 @@
+# preferences/services/user_vectors.py
+# 유저 선호 벡터(설문/활동/통합) 갱신
+# scipy 행렬/JSON 왕복 없이 1행 희소 벡터를 (float32 data, int32 indices, dim) 배열로 바로 계산
+# 픽업(활동 EMA)과 설문(ExtractKeywordsView) 모두 여기를 거쳐 저장
+from typing import Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from .embeddings import vector_arrays
+
+Vec = tuple  # (data float32[nnz], indices int32[nnz] 오름차순, dim)
+
+
+def as_vec(obj) -> Optional[Vec]:
+    """저장된 벡터(JSON/바이너리) 또는 1행 CSR -> Vec. 비어있으면 None"""
+    if obj is None:
+        return None
+    if sparse.issparse(obj):
+        csr = obj.tocsr()
+        csr.sum_duplicates()
+        if csr.nnz == 0:
+            return None
+        return (csr.data.astype(np.float32), csr.indices.astype(np.int32), csr.shape[1])
+    return vector_arrays(obj)
+
+
+def lincomb(terms: Iterable, dim: int) -> Optional[Vec]:
+    """sum(w * v) for (w, v) in terms. 차원이 다른 벡터는 무시"""
+    datas, inds = [], []
+    for w, v in terms:
+        if v is None or v[2] != dim or w == 0:
+            continue
+        datas.append(v[0] * np.float32(w))
+        inds.append(v[1])
+    if not datas:
+        return None
+    data = np.concatenate(datas)
+    ind = np.concatenate(inds)
+    order = np.argsort(ind, kind="stable")
+    ind, data = ind[order], data[order]
+    starts = np.flatnonzero(np.r_[True, ind[1:] != ind[:-1]])
+    return (np.add.reduceat(data, starts).astype(np.float32), ind[starts].astype(np.int32), dim)
+
+
+def prune(v: Optional[Vec]) -> Optional[Vec]:
+    """아주 작은 가중치 제거 + 최대 nnz 제한 (EMA가 누적되며 벡터가 계속 커지는 것 방지)"""
+    if v is None:
+        return None
+    data, ind, dim = v
+    keep = np.abs(data) >= float(getattr(settings, "PREFERENCE_VECTOR_MIN_WEIGHT", 1e-4))
+    max_nnz = int(getattr(settings, "PREFERENCE_VECTOR_MAX_NNZ", 4000))
+    if keep.sum() > max_nnz:
+        top = np.argpartition(-np.abs(data), max_nnz - 1)[:max_nnz]
+        keep = np.zeros(data.size, dtype=bool)
+        keep[top] = True
+    if not keep.any():
+        return None
+    return (data[keep], ind[keep], dim)
+
+
+def normalize(v: Optional[Vec]) -> Optional[Vec]:
+    if v is None:
+        return None
+    n = float(np.sqrt(np.dot(v[0], v[0])))
+    return (v[0] / np.float32(n), v[1], v[2]) if n > 0 else v
+
+
+def to_json(v: Vec) -> dict:
+    """serialize_sparse와 같은 형식 (UserInfo JSONField 저장용)"""
+    data, ind, dim = v
+    return {
+        "data": data.tolist(),
+        "indices": ind.tolist(),
+        "indptr": [0, int(data.size)],
+        "shape": [1, int(dim)],
+    }
+
+
+def ema(old: Optional[Vec], books: list, beta: float) -> Optional[Vec]:
+    """
+    act <- beta * act + (1 - beta) * book 을 books 순서대로 적용한 결과를 한 번에 계산
+    = beta^n * old + sum_k (1 - beta) * beta^(n-1-k) * book_k  (old가 없으면 첫 책이 시작값)
+    """
+    books = [b for b in books if b is not None]
+    if not books:
+        return old
+    dim = books[-1][2]
+    if old is None or old[2] != dim:
+        old, books = books[0], books[1:]
+    n = len(books)
+    terms = [(beta ** n, old)]
+    terms += [((1 - beta) * beta ** (n - 1 - k), b) for k, b in enumerate(books)]
+    return prune(lincomb(terms, dim))
+
+
+def combine(survey: Optional[Vec], activity: Optional[Vec], alpha: float) -> Optional[Vec]:
+    """통합 = l2(α*survey + (1-α)*activity), 한쪽이 없으면 다른 쪽 (weighted_sum + l2_normalize와 동일)"""
+    if survey is None:
+        return normalize(activity)
+    if activity is None or activity[2] != survey[2]:
+        return normalize(survey)
+    return normalize(lincomb([(alpha, survey), (1.0 - alpha, activity)], survey[2]))
+
+
+def apply_pickups(ui, bookinfos: Iterable) -> list:
+    """
+    픽업한 책들(순서대로)로 활동/통합 벡터 갱신. ui는 저장하지 않고 바뀐 필드 목록 반환
+    (호출하는 쪽에서 ui.save(update_fields=...) 1회)
+    """
+    books = [as_vec(getattr(bi, "vector_bin", None) or getattr(bi, "vector", None))
+             for bi in bookinfos if bi is not None]
+    books = [b for b in books if b is not None]
+    if not books:
+        return []
+    act = ema(as_vec(ui.preference_vector_activity), books, float(settings.ACTIVITY_EMA_BETA))
+    if act is None:
+        return []
+    ui.preference_vector_activity = to_json(act)
+    combined = combine(as_vec(ui.preference_vector_survey), act, float(settings.RECOMMEND_ALPHA))
+    ui.preference_vector = to_json(combined if combined is not None else act)
+    return ["preference_vector_activity", "preference_vector"]
+
+
+def apply_survey(ui, survey) -> list:
+    """설문 벡터(1행 CSR 또는 Vec) 저장 + 통합 벡터 갱신. 바뀐 필드 목록 반환"""
+    sv = survey if isinstance(survey, tuple) else as_vec(survey)
+    if sv is None:
+        # 키워드가 사전에 없어 빈 벡터 -> 빈 설문 벡터로 저장, 통합은 활동 벡터만
+        if not sparse.issparse(survey):
+            return []
+        empty = (np.array([], dtype=np.float32), np.array([], dtype=np.int32), survey.shape[1])
+        ui.preference_vector_survey = to_json(empty)
+        combined = combine(None, as_vec(ui.preference_vector_activity), float(settings.RECOMMEND_ALPHA))
+        ui.preference_vector = to_json(combined if combined is not None else empty)
+        return ["preference_vector_survey", "preference_vector"]
+    ui.preference_vector_survey = to_json(sv)
+    combined = combine(sv, as_vec(ui.preference_vector_activity), float(settings.RECOMMEND_ALPHA))
+    ui.preference_vector = to_json(combined if combined is not None else sv)
+    return ["preference_vector_survey", "preference_vector"]
@@ -0,0 +1,97 @@
+# preferences/services/vectorizer.py
+# 학습된 TfidfVectorizer 프로세스 전역 캐시
+# 요청마다 vectorizer.pkl을 unpickle하지 않고 1회 로드 후 재사용,
+# 파일이 교체되면(fit_vectorizer 재실행 등 mtime/size 변경) 다음 접근 때 다시 로드
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _signature(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class VectorizerRegistry:
+    """
+    - get(): 캐시된 vectorizer 반환, VECTORIZER_RELOAD_CHECK(초)마다 파일 변경 여부 확인
+    - version: 로드/교체될 때마다 1씩 증가 (벡터 공간이 바뀌었는지 확인용)
+    - transform_many(texts): 여러 문서를 한 번에 변환
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vec = None
+        self._sig = None
+        self._checked_at = 0.0
+        self.version = 0
+
+    def _path(self) -> str:
+        return settings.VECTOR_PICKLE_PATH
+
+    def _check_interval(self) -> float:
+        return float(getattr(settings, "VECTORIZER_RELOAD_CHECK", 5))
+
+    def get(self):
+        vec = self._vec
+        if vec is not None and time.monotonic() - self._checked_at < self._check_interval():
+            return vec
+        with self._lock:
+            path = self._path()
+            sig = _signature(path)
+            self._checked_at = time.monotonic()
+            if self._vec is not None and (sig is None or sig == self._sig):
+                # 파일이 사라진 경우도 기존 것을 계속 사용
+                return self._vec
+            if sig is None:
+                raise FileNotFoundError(path)
+            with open(path, "rb") as f:
+                self._vec = pickle.load(f)
+            self._sig = sig
+            self.version += 1
+            logger.info("vectorizer: loaded %s (version %d)", path, self.version)
+            return self._vec
+
+    # 새로 학습한 vectorizer 저장 + 캐시 교체
+    # 임시 파일에 쓰고 os.replace -> 다른 프로세스가 쓰다 만 파일을 읽지 않음
+    def save(self, vec) -> None:
+        path = self._path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(vec, f)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            self._vec = vec
+            self._sig = _signature(path)
+            self._checked_at = time.monotonic()
+            self.version += 1
+
+    def transform_many(self, texts: Iterable[str]):
+        texts = list(texts)
+        return self.get().transform(texts)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._vec = None
+            self._sig = None
+            self._checked_at = 0.0
+
+
+vectorizer_registry = VectorizerRegistry()
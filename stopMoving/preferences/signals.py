@@ -0,0 +1,44 @@
+# preferences/signals.py
+# BookInfo 변경 -> 추천 후보 행렬 캐시(item_matrix)에 반영
+# BookInfo 대량 저장(books_upserted) -> item_matrix에 반영
+# 도서관 재고 변경 -> 도서관별 후보 캐시(library_index)에 반영
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from bookinfo.models import BookInfo
+from bookinfo.signals import books_upserted, stock_changed
+from .services.item_matrix import item_matrix
+from .services.library_index import library_index
+
+_MATRIX_FIELDS = {"vector", "vector_bin", "category"}
+
+
+@receiver(post_save, sender=BookInfo)
+def sync_item_matrix_on_save(sender, instance, update_fields=None, **kwargs):
+    # vector/category와 무관한 저장(cover_url 등)은 건너뜀
+    if update_fields is not None and not (_MATRIX_FIELDS & set(update_fields)):
+        return
+    isbn, category = instance.isbn, instance.category
+    vector = instance.vector_bin or instance.vector
+    # 롤백된 변경이 캐시에 남지 않도록 커밋 후 반영
+    transaction.on_commit(lambda: item_matrix.upsert(isbn, category, vector))
+
+
+@receiver(post_delete, sender=BookInfo)
+def sync_item_matrix_on_delete(sender, instance, **kwargs):
+    isbn = instance.isbn
+    transaction.on_commit(lambda: item_matrix.remove(isbn))
+
+
+# books_upserted는 이미 커밋 후에 전송됨
+@receiver(books_upserted)
+def sync_item_matrix_on_bulk_upsert(sender, books, **kwargs):
+    for b in books:
+        item_matrix.upsert(b.isbn, b.category, b.vector_bin or b.vector)
+
+
+# stock_changed는 이미 커밋 후에 전송됨
+@receiver(stock_changed)
+def sync_library_index(sender, library_id, isbn, status, **kwargs):
+    library_index.set_status(library_id, isbn, status)
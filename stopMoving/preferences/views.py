@@ -1,4 +1,7 @@
 # preferences/views.py
+import hashlib
+import json
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -11,12 +14,12 @@ from users.models import UserInfo
 # 새 엔진(사전 없이: KeyBERT × 전역IDF × 교집합가중)
 from .services.keyword_extractor import extract_keywords_from_books
 # 벡터
-from preferences.services.embeddings import(
-    load_vectorizer, serialize_sparse, deserialize_sparse, weighted_sum, l2_normalize
-)
+from preferences.services.embeddings import transform_many
+from preferences.services.user_vectors import apply_survey
 from django.conf import settings
 from django.utils import timezone
-from books.services import CATEGORIES, preference_books_combined
+from django.utils.http import parse_etags, quote_etag
+from books.services import CATEGORIES, book_cards, preference_books_combined
 
 SURVEY_MIN_BOOKS = 3
 CATEGORIES_SET = set(CATEGORIES)
@@ -73,24 +76,16 @@ class ExtractKeywordsView(APIView):
         user.save(update_fields=["is_survey"])
 
         # 동일 TF-IDF 공간으로 설문 벡터화
-        vec = load_vectorizer()
         survey_text = " ".join(keywords)
-        sv = vec.transform([survey_text])
-        ui.preference_vector_survey = serialize_sparse(sv)
-
-        # 통합 =  α*survey + (1-α)*activity (활동 벡터는 아직 없는 상황)
-        act = deserialize_sparse(ui.preference_vector_activity) if ui.preference_vector_activity else None
-        combined = weighted_sum(sv, act, alpha = settings.RECOMMEND_ALPHA)
-        # l2 정규화 추가
-        combined = l2_normalize(combined)
-        ui.preference_vector = serialize_sparse(combined if combined is not None else sv)
+        sv = transform_many([survey_text])
+        # 통합 =  α*survey + (1-α)*activity (활동 벡터가 있으면 반영)
+        vector_fields = apply_survey(ui, sv)
 
         ui.save(update_fields=[
             "preference_keyword",
             "survey_done",
             "last_survey_at",
-            "preference_vector_survey",
-            "preference_vector",
+            *vector_fields,
         ])
 
         # 사용자 db에 combined 기반 추천 책 isbn 목록 저장
@@ -107,13 +102,8 @@ class RecommendView(APIView):
         if mode not in ("combined", "activity"):
             mode = "combined"
 
-        ui = UserInfo.objects.get(user=request.user)
-        results = []
         cat = None
-
-        if mode == "combined":
-            preference_booklist = ui.preference_book_combined
-        else:
+        if mode == "activity":
             cat = (request.query_params.get("category") or "").strip()
             if cat not in CATEGORIES_SET:
                 return Response(
@@ -124,25 +114,37 @@ class RecommendView(APIView):
                     },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+
+        # 목록 + 저장된 카드만 읽음 (UserInfo 1행)
+        list_field, cards_field = (
+            ("preference_book_combined", "preference_cards_combined") if mode == "combined"
+            else ("preference_book_activity", "preference_cards_activity")
+        )
+        ui = UserInfo.objects.only("user_id", list_field, cards_field).get(user=request.user)
+
+        if mode == "combined":
+            preference_booklist = [str(x) for x in (ui.preference_book_combined or [])]
+            results = ui.preference_cards_combined or []
+        else:
             raw = ui.preference_book_activity
-            if isinstance(raw, dict):
-                isbns = raw.get(cat, [])
-            else:
-                isbns = []
-            preference_booklist = []
-            for x in isbns:
-                s = str(x)
-                preference_booklist.append(s)
-        
-        for pb in preference_booklist:
-            b=BookInfo.objects.get(isbn=pb)
-            results.append({
-                "isbn": b.isbn,
-                "title": b.title,
-                "author": b.author,
-                "cover_url": b.cover_url,
-                "category": b.category
-            })
-        
+            preference_booklist = [str(x) for x in raw.get(cat, [])] if isinstance(raw, dict) else []
+            cards = ui.preference_cards_activity
+            results = cards.get(cat, []) if isinstance(cards, dict) else []
+
+        # 카드가 아직 없는(이전에 저장된) 목록이면 메타 캐시로 구성
+        if [c["isbn"] for c in results] != preference_booklist:
+            results = book_cards(preference_booklist)
+
         response_data = {"mode": mode, "category": cat, "results": results}
-        return Response(response_data, status=status.HTTP_200_OK)
+
+        # 목록이 바뀌지 않았으면 304 (If-None-Match)
+        etag = quote_etag(hashlib.sha1(
+            json.dumps(response_data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest())
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(response_data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
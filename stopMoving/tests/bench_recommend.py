@@ -0,0 +1,62 @@
+# tests/bench_recommend.py
+# 추천 함수 벤치마크 (pytest-benchmark + pytest-django)
+#   DJANGO_SETTINGS_MODULE=config.settings_bench pytest tests/bench_recommend.py --benchmark-json=bench.json
+# 규모는 환경변수로 조절: BENCH_BOOKS(기본 10000), BENCH_USERS(기본 1000), BENCH_SAMPLE_USERS(기본 50)
+# 파일명이 test_로 시작하지 않아 일반 테스트 실행에는 포함되지 않음
+import itertools
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("pytest_django")
+
+
+@pytest.fixture(scope="module")
+def ctx(django_db_setup, django_db_blocker):
+    from preferences import benchmark
+
+    with django_db_blocker.unblock():
+        benchmark.generate(
+            books=int(os.getenv("BENCH_BOOKS", 10000)),
+            users=int(os.getenv("BENCH_USERS", 1000)),
+        )
+        yield benchmark.BenchContext(sample_users=int(os.getenv("BENCH_SAMPLE_USERS", 50)))
+        benchmark.clear()
+
+
+# 호출마다 다음 유저로 돌아가며 측정
+def _cycling(fn, n):
+    it = itertools.cycle(range(n))
+    return lambda: fn(next(it))
+
+
+def test_cosine_scores(benchmark, ctx):
+    benchmark(_cycling(ctx.cosine_scores, len(ctx.cases)))
+
+
+def test_apply_boosts(benchmark, ctx):
+    benchmark(_cycling(ctx.apply_boosts, len(ctx.cases)))
+
+
+def test_mmr_rerank_k5(benchmark, ctx):
+    benchmark(_cycling(lambda i: ctx.mmr_rerank(i, k=5), len(ctx.cases)))
+
+
+def test_mmr_rerank_k80(benchmark, ctx):
+    benchmark(_cycling(lambda i: ctx.mmr_rerank(i, k=80), len(ctx.cases)))
+
+
+@pytest.mark.django_db
+def test_preference_books_combined(benchmark, ctx):
+    benchmark(_cycling(ctx.preference_books_combined, len(ctx.cases)))
+
+
+@pytest.mark.django_db
+def test_preference_books_activity(benchmark, ctx):
+    benchmark(_cycling(ctx.preference_books_activity, len(ctx.cases)))
+
+
+@pytest.mark.django_db
+def test_preference_notification(benchmark, ctx):
+    benchmark.pedantic(ctx.preference_notification, rounds=3, iterations=1)
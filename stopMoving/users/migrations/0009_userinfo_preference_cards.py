@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_backfill_userimage_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userinfo',
+            name='preference_cards_activity',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='userinfo',
+            name='preference_cards_combined',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -16,6 +16,8 @@ class UserInfo(models.Model):
     my_lib_ids = models.JSONField(default=list, blank=True)  # 내 도서관 id들을 리스트로 저장
     preference_book_combined = models.JSONField(default=list, blank=True) # 선호 책 추천 목록 - 설문+수령 기반 (1~5등)
     preference_book_activity = models.JSONField(default=list, blank=True) # 선호 책 추천 목록 - 수령 기반 (1~5등)
+    preference_cards_combined = models.JSONField(default=list, blank=True) # 추천 카드(isbn/제목/저자/표지/카테고리) - combined 목록과 같은 순서
+    preference_cards_activity = models.JSONField(default=dict, blank=True) # 추천 카드 - 카테고리별, activity 목록과 같은 순서
 
     updated_at = models.DateTimeField(auto_now=True)
     user_image_url = models.URLField(null=True, max_length=500)